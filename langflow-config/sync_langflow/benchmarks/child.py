@@ -0,0 +1,44 @@
+import atexit
+import runpy
+import sys
+from typing import Optional
+
+def read_peak_rss_kb() -> Optional[int]:
+    """
+    Retourne le pic de mémoire résidente du processus depuis son exec (VmHWM, Linux uniquement).
+
+    Contrairement à getrusage, la mesure n'inclut pas la mémoire du processus parent au moment du
+    fork (le banc de performance, qui héberge les serveurs simulés).
+
+    Returns:
+        Optional[int]: Pic de mémoire résidente en Ko, ou None si /proc n'est pas disponible.
+    """
+    try:
+        with open("/proc/self/status", "r", encoding="utf-8") as file:
+            for line in file:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+def main() -> None:
+    """
+    Exécute un module en écrivant à la sortie du processus son pic de mémoire résidente.
+
+    Usage: child.py <fichier du pic de mémoire> <module> [arguments...]
+    """
+    peak_rss_path, module_name = sys.argv[1], sys.argv[2]
+
+    def write_peak_rss() -> None:
+        peak_rss_kb = read_peak_rss_kb()
+        if peak_rss_kb is not None:
+            with open(peak_rss_path, "w", encoding="utf-8") as file:
+                file.write(str(peak_rss_kb))
+
+    atexit.register(write_peak_rss)
+    sys.argv = [module_name, *sys.argv[3:]]
+    runpy.run_module(module_name, run_name="__main__", alter_sys=True)
+
+if __name__ == "__main__":
+    main()
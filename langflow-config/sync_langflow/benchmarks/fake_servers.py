@@ -0,0 +1,372 @@
+import email.policy
+import gzip
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List, Any, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from ..telemetry import route_template
+from ..utils import derive_pipeline_name
+
+logger = logging.getLogger("sync_app")
+
+FLOW_ROUTE = re.compile(r"^/api/v1/flows/([^/]+)/?$")
+FOLDER_ROUTE = re.compile(r"^/api/v1/folders/([^/]+)/?$")
+# Champs renvoyés par Langflow pour les listings d'en-têtes de flows (header_flows)
+FLOW_HEADER_FIELDS = ("id", "name", "description", "folder_id", "endpoint_name", "is_component", "updated_at")
+
+def parse_multipart(content_type: str, body: bytes) -> Dict[str, Tuple[Optional[str], bytes]]:
+    """
+    Décode un corps multipart/form-data.
+
+    Args:
+        content_type: En-tête Content-Type de la requête (avec sa frontière).
+        body: Corps de la requête.
+
+    Returns:
+        Dict[str, Tuple[Optional[str], bytes]]: Nom de fichier (None pour un simple champ) et contenu
+        de chaque partie, par nom de champ.
+    """
+    message = BytesParser(policy=email.policy.HTTP).parsebytes(
+        b"Content-Type: " + content_type.encode("latin-1") + b"\r\n\r\n" + body
+    )
+    parts = {}
+    for part in message.iter_parts():
+        parts[part.get_param("name", header="content-disposition")] = (part.get_filename(), part.get_payload(decode=True))
+    return parts
+
+def _now() -> str:
+    """Retourne l'horodatage courant (UTC, ISO 8601), format des champs updated_at de Langflow."""
+    return datetime.now(timezone.utc).isoformat()
+
+class FakeServer:
+    """
+    Serveur HTTP local simulant une API: état en mémoire, latence fixe par requête et comptage
+    des appels par route.
+
+    Les requêtes sont traitées une à une sous verrou (l'état reste cohérent), la latence est
+    simulée hors du verrou: les requêtes simultanées attendent en parallèle, comme face à un
+    vrai serveur.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        """
+        Initialise le serveur (non démarré).
+
+        Args:
+            latency: Latence simulée de chaque requête, en secondes.
+        """
+        self.latency = latency
+        # Si False, les corps compressés sont traités tels quels, comme par un serveur qui ne gère pas
+        # Content-Encoding dans les requêtes (Langflow: JSON indécodable, statut 422)
+        self.decompress_requests = True
+        self.calls = {} # "MÉTHODE route" -> nombre d'appels
+        self.bytes_received = 0
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        self._server = None
+
+    @property
+    def url(self) -> str:
+        """URL de base du serveur démarré."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> str:
+        """
+        Démarre le serveur sur un port libre de la boucle locale, dans un thread dédié.
+
+        Returns:
+            str: URL de base du serveur.
+        """
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        threading.Thread(target=self._server.serve_forever, name=type(self).__name__, daemon=True).start()
+        return self.url
+
+    def stop(self) -> None:
+        """Arrête le serveur."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def reset_calls(self) -> None:
+        """Remet à zéro les compteurs d'appels."""
+        with self._lock:
+            self.calls = {}
+            self.bytes_received = 0
+            self.bytes_sent = 0
+
+    def handle(self, method: str, path: str, query: Dict[str, str], headers: Any, body: bytes) -> Tuple[int, Any]:
+        """
+        Traite une requête (appelé sous le verrou de l'état).
+
+        Args:
+            method: Méthode HTTP.
+            path: Chemin de la requête.
+            query: Paramètres de la requête.
+            headers: En-têtes de la requête.
+            body: Corps de la requête (décompressé).
+
+        Returns:
+            Tuple[int, Any]: Statut et corps de la réponse (sérialisable en JSON, None: corps vide).
+        """
+        raise NotImplementedError
+
+    def _dispatch(self, method: str, raw_path: str, headers: Any, body: bytes) -> Tuple[int, bytes]:
+        """Compte, retarde puis traite une requête; retourne le statut et le corps encodé de la réponse."""
+        url = urlsplit(raw_path)
+        query = dict(parse_qsl(url.query))
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            route = f"{method} {route_template(url.path)}"
+            self.calls[route] = self.calls.get(route, 0) + 1
+            self.bytes_received += len(body)
+            try:
+                status, payload = self.handle(method, url.path, query, headers, body)
+            except (ValueError, KeyError, TypeError) as e:
+                status, payload = 422, {"detail": f"Requête invalide: {e}"}
+            content = b"" if payload is None else json.dumps(payload).encode("utf-8")
+            self.bytes_sent += len(content)
+        return status, content
+
+    def _make_handler(self) -> type:
+        """Crée le gestionnaire des requêtes du serveur."""
+        server = self
+
+        class FakeHandler(BaseHTTPRequestHandler):
+            # Connexions persistantes, comme un vrai serveur: la session du client les réutilise
+            protocol_version = "HTTP/1.1"
+
+            def _read_body(self) -> bytes:
+                if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+                    chunks = []
+                    while True:
+                        size = int(self.rfile.readline().split(b";")[0].strip(), 16)
+                        if not size:
+                            while self.rfile.readline() not in (b"\r\n", b"\n", b""):
+                                pass
+                            break
+                        chunks.append(self.rfile.read(size))
+                        self.rfile.readline()
+                    body = b"".join(chunks)
+                else:
+                    body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                if server.decompress_requests and self.headers.get("Content-Encoding", "").lower() == "gzip":
+                    body = gzip.decompress(body)
+                return body
+
+            def _handle(self) -> None:
+                status, content = server._dispatch(self.command, self.path, self.headers, self._read_body())
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            do_GET = do_POST = do_PATCH = do_PUT = do_DELETE = _handle
+
+            def log_message(self, format: str, *args: Any) -> None:
+                logger.debug(f"{type(server).__name__}: {format % args}")
+
+        return FakeHandler
+
+class FakeLangflowServer(FakeServer):
+    """
+    Serveur Langflow simulé: flows (/api/v1/flows, création unitaire, par lot et par fichier) et
+    dossiers (/api/v1/folders), avec les comportements de Langflow dont dépend la synchronisation
+    (ID fourni conservé, noms dédoublonnés, flows d'un dossier supprimés avec lui).
+    """
+
+    def __init__(self, latency: float = 0.0):
+        """
+        Initialise un serveur Langflow vide.
+
+        Args:
+            latency: Latence simulée de chaque requête, en secondes.
+        """
+        super().__init__(latency)
+        self.flows = {} # ID -> flow
+        self.folders = {} # ID -> dossier
+
+    def seed(self, flows: Iterable[Tuple[Optional[str], Dict[str, Any]]]) -> None:
+        """
+        Crée des flows sans passer par l'API (état initial d'un scénario).
+
+        Args:
+            flows: Nom du dossier (None: aucun) et contenu de chaque flow.
+        """
+        with self._lock:
+            folder_ids = {folder["name"]: folder_id for folder_id, folder in self.folders.items()}
+            for folder_name, flow_data in flows:
+                if folder_name and folder_name not in folder_ids:
+                    folder_ids[folder_name] = self._create_folder({"name": folder_name})["id"]
+                self._create_flow(flow_data, folder_ids.get(folder_name))
+
+    def _unique_name(self, name: str, existing_names: Iterable[str]) -> str:
+        """Dédoublonne un nom comme Langflow ("Nom (1)", "Nom (2)"...)."""
+        existing_names = set(existing_names)
+        unique_name = name
+        suffix = 1
+        while unique_name in existing_names:
+            unique_name = f"{name} ({suffix})"
+            suffix += 1
+        return unique_name
+
+    def _create_flow(self, flow_data: Dict[str, Any], folder_id: Optional[str] = None) -> Dict[str, Any]:
+        """Crée un flow; l'ID fourni est conservé s'il est valide et libre."""
+        flow_id = flow_data.get("id")
+        try:
+            flow_id = str(uuid.UUID(flow_id)) if flow_id else None
+        except ValueError:
+            flow_id = None
+        if not flow_id or flow_id in self.flows:
+            flow_id = str(uuid.uuid4())
+        flow = {
+            **flow_data,
+            "id": flow_id,
+            "name": self._unique_name(flow_data.get("name") or "Untitled", (flow["name"] for flow in self.flows.values())),
+            "folder_id": flow_data.get("folder_id") or folder_id,
+            "updated_at": _now()
+        }
+        self.flows[flow_id] = flow
+        return flow
+
+    def _create_folder(self, folder_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Crée un dossier et y range les flows listés."""
+        folder_id = str(uuid.uuid4())
+        folder = {
+            "id": folder_id,
+            "name": self._unique_name(folder_data.get("name") or "New Folder", (folder["name"] for folder in self.folders.values())),
+            "description": folder_data.get("description", ""),
+            "parent_id": None
+        }
+        self.folders[folder_id] = folder
+        self._move_flows(folder_data.get("flows_list") or [], folder_id)
+        return folder
+
+    def _move_flows(self, flow_ids: List[str], folder_id: str) -> None:
+        """Range des flows dans un dossier."""
+        for flow_id in flow_ids:
+            if flow_id in self.flows:
+                self.flows[flow_id]["folder_id"] = folder_id
+                self.flows[flow_id]["updated_at"] = _now()
+
+    def _list_flows(self, query: Dict[str, str]) -> Any:
+        """Liste les flows: liste complète (get_all, en-têtes seuls avec header_flows) ou page de flows."""
+        flows = [flow for flow in self.flows.values() if not query.get("folder_id") or flow["folder_id"] == query["folder_id"]]
+        if query.get("get_all", "true") == "true":
+            # Comme Langflow, header_flows n'est appliqué qu'au listing complet
+            if query.get("header_flows") == "true":
+                flows = [{field: flow.get(field) for field in FLOW_HEADER_FIELDS} for flow in flows]
+            return flows
+        size = max(1, int(query.get("size", 50)))
+        page = max(1, int(query.get("page", 1)))
+        pages = max(1, (len(flows) + size - 1) // size)
+        return {"items": flows[(page - 1) * size:page * size], "total": len(flows), "page": page, "size": size, "pages": pages}
+
+    def handle(self, method: str, path: str, query: Dict[str, str], headers: Any, body: bytes) -> Tuple[int, Any]:
+        """Traite une requête de l'API Langflow (voir FakeServer.handle)."""
+        if path.rstrip("/") == "/api/v1/flows":
+            if method == "GET":
+                return 200, self._list_flows(query)
+            if method == "POST":
+                return 201, self._create_flow(json.loads(body))
+        if path.rstrip("/") == "/api/v1/flows/batch" and method == "POST":
+            return 201, [self._create_flow(flow_data) for flow_data in json.loads(body)["flows"]]
+        if path.rstrip("/") == "/api/v1/flows/upload" and method == "POST":
+            _, content = parse_multipart(headers.get("Content-Type", ""), body)["file"]
+            file_data = json.loads(content)
+            flows = file_data["flows"] if "flows" in file_data else [file_data]
+            return 201, [self._create_flow(flow_data, query.get("folder_id")) for flow_data in flows]
+        if path.rstrip("/") == "/api/v1/folders":
+            if method == "GET":
+                return 200, list(self.folders.values())
+            if method == "POST":
+                return 201, self._create_folder(json.loads(body))
+
+        match = FLOW_ROUTE.match(path)
+        if match:
+            flow = self.flows.get(match.group(1))
+            if flow is None:
+                return 404, {"detail": "Flow not found"}
+            if method == "GET":
+                return 200, flow
+            if method == "PATCH":
+                flow.update({key: value for key, value in json.loads(body).items() if key != "id"})
+                flow["updated_at"] = _now()
+                return 200, flow
+            if method == "DELETE":
+                del self.flows[flow["id"]]
+                return 200, {"message": "Flow deleted successfully"}
+
+        match = FOLDER_ROUTE.match(path)
+        if match:
+            folder = self.folders.get(match.group(1))
+            if folder is None:
+                return 404, {"detail": "Folder not found"}
+            if method == "GET":
+                flows = [flow for flow in self.flows.values() if flow["folder_id"] == folder["id"]]
+                return 200, {**folder, "flows": flows, "components": []}
+            if method == "PATCH":
+                folder_data = json.loads(body)
+                folder.update({key: folder_data[key] for key in ("name", "description") if key in folder_data})
+                self._move_flows(folder_data.get("flows") or [], folder["id"])
+                return 200, folder
+            if method == "DELETE":
+                # Comme Langflow, les flows du dossier sont supprimés avec lui
+                for flow_id in [flow_id for flow_id, flow in self.flows.items() if flow["folder_id"] == folder["id"]]:
+                    del self.flows[flow_id]
+                del self.folders[folder["id"]]
+                return 204, None
+        return 404, {"detail": "Not Found"}
+
+class FakeOpenWebUIServer(FakeServer):
+    """Serveur OpenWebUI simulé: pipelines (/api/v1/pipelines), identifiés par leur nom de fichier."""
+
+    def __init__(self, latency: float = 0.0):
+        """
+        Initialise un serveur OpenWebUI sans pipeline.
+
+        Args:
+            latency: Latence simulée de chaque requête, en secondes.
+        """
+        super().__init__(latency)
+        self.pipelines = {} # ID -> pipeline
+
+    def seed(self, flow_names: Iterable[str]) -> None:
+        """
+        Crée les pipelines de flows sans passer par l'API (état initial d'un scénario).
+
+        Args:
+            flow_names: Noms des flows dont les pipelines existent.
+        """
+        with self._lock:
+            for flow_name in flow_names:
+                pipeline_id = derive_pipeline_name(flow_name)
+                self.pipelines[pipeline_id] = {"id": pipeline_id, "name": flow_name, "type": "pipe"}
+
+    def handle(self, method: str, path: str, query: Dict[str, str], headers: Any, body: bytes) -> Tuple[int, Any]:
+        """Traite une requête de l'API OpenWebUI (voir FakeServer.handle)."""
+        if path.rstrip("/") == "/api/v1/pipelines" and method == "GET":
+            return 200, {"data": list(self.pipelines.values())}
+        if path == "/api/v1/pipelines/upload" and method == "POST":
+            file_name, _ = parse_multipart(headers.get("Content-Type", ""), body)["file"]
+            pipeline_id = os.path.splitext(file_name)[0]
+            self.pipelines[pipeline_id] = {"id": pipeline_id, "name": pipeline_id, "type": "pipe"}
+            return 200, self.pipelines[pipeline_id]
+        if path == "/api/v1/pipelines/delete" and method == "DELETE":
+            pipeline_id = json.loads(body).get("id")
+            if self.pipelines.pop(pipeline_id, None) is None:
+                return 404, {"detail": "Pipeline not found"}
+            return 200, {"status": True}
+        return 404, {"detail": "Not Found"}
@@ -0,0 +1,212 @@
+import argparse
+import json
+import os
+import shlex
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Any, Optional
+
+from .fake_servers import FakeLangflowServer, FakeOpenWebUIServer
+from .scenarios import SCENARIOS, generate_flows, load_templates, prepare_scenario
+
+# Module de synchronisation, exécuté dans un processus dédié via CHILD_MODULE (mesure de la mémoire
+# et du démarrage)
+SYNC_MODULE = f"{__package__.rsplit('.', 1)[0]}.main"
+CHILD_MODULE = f"{__package__}.child"
+# Répertoire depuis lequel le module de synchronisation est importable
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+DEFAULT_SIZES = (10, 100, 1000)
+
+def run_sync_process(sync_args: List[str], log_path: str) -> Dict[str, Any]:
+    """
+    Exécute une synchronisation dans un processus dédié.
+
+    Args:
+        sync_args: Arguments de la synchronisation.
+        log_path: Fichier recevant la sortie du processus.
+
+    Returns:
+        Dict[str, Any]: Code de sortie, durée totale (démarrage et imports compris) et pic de mémoire
+        résidente du processus en Mo (None si elle n'a pas pu être mesurée).
+    """
+    peak_rss_path = f"{log_path}.rss"
+    command = [sys.executable, "-m", CHILD_MODULE, peak_rss_path, SYNC_MODULE, *sync_args]
+    start = time.perf_counter()
+    with open(log_path, "w", encoding="utf-8") as log_file:
+        exit_code = subprocess.run(command, cwd=PACKAGE_ROOT, stdout=log_file, stderr=subprocess.STDOUT).returncode
+    wall_time = time.perf_counter() - start
+
+    peak_rss = None
+    try:
+        with open(peak_rss_path, "r", encoding="utf-8") as file:
+            peak_rss = round(int(file.read()) / 1024, 1)
+    except (OSError, ValueError):
+        pass
+    return {"exit_code": exit_code, "wall_time": round(wall_time, 3), "peak_rss_mb": peak_rss}
+
+def run_scenario(scenario: str, flow_count: int, work_dir: str, latency: float, templates: List[Dict[str, Any]],
+                 sync_args: List[str]) -> Dict[str, Any]:
+    """
+    Exécute un scénario: dépôt synthétique, serveurs simulés dans l'état initial du scénario, puis
+    synchronisation du commit de départ au commit d'arrivée.
+
+    Args:
+        scenario: Nom du scénario (voir SCENARIOS).
+        flow_count: Nombre de flows du dépôt synthétique.
+        work_dir: Répertoire de travail (dépôt, rapport et journal de la synchronisation).
+        latency: Latence simulée de chaque requête, en secondes.
+        templates: Flows modèles.
+        sync_args: Arguments supplémentaires de la synchronisation.
+
+    Returns:
+        Dict[str, Any]: Mesures du scénario (durées, appels par serveur et par route, pic de mémoire).
+    """
+    run_name = f"{scenario}-{flow_count}"
+    repo_dir = os.path.join(work_dir, run_name)
+    report_path = os.path.join(work_dir, f"{run_name}.report.json")
+    before_commit, after_commit = prepare_scenario(scenario, repo_dir, flow_count, templates)
+
+    langflow = FakeLangflowServer(latency)
+    openwebui = FakeOpenWebUIServer(latency)
+    if SCENARIOS[scenario][1]:
+        langflow.seed((folder_name, flow_data) for folder_name, _, flow_data in generate_flows(flow_count, templates))
+        openwebui.seed(flow_data["name"] for _, _, flow_data in generate_flows(flow_count, templates))
+    langflow.start()
+    openwebui.start()
+    try:
+        result = run_sync_process([
+            "--repo-path", repo_dir,
+            "--before-commit", before_commit,
+            "--after-commit", after_commit,
+            "--langflow-url", langflow.url,
+            "--enable-openwebui",
+            "--openwebui-url", openwebui.url,
+            "--openwebui-api-key", "benchmark",
+            "--report-path", report_path,
+            *sync_args
+        ], os.path.join(work_dir, f"{run_name}.log"))
+    finally:
+        langflow.stop()
+        openwebui.stop()
+
+    sync_time = None
+    failed_tasks = None
+    try:
+        with open(report_path, "r", encoding="utf-8") as file:
+            report = json.load(file)
+        sync_time = report["duration"]
+        failed_tasks = sum(len(target.get("failed_tasks", [])) for target in report["targets"].values())
+    except (OSError, ValueError, KeyError):
+        pass
+    return {
+        "scenario": scenario,
+        "flows": flow_count,
+        **result,
+        "sync_time": sync_time,
+        "failed_tasks": failed_tasks,
+        "calls": {
+            "langflow": dict(sorted(langflow.calls.items())),
+            "openwebui": dict(sorted(openwebui.calls.items()))
+        },
+        "total_calls": sum(langflow.calls.values()) + sum(openwebui.calls.values()),
+        "bytes_received": langflow.bytes_received + openwebui.bytes_received,
+        "remote_flows": len(langflow.flows),
+        "remote_pipelines": len(openwebui.pipelines)
+    }
+
+def compare_results(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]], tolerance: float) -> List[str]:
+    """
+    Compare des mesures à celles d'une exécution de référence.
+
+    Args:
+        results: Mesures de l'exécution.
+        baseline: Mesures de référence.
+        tolerance: Hausse relative tolérée de la durée et de la mémoire (ex: 0.25 pour 25 %).
+
+    Returns:
+        List[str]: Régressions détectées (appels supplémentaires, durée ou mémoire au-delà de la tolérance).
+    """
+    reference = {(result["scenario"], result["flows"]): result for result in baseline}
+    regressions = []
+    for result in results:
+        previous = reference.get((result["scenario"], result["flows"]))
+        if previous is None:
+            continue
+        run_name = f"{result['scenario']}-{result['flows']}"
+        if result["total_calls"] > previous["total_calls"]:
+            regressions.append(f"{run_name}: {result['total_calls']} appels (référence: {previous['total_calls']})")
+        for metric in ("wall_time", "peak_rss_mb"):
+            if previous.get(metric) and result[metric] and result[metric] > previous[metric] * (1 + tolerance):
+                regressions.append(f"{run_name}: {metric} {result[metric]} (référence: {previous[metric]})")
+    return regressions
+
+def format_results(results: List[Dict[str, Any]]) -> str:
+    """
+    Met en forme les mesures dans un tableau Markdown.
+
+    Args:
+        results: Mesures des scénarios.
+
+    Returns:
+        str: Tableau des mesures.
+    """
+    lines = [
+        "| Scénario | Flows | Durée (s) | Synchro (s) | Appels Langflow | Appels OpenWebUI | Pic RSS (Mo) | Échecs |",
+        "|---|---:|---:|---:|---:|---:|---:|---:|"
+    ]
+    for result in results:
+        sync_time = "-" if result["sync_time"] is None else f"{result['sync_time']:.2f}"
+        peak_rss = "-" if result["peak_rss_mb"] is None else f"{result['peak_rss_mb']:.1f}"
+        failures = "-" if result["failed_tasks"] is None else result["failed_tasks"]
+        if result["exit_code"]:
+            failures = f"{failures} (code {result['exit_code']})"
+        lines.append(
+            f"| {result['scenario']} | {result['flows']} | {result['wall_time']:.2f} | {sync_time} "
+            f"| {sum(result['calls']['langflow'].values())} | {sum(result['calls']['openwebui'].values())} "
+            f"| {peak_rss} | {failures} |"
+        )
+    return "\n".join(lines)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Point d'entrée du banc de performance de la synchronisation."""
+    parser = argparse.ArgumentParser(description="Mesure les performances de la synchronisation face à des serveurs Langflow et OpenWebUI simulés.")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS), help="Scénarios exécutés (défaut: tous)")
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(DEFAULT_SIZES), help="Nombres de flows des dépôts synthétiques (défaut: 10 100 1000)")
+    parser.add_argument("--latency", type=float, default=0.005, help="Latence simulée de chaque requête en secondes (défaut: 0.005)")
+    parser.add_argument("--work-dir", help="Répertoire de travail conservé après l'exécution (défaut: répertoire temporaire)")
+    parser.add_argument("--sync-args", default="", help="Arguments supplémentaires de la synchronisation (ex: \"--max-workers 8\")")
+    parser.add_argument("--output", help="Fichier JSON des mesures")
+    parser.add_argument("--compare", help="Fichier JSON de mesures de référence; code de sortie 1 en cas de régression")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Hausse relative tolérée de la durée et de la mémoire (défaut: 0.25)")
+    args = parser.parse_args(argv)
+
+    templates = load_templates()
+    results = []
+    with tempfile.TemporaryDirectory(prefix="sync-benchmark-") as temp_dir:
+        work_dir = args.work_dir or temp_dir
+        os.makedirs(work_dir, exist_ok=True)
+        for flow_count in args.sizes:
+            for scenario in args.scenarios:
+                print(f"{scenario} ({flow_count} flows)...", file=sys.stderr)
+                results.append(run_scenario(
+                    scenario, flow_count, work_dir, args.latency, templates, shlex.split(args.sync_args)
+                ))
+    print(format_results(results))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2, ensure_ascii=False)
+    exit_code = 1 if any(result["exit_code"] for result in results) else 0
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as file:
+            regressions = compare_results(results, json.load(file), args.tolerance)
+        for regression in regressions:
+            print(f"Régression: {regression}", file=sys.stderr)
+        if regressions:
+            exit_code = 1
+    return exit_code
+
+if __name__ == "__main__":
+    sys.exit(main())
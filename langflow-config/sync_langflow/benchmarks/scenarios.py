@@ -0,0 +1,181 @@
+import copy
+import glob
+import json
+import os
+import subprocess
+import uuid
+from typing import Dict, Iterator, List, Any, Optional, Tuple
+
+from ..processing.normalize import format_flow
+
+# Flows réels servant de modèles aux flows générés (environ 95 Ko chacun)
+TEMPLATES_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Répertoire des flows dans les dépôts générés, comme dans le dépôt réel
+FLOWS_DIR = os.path.join("langflow-config", "flows")
+# Nombre de flows par dossier Langflow
+FLOWS_PER_FOLDER = 10
+# Espace de noms des IDs des flows générés: un même flow garde le même ID d'un dépôt à l'autre
+FLOW_ID_NAMESPACE = uuid.UUID("5b0c3a52-8d52-4f8e-9d0e-6f1b5b0e4c21")
+
+# Scénarios: (description, flows présents dans Langflow et OpenWebUI avant la synchronisation)
+SCENARIOS = {
+    "full_add": ("Ajout de tous les flows dans des instances vides", False),
+    "layout_modify": ("Déplacement des nœuds de tous les flows (modification de mise en page seule)", True),
+    "rename_storm": ("Renommage de tous les flows (fichier et nom, ID conservé)", True),
+    "delete": ("Suppression de tous les flows", True),
+    "noop": ("Commit sans aucun flow modifié", True)
+}
+
+def load_templates(templates_dir: str = TEMPLATES_DIR) -> List[Dict[str, Any]]:
+    """
+    Charge les flows modèles.
+
+    Args:
+        templates_dir: Répertoire des flows modèles.
+
+    Returns:
+        List[Dict[str, Any]]: Contenu des flows modèles, triés par nom de fichier.
+
+    Raises:
+        FileNotFoundError: Si le répertoire ne contient aucun flow.
+    """
+    templates = []
+    for template_path in sorted(glob.glob(os.path.join(templates_dir, "*.json"))):
+        with open(template_path, "r", encoding="utf-8") as file:
+            templates.append(json.load(file))
+    if not templates:
+        raise FileNotFoundError(f"Aucun flow modèle dans {templates_dir}")
+    return templates
+
+def generate_flows(flow_count: int, templates: List[Dict[str, Any]], layout_shift: float = 0.0,
+                   renamed: bool = False) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+    """
+    Génère les flows d'un dépôt synthétique, un par un.
+
+    Chaque flow reprend le graphe d'un modèle avec un ID, un nom et un endpoint propres; le graphe
+    n'est copié que si la mise en page est modifiée (les flows générés le partagent sinon).
+
+    Args:
+        flow_count: Nombre de flows.
+        templates: Flows modèles, utilisés à tour de rôle.
+        layout_shift: Décalage appliqué à la position de chaque nœud.
+        renamed: Si True, les flows portent un autre nom (et donc un autre fichier).
+
+    Yields:
+        Tuple[str, str, Dict[str, Any]]: Dossier, chemin relatif au dépôt et contenu de chaque flow.
+    """
+    for index in range(flow_count):
+        template = templates[index % len(templates)]
+        flow_name = f"Bench {'Renamed' if renamed else 'Flow'} {index:04d}"
+        folder_name = f"Folder {index // FLOWS_PER_FOLDER:03d}"
+        flow_data = {
+            **template,
+            "id": str(uuid.uuid5(FLOW_ID_NAMESPACE, str(index))),
+            "name": flow_name,
+            "endpoint_name": f"bench_flow_{index:04d}"
+        }
+        if layout_shift:
+            flow_data["data"] = copy.deepcopy(template["data"])
+            for node in flow_data["data"].get("nodes", []):
+                position = node.get("position")
+                if isinstance(position, dict):
+                    node["position"] = {"x": position.get("x", 0) + layout_shift, "y": position.get("y", 0) + layout_shift}
+        yield folder_name, os.path.join(FLOWS_DIR, folder_name, f"{flow_name}.json"), flow_data
+
+class SyntheticRepo:
+    """Dépôt Git synthétique d'un scénario de benchmark."""
+
+    def __init__(self, repo_dir: str):
+        """
+        Initialise un dépôt Git vide.
+
+        Args:
+            repo_dir: Répertoire du dépôt (créé s'il n'existe pas).
+        """
+        self.repo_dir = repo_dir
+        os.makedirs(os.path.join(repo_dir, FLOWS_DIR), exist_ok=True)
+        self._git("init", "--quiet")
+
+    def _git(self, *args: str) -> str:
+        """Exécute une commande Git dans le dépôt et retourne sa sortie."""
+        command = ["git", "-c", "user.name=benchmark", "-c", "user.email=benchmark@localhost", *args]
+        return subprocess.run(command, cwd=self.repo_dir, check=True, capture_output=True, text=True).stdout.strip()
+
+    def write_flows(self, flows: Iterator[Tuple[str, str, Dict[str, Any]]]) -> None:
+        """
+        Écrit des flows dans leur forme canonique.
+
+        Args:
+            flows: Flows générés (voir generate_flows).
+        """
+        for _, flow_path, flow_data in flows:
+            full_path = os.path.join(self.repo_dir, flow_path)
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            with open(full_path, "w", encoding="utf-8") as file:
+                file.write(format_flow(flow_data))
+
+    def remove_flows(self, flows: Iterator[Tuple[str, str, Dict[str, Any]]]) -> None:
+        """
+        Supprime des flows du dépôt.
+
+        Args:
+            flows: Flows générés (voir generate_flows).
+        """
+        for _, flow_path, _ in flows:
+            os.remove(os.path.join(self.repo_dir, flow_path))
+
+    def commit(self, message: str) -> str:
+        """
+        Enregistre toutes les modifications du dépôt dans un commit.
+
+        Args:
+            message: Message du commit.
+
+        Returns:
+            str: SHA du commit.
+        """
+        readme_path = os.path.join(self.repo_dir, "README.md")
+        with open(readme_path, "a", encoding="utf-8") as file:
+            file.write(f"{message}\n")
+        self._git("add", "--all")
+        self._git("commit", "--quiet", "-m", message)
+        return self._git("rev-parse", "HEAD")
+
+def prepare_scenario(scenario: str, repo_dir: str, flow_count: int,
+                     templates: Optional[List[Dict[str, Any]]] = None) -> Tuple[str, str]:
+    """
+    Crée le dépôt synthétique d'un scénario: un commit de départ et un commit d'arrivée, dont la
+    copie de travail est laissée au commit d'arrivée.
+
+    Args:
+        scenario: Nom du scénario (voir SCENARIOS).
+        repo_dir: Répertoire du dépôt.
+        flow_count: Nombre de flows générés.
+        templates: Flows modèles (par défaut: load_templates()).
+
+    Returns:
+        Tuple[str, str]: Commits de départ et d'arrivée.
+
+    Raises:
+        ValueError: Si le scénario est inconnu.
+    """
+    if scenario not in SCENARIOS:
+        raise ValueError(f"Scénario inconnu: {scenario} (disponibles: {', '.join(SCENARIOS)})")
+    templates = templates or load_templates()
+    repo = SyntheticRepo(repo_dir)
+
+    if scenario != "full_add":
+        repo.write_flows(generate_flows(flow_count, templates))
+    before_commit = repo.commit(f"{scenario}: état initial")
+
+    if scenario == "full_add":
+        repo.write_flows(generate_flows(flow_count, templates))
+    elif scenario == "layout_modify":
+        repo.write_flows(generate_flows(flow_count, templates, layout_shift=40.0))
+    elif scenario == "rename_storm":
+        repo.remove_flows(generate_flows(flow_count, templates))
+        repo.write_flows(generate_flows(flow_count, templates, renamed=True))
+    elif scenario == "delete":
+        repo.remove_flows(generate_flows(flow_count, templates))
+    after_commit = repo.commit(f"{scenario}: {SCENARIOS[scenario][0]}")
+    return before_commit, after_commit
@@ -0,0 +1,144 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger("sync_app")
+
+# Sous-répertoire des entrées: les autres fichiers du répertoire de cache (index des flows,
+# rapport, journal) ne sont jamais comptés ni évincés
+ENTRIES_DIR = "responses"
+
+class ResponseCache:
+    """Cache disque des réponses GET de l'API Langflow, revalidées par requêtes conditionnelles."""
+
+    def __init__(self, cache_dir: str, max_bytes: int = 100 * 1024 * 1024):
+        """
+        Initialise le cache de réponses.
+
+        Le répertoire des entrées n'est parcouru qu'une fois, à l'initialisation: la taille
+        totale et l'ordre d'utilisation des entrées sont ensuite tenus à jour en mémoire.
+
+        Args:
+            cache_dir: Répertoire du cache; les entrées sont stockées dans son sous-répertoire ENTRIES_DIR.
+            max_bytes: Taille maximale des entrées sur disque, au-delà de laquelle les entrées
+                les moins récemment utilisées sont évincées.
+        """
+        self.cache_dir = cache_dir
+        self.entries_dir = os.path.join(cache_dir, ENTRIES_DIR)
+        self.max_bytes = max_bytes
+        os.makedirs(self.entries_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._sizes = OrderedDict() # Clé -> taille de l'entrée, de la moins à la plus récemment utilisée
+        self._total_size = 0
+        entries = []
+        for entry in os.scandir(self.entries_dir):
+            if entry.is_file() and entry.name.endswith(".json"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime_ns, entry.name[:-len(".json")], stat.st_size))
+        for _, key, size in sorted(entries):
+            self._sizes[key] = size
+            self._total_size += size
+
+    @staticmethod
+    def make_key(url: str, params: Optional[Dict[str, Any]] = None, auth_scope: str = "") -> str:
+        """
+        Calcule la clé d'une entrée à partir de l'URL, des paramètres et de la portée d'authentification.
+
+        Args:
+            url: URL de la requête.
+            params: Paramètres de la requête (optionnel).
+            auth_scope: Empreinte du jeton utilisé, pour ne jamais partager une réponse entre deux comptes.
+
+        Returns:
+            str: Clé hexadécimale de l'entrée.
+        """
+        raw_key = json.dumps([auth_scope, url, sorted((params or {}).items())])
+        return hashlib.sha256(raw_key.encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.entries_dir, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Lit une entrée du cache.
+
+        Args:
+            key: Clé de l'entrée.
+
+        Returns:
+            Optional[Dict[str, Any]]: Entrée (body, etag, last_modified, watermark) ou None si absente.
+        """
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, "r", encoding="utf-8") as file:
+                entry = json.load(file)
+            # Marquer l'entrée comme récemment utilisée pour l'éviction LRU (sur disque pour les
+            # synchronisations suivantes)
+            os.utime(entry_path, None)
+            with self._lock:
+                if key in self._sizes:
+                    self._sizes.move_to_end(key)
+            return entry
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Entrée de cache illisible ({entry_path}), elle sera ignorée: {e}")
+            return None
+
+    def put(self, key: str, body: Any, etag: Optional[str] = None, last_modified: Optional[str] = None,
+            watermark: Optional[str] = None) -> None:
+        """
+        Enregistre une entrée dans le cache puis applique la limite de taille.
+
+        Args:
+            key: Clé de l'entrée.
+            body: Corps JSON décodé de la réponse.
+            etag: En-tête ETag renvoyé par le serveur (optionnel).
+            last_modified: En-tête Last-Modified renvoyé par le serveur (optionnel).
+            watermark: Valeur updated_at de la ressource, utilisée quand le serveur ne fournit aucun validateur.
+        """
+        entry = {
+            "stored_at": time.time(),
+            "etag": etag,
+            "last_modified": last_modified,
+            "watermark": watermark,
+            "body": body
+        }
+        entry_path = self._entry_path(key)
+        # Fichier temporaire propre au thread: plusieurs requêtes peuvent écrire la même entrée
+        temp_path = f"{entry_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            content = json.dumps(entry, separators=(",", ":")).encode("utf-8")
+            with open(temp_path, "wb") as file:
+                file.write(content)
+            # Remplacement atomique pour ne jamais laisser une entrée tronquée
+            os.replace(temp_path, entry_path)
+        except Exception as e:
+            logger.warning(f"Impossible d'écrire l'entrée de cache {entry_path}: {e}")
+            return
+        with self._lock:
+            self._total_size += len(content) - self._sizes.pop(key, 0)
+            self._sizes[key] = len(content)
+            self._evict()
+
+    def _evict(self) -> None:
+        """
+        Supprime les entrées les moins récemment utilisées tant que le cache dépasse sa taille
+        maximale (appelée avec le verrou du cache).
+        """
+        while self._total_size > self.max_bytes and self._sizes:
+            key, size = self._sizes.popitem(last=False)
+            self._total_size -= size
+            path = self._entry_path(key)
+            try:
+                os.remove(path)
+                logger.debug(f"Entrée de cache évincée: {path}")
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Impossible d'évincer l'entrée de cache {path}: {e}")
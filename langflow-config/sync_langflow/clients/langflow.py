@@ -1,23 +1,79 @@
+import gzip
+import hashlib
+import os
 import requests
 import logging
-from typing import Dict, List, Any, Optional
+import zlib
+from typing import Dict, Iterator, List, Any, Optional, Tuple
 from requests.exceptions import RequestException
 
+from .cache import ResponseCache
+
 logger = logging.getLogger("sync_app")
 
+# Champs conservés pour les listings légers (sans le graphe "data")
+FLOW_HEADER_FIELDS = ("id", "name", "folder_id", "endpoint_name", "updated_at")
+
+# Taille des blocs lus depuis le disque lors des envois de fichiers de flows
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# Termes qui, dans une réponse 400, désignent un refus du corps compressé (et non un flow invalide)
+GZIP_REJECTION_MARKERS = ("gzip", "content-encoding", "compress")
+
+def iter_gzip_chunks(file_path: str, chunk_size: int = UPLOAD_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Lit un fichier par blocs et le compresse en gzip à la volée.
+    
+    Args:
+        file_path: Chemin du fichier à compresser.
+        chunk_size: Taille des blocs lus.
+        
+    Yields:
+        bytes: Blocs compressés.
+    """
+    compressor = zlib.compressobj(wbits=31) # 31: en-tête et pied de page gzip
+    with open(file_path, "rb") as file:
+        while True:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                break
+            compressed = compressor.compress(chunk)
+            if compressed:
+                yield compressed
+    yield compressor.flush()
+
+class NotFoundError(Exception):
+    """Ressource absente de Langflow (réponse 404)."""
+
 class LangflowClient:
     """Client pour interagir avec l'API Langflow."""
 
-    def __init__(self, base_url: str, api_token: Optional[str] = None):
+    def __init__(self, base_url: str, api_token: Optional[str] = None, cache: Optional[ResponseCache] = None,
+                 compress_requests: bool = False):
         """
         Initialise le client Langflow.
         
         Args:
             base_url: URL de base de l'API Langflow.
             api_token: Token d'API pour l'authentification (optionnel).
+            cache: Cache disque des réponses GET (optionnel).
+            compress_requests: Si True, les fichiers de flows sont envoyés compressés en gzip
+                tant que le serveur les accepte.
         """
         self.base_url = base_url.rstrip("/")
         self.api_token = api_token
+        self.cache = cache
+        self.compress_requests = compress_requests
+        # Capacités du serveur découvertes à l'usage (None: pas encore testé)
+        self.file_upload_supported = None
+        self.batch_create_supported = None
+        # Passe à True dès qu'un corps compressé a été accepté: les erreurs suivantes ne sont plus
+        # interprétées comme un refus de la compression
+        self.gzip_accepted = False
+        # Session partagée: les connexions HTTP sont réutilisées d'une requête à l'autre
+        self.session = requests.Session()
+        # Empreinte du jeton: les réponses en cache ne sont jamais partagées entre deux comptes
+        self._auth_scope = hashlib.sha256(api_token.encode("utf-8")).hexdigest()[:16] if api_token else "anonymous"
         self.headers = {
             "accept": "application/json",
             "Content-Type": "application/json"
@@ -38,7 +94,8 @@ class LangflowClient:
             Dict[str, Any]: Données de la réponse.
             
         Raises:
-            Exception: Si la réponse contient une erreur.
+            NotFoundError: Si la ressource n'existe pas (404).
+            Exception: Si la réponse contient une autre erreur.
         """
         try:
             response.raise_for_status()
@@ -51,61 +108,147 @@ class LangflowClient:
                     error_msg = f"Erreur API Langflow ({response.url}): {error_data['detail']}"
             except:
                 pass
+            if response.status_code == 404:
+                # Une ressource absente est une réponse attendue des recherches par ID: l'appelant décide
+                logger.debug(error_msg)
+                raise NotFoundError(error_msg)
             logger.error(error_msg)
             raise Exception(error_msg)
     
-    def get_flows(self, folder_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    def _get(self, url: str, params: Optional[Dict[str, Any]] = None, watermark: Optional[str] = None) -> Any:
         """
-        Récupère la liste des flows.
+        Effectue une requête GET en passant par le cache disque s'il est configuré.
+        
+        La réponse en cache est revalidée avec If-None-Match/If-Modified-Since lorsque
+        le serveur a fourni un ETag ou un Last-Modified. À défaut, si un watermark
+        (updated_at) est fourni et correspond à celui de l'entrée, la réponse en cache
+        est renvoyée sans appel réseau.
         
         Args:
-            folder_id: ID du dossier pour filtrer les flows (optionnel).
+            url: URL de la requête.
+            params: Paramètres de la requête (optionnel).
+            watermark: Valeur updated_at connue de la ressource (optionnel).
             
         Returns:
-            List[Dict[str, Any]]: Liste des flows.
+            Any: Données de la réponse.
+            
+        Raises:
+            Exception: Si la réponse contient une erreur.
         """
+        if self.cache is None:
+            response = self.session.get(url, headers=self.headers, params=params)
+            return self._handle_response(response)
+        
+        key = self.cache.make_key(url, params, self._auth_scope)
+        entry = self.cache.get(key)
+        headers = dict(self.headers)
+        
+        if entry:
+            if watermark and entry.get("watermark") == watermark:
+                logger.debug(f"Cache valide pour {url} (updated_at: {watermark})")
+                return entry["body"]
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        
+        response = self.session.get(url, headers=headers, params=params)
+        if entry and response.status_code == 304:
+            logger.debug(f"Réponse non modifiée pour {url}, utilisation du cache")
+            return entry["body"]
+        
+        body = self._handle_response(response)
+        body_watermark = body.get("updated_at") if isinstance(body, dict) else None
+        self.cache.put(
+            key,
+            body,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+            watermark=body_watermark
+        )
+        return body
+    
+    def iter_flow_headers(self, folder_id: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Parcourt les flows en ne conservant que leurs métadonnées.
+        
+        Langflow ne tronque les flows à leurs en-têtes (header_flows) que sur le listing complet
+        (get_all): une seule requête est donc envoyée, dont la réponse ne contient aucun graphe.
+        De chaque élément, seuls les champs de FLOW_HEADER_FIELDS sont conservés.
+        
+        Args:
+            folder_id: ID du dossier pour filtrer les flows (optionnel).
+            
+        Yields:
+            Dict[str, Any]: Métadonnées d'un flow (id, name, folder_id, endpoint_name, updated_at).
+            
+        Raises:
+            Exception: Si la liste des flows n'a pas pu être récupérée. Une liste partielle ferait
+            passer des flows existants pour absents (et provoquerait des créations en double).
+        """
+        url = f"{self.base_url}/api/v1/flows/"
         params = {
             "remove_example_flows": "true",
             "components_only": "false",
             "get_all": "true",
-            "header_flows": "false",
-            "page": "1",
-            "size": "50" # TODO: Gérer la pagination si nécessaire
+            "header_flows": "true"
         }
-        
         if folder_id:
             params["folder_id"] = folder_id
-            params["get_all"] = "false"
-        
-        url = f"{self.base_url}/api/v1/flows/"
         
         try:
             logger.debug(f"GET {url} avec params: {params}")
-            response = requests.get(url, headers=self.headers, params=params)
-            return self._handle_response(response)
+            payload = self._get(url, params=params)
         except Exception as e:
-            logger.error(f"Erreur lors de la récupération des flows: {e}")
-            return []
+            logger.error(f"Erreur lors de la récupération des en-têtes de flows: {e}")
+            raise
+        
+        # Réponse paginée d'un serveur qui ignorerait get_all: elle serait incomplète
+        if not isinstance(payload, list):
+            raise Exception(f"Réponse inattendue pour la liste des en-têtes de flows: {type(payload).__name__}")
+        
+        for item in payload:
+            yield {field: item.get(field) for field in FLOW_HEADER_FIELDS}
     
-    def get_flow_by_id(self, flow_id: str) -> Optional[Dict[str, Any]]:
+    def get_flow_by_id(self, flow_id: str, updated_at: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """
         Récupère un flow par son ID.
         
         Args:
             flow_id: ID du flow.
+            updated_at: Date de mise à jour connue du flow; si elle correspond à la copie
+                en cache, aucun appel réseau n'est effectué (optionnel).
             
         Returns:
             Optional[Dict[str, Any]]: Données du flow ou None si non trouvé.
         """
+        found, flow_data = self.get_flow_if_exists(flow_id, updated_at)
+        if not found:
+            logger.error(f"Flow {flow_id} introuvable dans Langflow")
+        return flow_data
+    
+    def get_flow_if_exists(self, flow_id: str, updated_at: Optional[str] = None) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """
+        Récupère un flow par son ID en distinguant un flow absent d'une erreur.
+        
+        Args:
+            flow_id: ID du flow.
+            updated_at: Date de mise à jour connue du flow (voir get_flow_by_id, optionnel).
+            
+        Returns:
+            Tuple[bool, Optional[Dict[str, Any]]]: Tuple contenant un booléen indiquant si le flow
+            existe (False uniquement sur une réponse 404) et les données du flow (None en cas d'erreur).
+        """
         url = f"{self.base_url}/api/v1/flows/{flow_id}"
         
         try:
             logger.debug(f"GET {url}")
-            response = requests.get(url, headers=self.headers)
-            return self._handle_response(response)
+            return True, self._get(url, watermark=updated_at)
+        except NotFoundError:
+            return False, None
         except Exception as e:
             logger.error(f"Erreur lors de la récupération du flow {flow_id}: {e}")
-            return None
+            return True, None
     
     def create_flow(self, flow_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
@@ -121,12 +264,174 @@ class LangflowClient:
         
         try:
             logger.debug(f"POST {url}")
-            response = requests.post(url, headers=self.headers, json=flow_data)
+            response = self.session.post(url, headers=self.headers, json=flow_data)
             return self._handle_response(response)
         except Exception as e:
             logger.error(f"Erreur lors de la création du flow: {e}")
             return None
     
+    def _gzip_rejected(self, response: requests.Response) -> bool:
+        """
+        Indique si le serveur a refusé un corps compressé: statut 415, 422 (un serveur qui ne
+        décompresse pas les requêtes, comme Langflow, ne parvient pas à décoder le JSON), ou 400
+        dont le message mentionne l'encodage.
+        
+        Le serveur n'est sondé qu'une fois: dès qu'un corps compressé a été accepté, toute erreur
+        (flow invalide...) est une vraie erreur.
+        
+        Args:
+            response: Réponse à une requête dont le corps était compressé.
+            
+        Returns:
+            bool: True si la requête doit être refaite sans compression.
+        """
+        if response.status_code < 400:
+            self.gzip_accepted = True
+            return False
+        if self.gzip_accepted:
+            return False
+        if response.status_code in (415, 422):
+            return True
+        if response.status_code != 400:
+            return False
+        error_text = response.text.lower()
+        return any(marker in error_text for marker in GZIP_REJECTION_MARKERS)
+    
+    def create_flow_from_file(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """
+        Crée un nouveau flow en envoyant directement les octets du fichier, sans le décoder.
+        
+        Le fichier est lu par blocs depuis le disque et compressé en gzip à la volée si
+        compress_requests est actif. Si le serveur refuse le corps compressé, l'envoi est
+        refait sans compression et la compression est désactivée pour la suite.
+        
+        Args:
+            file_path: Chemin absolu du fichier de flow.
+            
+        Returns:
+            Optional[Dict[str, Any]]: Données du flow créé ou None en cas d'erreur.
+        """
+        url = f"{self.base_url}/api/v1/flows/"
+        
+        try:
+            if self.compress_requests:
+                logger.debug(f"POST {url} (gzip, {os.path.getsize(file_path)} octets avant compression)")
+                headers = {**self.headers, "Content-Encoding": "gzip"}
+                response = self.session.post(url, headers=headers, data=iter_gzip_chunks(file_path))
+                if not self._gzip_rejected(response):
+                    return self._handle_response(response)
+                logger.warning(f"Le serveur refuse les corps compressés ({response.status_code}: {response.text[:200]}), envoi sans compression")
+                self.compress_requests = False
+            
+            logger.debug(f"POST {url} ({os.path.getsize(file_path)} octets)")
+            with open(file_path, "rb") as file:
+                response = self.session.post(url, headers=self.headers, data=file)
+            return self._handle_response(response)
+        except Exception as e:
+            logger.error(f"Erreur lors de la création du flow depuis {file_path}: {e}")
+            return None
+    
+    def upload_flow_file(self, file_path: str, folder_id: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Importe un fichier de flow via l'endpoint d'upload de Langflow.
+        
+        Le fichier est transmis tel quel, sans être décodé ni ré-encodé. Si l'endpoint
+        n'existe pas sur le serveur, file_upload_supported passe à False.
+        
+        Args:
+            file_path: Chemin absolu du fichier de flow.
+            folder_id: ID du dossier de destination (optionnel).
+            
+        Returns:
+            Optional[List[Dict[str, Any]]]: Flows créés ou None en cas d'erreur.
+        """
+        url = f"{self.base_url}/api/v1/flows/upload/"
+        params = {"folder_id": folder_id} if folder_id else None
+        # Le Content-Type multipart est calculé par requests
+        headers = {key: value for key, value in self.headers.items() if key != "Content-Type"}
+        
+        try:
+            logger.debug(f"POST {url} ({os.path.getsize(file_path)} octets)")
+            with open(file_path, "rb") as file:
+                files = {"file": (os.path.basename(file_path), file, "application/json")}
+                response = self.session.post(url, headers=headers, params=params, files=files)
+            
+            if response.status_code in (404, 405):
+                logger.info("Endpoint d'upload de flows indisponible, utilisation de la création classique")
+                self.file_upload_supported = False
+                return None
+            
+            self.file_upload_supported = True
+            result = self._handle_response(response)
+            return result if isinstance(result, list) else [result]
+        except Exception as e:
+            logger.error(f"Erreur lors de l'upload du fichier de flow {file_path}: {e}")
+            return None
+    
+    def create_flows_batch(self, flow_bodies: List[bytes]) -> Tuple[Optional[List[Dict[str, Any]]], bool]:
+        """
+        Crée plusieurs flows en une seule requête via l'endpoint batch de Langflow.
+        
+        Le corps {"flows": [...]} est assemblé directement à partir des corps JSON des flows,
+        sans les décoder. Les flows créés sont renvoyés dans l'ordre des corps fournis. Si
+        l'endpoint n'existe pas sur le serveur, batch_create_supported passe à False.
+        
+        Args:
+            flow_bodies: Corps JSON des flows à créer.
+            
+        Returns:
+            Tuple[Optional[List[Dict[str, Any]]], bool]: Flows créés (None en cas d'erreur) et, en cas
+            d'erreur, un booléen indiquant si des flows ont pu être créés malgré tout (réponse perdue
+            après l'envoi, erreur du serveur ou réponse incohérente): ils doivent alors être recherchés
+            avant d'être recréés. Un refus explicite de la requête (4xx) garantit qu'aucun flow n'a été créé.
+        """
+        url = f"{self.base_url}/api/v1/flows/batch/"
+        
+        try:
+            body = b'{"flows":[' + b",".join(flow_body.strip() for flow_body in flow_bodies) + b"]}"
+            
+            headers = self.headers
+            if self.compress_requests:
+                headers = {**self.headers, "Content-Encoding": "gzip"}
+                body = gzip.compress(body)
+        except Exception as e:
+            logger.error(f"Erreur lors de la préparation de la création par lot de {len(flow_bodies)} flows: {e}")
+            return None, False
+        
+        try:
+            logger.debug(f"POST {url} ({len(flow_bodies)} flows, {len(body)} octets)")
+            response = self.session.post(url, headers=headers, data=body)
+        except requests.exceptions.ConnectTimeout as e:
+            # La connexion n'a pas été établie: rien n'a été envoyé
+            logger.error(f"Erreur lors de la création par lot de {len(flow_bodies)} flows: {e}")
+            return None, False
+        except Exception as e:
+            logger.error(f"Erreur lors de la création par lot de {len(flow_bodies)} flows, résultat inconnu: {e}")
+            return None, True
+        
+        if response.status_code in (404, 405):
+            logger.info("Endpoint de création par lot indisponible, création des flows un par un")
+            self.batch_create_supported = False
+            return None, False
+        
+        if self.compress_requests and self._gzip_rejected(response):
+            # Requête refusée avant tout enregistrement: les flows seront envoyés un par un, sans compression
+            logger.warning(f"Le serveur refuse les corps compressés ({response.status_code}: {response.text[:200]}), envoi sans compression")
+            self.compress_requests = False
+            return None, False
+        
+        self.batch_create_supported = True
+        try:
+            result = self._handle_response(response)
+        except Exception as e:
+            # Une erreur du serveur peut survenir après l'enregistrement d'une partie des flows
+            logger.error(f"Échec de la création par lot de {len(flow_bodies)} flows: {e}")
+            return None, response.status_code >= 500
+        if not isinstance(result, list) or len(result) != len(flow_bodies):
+            logger.error(f"Réponse inattendue de la création par lot: {len(result) if isinstance(result, list) else type(result).__name__} flows pour {len(flow_bodies)} envoyés")
+            return None, True
+        return result, False
+    
     def update_flow(self, flow_id: str, flow_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
         Met à jour un flow existant.
@@ -138,15 +443,35 @@ class LangflowClient:
         Returns:
             Optional[Dict[str, Any]]: Données du flow mis à jour ou None en cas d'erreur.
         """
+        found, result = self.update_flow_if_exists(flow_id, flow_data)
+        if not found:
+            logger.error(f"Flow {flow_id} introuvable dans Langflow, mise à jour impossible")
+        return result
+    
+    def update_flow_if_exists(self, flow_id: str, flow_data: Dict[str, Any]) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """
+        Met à jour un flow par son ID en distinguant un flow absent d'une erreur.
+        
+        Args:
+            flow_id: ID du flow à mettre à jour.
+            flow_data: Nouvelles données du flow.
+            
+        Returns:
+            Tuple[bool, Optional[Dict[str, Any]]]: Tuple contenant un booléen indiquant si le flow
+            existe (False uniquement sur une réponse 404) et les données du flow mis à jour (None en
+            cas d'erreur).
+        """
         url = f"{self.base_url}/api/v1/flows/{flow_id}"
         
         try:
             logger.debug(f"PATCH {url}")
-            response = requests.patch(url, headers=self.headers, json=flow_data)
-            return self._handle_response(response)
+            response = self.session.patch(url, headers=self.headers, json=flow_data)
+            return True, self._handle_response(response)
+        except NotFoundError:
+            return False, None
         except Exception as e:
             logger.error(f"Erreur lors de la mise à jour du flow {flow_id}: {e}")
-            return None
+            return True, None
     
     def delete_flow(self, flow_id: str) -> bool:
         """
@@ -158,16 +483,34 @@ class LangflowClient:
         Returns:
             bool: True si la suppression a réussi, False sinon.
         """
+        found, deleted = self.delete_flow_if_exists(flow_id)
+        if not found:
+            logger.error(f"Flow {flow_id} introuvable dans Langflow, suppression impossible")
+        return deleted
+    
+    def delete_flow_if_exists(self, flow_id: str) -> Tuple[bool, bool]:
+        """
+        Supprime un flow par son ID en distinguant un flow absent d'une erreur.
+        
+        Args:
+            flow_id: ID du flow à supprimer.
+            
+        Returns:
+            Tuple[bool, bool]: Tuple contenant un booléen indiquant si le flow existe (False
+            uniquement sur une réponse 404) et un booléen indiquant si la suppression a réussi.
+        """
         url = f"{self.base_url}/api/v1/flows/{flow_id}"
         
         try:
             logger.debug(f"DELETE {url}")
-            response = requests.delete(url, headers=self.headers)
+            response = self.session.delete(url, headers=self.headers)
             self._handle_response(response)
-            return True
+            return True, True
+        except NotFoundError:
+            return False, False
         except Exception as e:
             logger.error(f"Erreur lors de la suppression du flow {flow_id}: {e}")
-            return False
+            return True, False
     
     def get_folders(self) -> List[Dict[str, Any]]:
         """
@@ -180,8 +523,7 @@ class LangflowClient:
         
         try:
             logger.debug(f"GET {url}")
-            response = requests.get(url, headers=self.headers)
-            return self._handle_response(response)
+            return self._get(url)
         except Exception as e:
             logger.error(f"Erreur lors de la récupération des dossiers: {e}")
             return []
@@ -200,8 +542,7 @@ class LangflowClient:
         
         try:
             logger.debug(f"GET {url}")
-            response = requests.get(url, headers=self.headers)
-            return self._handle_response(response)
+            return self._get(url)
         except Exception as e:
             logger.error(f"Erreur lors de la récupération du dossier {folder_id}: {e}")
             return None
@@ -220,7 +561,7 @@ class LangflowClient:
         
         try:
             logger.debug(f"POST {url}")
-            response = requests.post(url, headers=self.headers, json=folder_data)
+            response = self.session.post(url, headers=self.headers, json=folder_data)
             return self._handle_response(response)
         except Exception as e:
             logger.error(f"Erreur lors de la création du dossier: {e}")
@@ -241,7 +582,7 @@ class LangflowClient:
         
         try:
             logger.debug(f"PATCH {url}")
-            response = requests.patch(url, headers=self.headers, json=folder_data)
+            response = self.session.patch(url, headers=self.headers, json=folder_data)
             return self._handle_response(response)
         except Exception as e:
             logger.error(f"Erreur lors de la mise à jour du dossier {folder_id}: {e}")
@@ -260,7 +601,7 @@ class LangflowClient:
         url = f"{self.base_url}/api/v1/folders/{folder_id}"
         try:
             logger.debug(f"DELETE {url}")
-            response = requests.delete(url, headers=self.headers)
+            response = self.session.delete(url, headers=self.headers)
             if response.status_code in [200, 204]:
                 return True
             else:
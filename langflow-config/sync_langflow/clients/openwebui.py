@@ -2,10 +2,13 @@ import logging
 import os
 import json
 import re
+import threading
 import requests
 from typing import Dict, List, Any, Optional, Tuple
 from requests.exceptions import RequestException
 
+from ..utils import derive_endpoint_name, derive_pipeline_name
+
 logger = logging.getLogger("sync_app")
 
 class OpenWebUIManager:
@@ -23,24 +26,49 @@ class OpenWebUIManager:
         self.base_url = base_url.rstrip("/")
         self.api_key = api_key
         self.template_path = template_path
-        self.template_content = None
         self.valve_langflow_api_url = valve_langflow_api_url
+        # Session partagée: les connexions HTTP sont réutilisées d'une requête à l'autre
+        self.session = requests.Session()
+        # Template chargé à la première génération de pipeline (voir template_content)
+        self._template_content = None
+        self._template_lock = threading.Lock()
+    
+    @property
+    def template_content(self) -> str:
+        """
+        Template de pipeline, chargé au premier accès: une synchronisation qui ne génère aucun
+        pipeline (élagage seul) ne le lit jamais.
         
+        Returns:
+            str: Contenu du template (template par défaut s'il n'est pas spécifié ou illisible).
+        """
+        with self._template_lock:
+            if self._template_content is None:
+                self._template_content = self._load_template()
+            return self._template_content
+    
+    def _load_template(self) -> str:
+        """
+        Charge le template de pipeline spécifié, ou le template par défaut.
+        
+        Returns:
+            str: Contenu du template.
+        """
         # Charger le template s'il est spécifié
-        if template_path and os.path.exists(template_path):
+        if self.template_path and os.path.exists(self.template_path):
             try:
-                with open(template_path, "r", encoding="utf-8") as file:
-                    self.template_content = file.read()
-                logger.info(f"Template de pipeline chargé depuis {template_path}")
+                with open(self.template_path, "r", encoding="utf-8") as file:
+                    template_content = file.read()
+                logger.info(f"Template de pipeline chargé depuis {self.template_path}")
+                return template_content
             except Exception as e:
                 logger.error(f"Erreur lors du chargement du template de pipeline: {e}")
                 # Utiliser le template par défaut en cas d'erreur de chargement
-                self.template_content = self._get_default_template()
                 logger.warning("Utilisation du template de pipeline par défaut suite à une erreur de chargement.")
-        else:
-            # Utiliser le template par défaut
-            self.template_content = self._get_default_template()
-            logger.info("Utilisation du template de pipeline par défaut")
+                return self._get_default_template()
+        # Utiliser le template par défaut
+        logger.info("Utilisation du template de pipeline par défaut")
+        return self._get_default_template()
     
     def _get_default_template(self) -> str:
         """
@@ -260,7 +288,7 @@ class Pipeline:
         endpoint_name = flow_data.get("endpoint_name")
         if not endpoint_name:
             # Si endpoint_name n'est pas disponible, utiliser le nom du flow
-            endpoint_name = flow_name.lower().replace(" ", "_")
+            endpoint_name = derive_endpoint_name(flow_name)
             logger.warning(f"Endpoint name non trouvé pour le flow '{flow_name}', utilisation de '{endpoint_name}' comme fallback")
         
         return endpoint_name, flow_name
@@ -291,15 +319,7 @@ class Pipeline:
             pipeline_content = pipeline_content.replace("VALVE_LANGFLOW_API_URL_PLACEHOLDER", api_url)
             
             # Créer le nom du fichier
-            # Convertir le nom du flow en un nom de fichier valide
-            file_name = flow_name.lower().replace(" ", "_").replace("-", "_")
-            # S'assurer que le nom de fichier est valide (supprimer les caractères non alphanumériques)
-            file_name = "".join(c for c in file_name if c.isalnum() or c == '_')
-            if not file_name:
-                file_name = "default_pipeline" # Fallback si le nom devient vide
-                
-            if not file_name.endswith(".py"):
-                file_name += ".py"
+            file_name = f"{derive_pipeline_name(flow_name)}.py"
             
             # Créer le chemin complet du fichier
             file_path = os.path.join(output_dir, file_name)
@@ -352,7 +372,7 @@ class Pipeline:
                 
                 logger.info(f"Téléchargement du pipeline {file_name} vers {api_url}...")
                 # Envoyer la requête
-                response = requests.post(api_url, headers=headers, files=files, data=data)
+                response = self.session.post(api_url, headers=headers, files=files, data=data)
                 
                 # Vérifier si la requête a réussi
                 if response.status_code == 200:
@@ -432,7 +452,7 @@ class Pipeline:
         
         try:
             logger.info(f"Récupération de tous les pipelines depuis {api_url}...")
-            response = requests.get(api_url, headers=headers, params=params)
+            response = self.session.get(api_url, headers=headers, params=params)
             
             if response.status_code == 200:
                 try:
@@ -486,7 +506,7 @@ class Pipeline:
         try:
             logger.info(f"Suppression du pipeline avec ID {pipeline_id}...")
             # Utiliser json= pour envoyer le corps JSON
-            response = requests.delete(api_url, headers=headers, json=data)
+            response = self.session.delete(api_url, headers=headers, json=data)
             
             if response.status_code in [200, 204]:
                 logger.info(f"Pipeline {pipeline_id} supprimé avec succès")
@@ -0,0 +1,361 @@
+import atexit
+import base64
+import gzip
+import hashlib
+import http.client
+import json
+import logging
+import threading
+import time
+import zlib
+from typing import Dict, Any, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from ..scheduler import current_task_name
+
+logger = logging.getLogger("sync_app")
+
+# Version du format des cassettes: une cassette d'une autre version n'est jamais rejouée
+CASSETTE_VERSION = 1
+# En-têtes de réponse conservés dans les cassettes (les autres n'influencent pas la synchronisation)
+RECORDED_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Location", "Retry-After")
+# Nombre d'échanges enregistrés entre deux écritures forcées sur disque
+FLUSH_EVERY_CALLS = 50
+
+def _request_body(request: requests.PreparedRequest) -> Optional[bytes]:
+    """
+    Retourne le corps d'une requête, lu entièrement s'il est envoyé par morceaux ou depuis un fichier.
+
+    Le corps lu remplace le générateur ou le fichier de la requête, qui peut ainsi être envoyée
+    normalement (avec une longueur connue au lieu d'un envoi par morceaux).
+
+    Args:
+        request: Requête préparée.
+
+    Returns:
+        Optional[bytes]: Corps de la requête, ou None si elle n'en a pas.
+    """
+    body = request.body
+    if body is None or isinstance(body, bytes):
+        return body
+    if isinstance(body, str):
+        return body.encode("utf-8")
+    if hasattr(body, "read"):
+        body = body.read()
+    else:
+        body = b"".join(chunk.encode("utf-8") if isinstance(chunk, str) else chunk for chunk in body)
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    request.body = body
+    request.headers.pop("Transfer-Encoding", None)
+    request.headers["Content-Length"] = str(len(body))
+    return body
+
+def _digest(data: Optional[bytes]) -> Optional[str]:
+    """Retourne l'empreinte courte d'un corps de requête ou de réponse (None si absent ou vide)."""
+    return hashlib.sha256(data).hexdigest()[:20] if data else None
+
+def _call_key(service: str, request: requests.PreparedRequest) -> Tuple[str, str, str, bool]:
+    """
+    Retourne la clé d'un échange: service, méthode, chemin et paramètres de l'URL (sans l'hôte,
+    afin qu'une cassette soit rejouable avec d'autres URL), et présence d'un en-tête conditionnel.
+
+    Args:
+        service: Service appelé (langflow, openwebui).
+        request: Requête préparée.
+
+    Returns:
+        Tuple[str, str, str, bool]: Clé de l'échange.
+    """
+    url = urlsplit(request.url)
+    path = f"{url.path}?{url.query}" if url.query else url.path
+    conditional = "If-None-Match" in request.headers or "If-Modified-Since" in request.headers
+    return service, request.method, path, conditional
+
+class Cassette:
+    """
+    Cassette d'échanges HTTP (JSON Lines compressé en gzip), enregistrée lors d'une synchronisation
+    réelle puis rejouée hors ligne.
+
+    Chaque échange conserve la requête (service, méthode, chemin, empreinte du corps, tâche de
+    synchronisation émettrice), la réponse (statut, principaux en-têtes, corps) et sa latence. Les corps identiques (listes de flows,
+    réponses répétées) ne sont stockés qu'une fois. Les en-têtes de requête, dont les jetons
+    d'authentification, ne sont jamais enregistrés.
+    """
+
+    def __init__(self, path: str, mode: str, latency_scale: float = 0.0):
+        """
+        Ouvre une cassette.
+
+        Args:
+            path: Chemin du fichier de la cassette.
+            mode: "record" pour enregistrer (la cassette est remplacée), "replay" pour rejouer.
+            latency_scale: En rejeu, facteur appliqué aux latences enregistrées (0: réponses
+                immédiates, 1: latences d'origine, 2: deux fois plus lentes).
+
+        Raises:
+            ValueError: Si le mode est inconnu ou si la cassette à rejouer est illisible.
+        """
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Mode de cassette inconnu: {mode}")
+        self.path = path
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self.calls = 0 # Échanges enregistrés ou rejoués
+        self.misses = 0 # Requêtes rejouées sans échange enregistré correspondant
+        self._lock = threading.Lock()
+        self._file = None
+        self._bodies = {} # empreinte -> corps (enregistrement: empreintes déjà écrites)
+        self._pending = 0
+        self._interactions = {} # clé d'échange -> échanges enregistrés, dans l'ordre
+        self._last_served = {} # clé d'échange -> dernier échange rejoué
+        if mode == "record":
+            self._file = gzip.open(path, "wt", encoding="utf-8")
+            self._write({"type": "cassette", "version": CASSETTE_VERSION})
+        else:
+            self._load()
+        # Terminer le fichier compressé (ou signaler les requêtes non rejouées) même en cas de
+        # sortie anticipée (sys.exit, exception)
+        atexit.register(self.close)
+
+    def _write(self, entry: Dict[str, Any]) -> None:
+        """Écrit une entrée de la cassette (appelé sous verrou, sauf à l'ouverture)."""
+        self._file.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+    def _load(self) -> None:
+        """
+        Charge les échanges d'une cassette à rejouer. Une cassette tronquée (enregistrement
+        interrompu brutalement) est rejouée jusqu'au dernier échange complet.
+
+        Raises:
+            ValueError: Si la cassette est illisible ou d'une autre version.
+        """
+        bodies = {}
+        try:
+            with gzip.open(self.path, "rt", encoding="utf-8") as file:
+                header = json.loads(file.readline() or "{}")
+                if header.get("type") != "cassette" or header.get("version") != CASSETTE_VERSION:
+                    raise ValueError(f"Cassette {self.path} d'un format non pris en charge")
+                try:
+                    for line in file:
+                        entry = json.loads(line)
+                        if entry["type"] == "body":
+                            if "text" in entry:
+                                bodies[entry["id"]] = entry["text"].encode("utf-8")
+                            else:
+                                bodies[entry["id"]] = base64.b64decode(entry["base64"])
+                        elif entry["type"] == "call":
+                            entry["content"] = bodies.get(entry.get("body"), b"")
+                            key = (entry["service"], entry["method"], entry["path"], entry.get("conditional", False))
+                            self._interactions.setdefault(key, []).append(entry)
+                except (EOFError, zlib.error, ValueError) as e:
+                    logger.warning(f"Cassette {self.path} tronquée, rejouée jusqu'au dernier échange complet: {e}")
+        except (OSError, ValueError, KeyError) as e:
+            raise ValueError(f"Cassette {self.path} illisible: {e}")
+        logger.info(f"Cassette {self.path} chargée: {sum(len(entries) for entries in self._interactions.values())} échanges")
+
+    def record(self, service: str, request: requests.PreparedRequest, request_body: Optional[bytes],
+               response: requests.Response, elapsed: float) -> None:
+        """
+        Enregistre un échange.
+
+        Args:
+            service: Service appelé.
+            request: Requête envoyée.
+            request_body: Corps de la requête.
+            response: Réponse reçue (corps déjà lu).
+            elapsed: Latence de l'échange en secondes.
+        """
+        content = response.content or b""
+        body_id = _digest(content)
+        _, method, path, conditional = _call_key(service, request)
+        with self._lock:
+            if self._file is None:
+                return
+            if body_id and body_id not in self._bodies:
+                self._bodies[body_id] = True
+                try:
+                    self._write({"type": "body", "id": body_id, "text": content.decode("utf-8")})
+                except UnicodeDecodeError:
+                    self._write({"type": "body", "id": body_id, "base64": base64.b64encode(content).decode("ascii")})
+            headers = {name: response.headers[name] for name in RECORDED_HEADERS if name in response.headers}
+            self._write({
+                "type": "call",
+                "service": service,
+                "method": method,
+                "path": path,
+                "conditional": conditional,
+                "request": _digest(request_body),
+                "task": current_task_name(),
+                "status": response.status_code,
+                "headers": headers,
+                "body": body_id,
+                "elapsed": round(elapsed, 4)
+            })
+            self.calls += 1
+            self._pending += 1
+            if self._pending >= FLUSH_EVERY_CALLS:
+                self._file.flush()
+                self._pending = 0
+
+    def match(self, service: str, request: requests.PreparedRequest, request_body: Optional[bytes]) -> Optional[Dict[str, Any]]:
+        """
+        Retourne l'échange enregistré correspondant à une requête.
+
+        Les échanges d'une même clé sont servis dans l'ordre d'enregistrement, en privilégiant
+        ceux émis par la même tâche et avec le même corps de requête: les tâches parallèles
+        n'envoient pas leurs requêtes dans le même ordre d'une exécution à l'autre, et une même
+        lecture (ex: liste des dossiers) doit retrouver l'état vu par sa tâche à l'enregistrement.
+        Une fois tous servis, le dernier est resservi (requêtes de lecture répétées plus souvent
+        qu'à l'enregistrement).
+
+        Args:
+            service: Service appelé.
+            request: Requête envoyée.
+            request_body: Corps de la requête.
+
+        Returns:
+            Optional[Dict[str, Any]]: Échange enregistré, ou None si aucun ne correspond.
+        """
+        key = _call_key(service, request)
+        request_id = _digest(request_body)
+        task_name = current_task_name()
+        with self._lock:
+            entries = self._interactions.get(key, [])
+            entry = None
+            for criteria in ((task_name, request_id), (task_name, None), (None, request_id)):
+                entry = next((
+                    entry for entry in entries
+                    if (criteria[0] is None or entry.get("task") == criteria[0])
+                    and (criteria[1] is None or entry["request"] == criteria[1])
+                ), None)
+                if entry is not None:
+                    break
+            if entry is None and entries:
+                entry = entries[0]
+            if entry is not None:
+                entries.remove(entry)
+                self._last_served[key] = entry
+            else:
+                entry = self._last_served.get(key)
+            if entry is None:
+                self.misses += 1
+            else:
+                self.calls += 1
+            return entry
+
+    def mount(self, session: requests.Session, service: str) -> None:
+        """
+        Branche la cassette sur une session HTTP: toutes ses requêtes sont enregistrées ou rejouées.
+
+        Args:
+            session: Session HTTP des appels du service.
+            service: Nom du service (langflow, openwebui).
+        """
+        adapter = RecordingAdapter(self, service) if self.mode == "record" else ReplayAdapter(self, service)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+
+    def close(self) -> None:
+        """Termine l'enregistrement (ou signale les requêtes rejouées sans échange enregistré)."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+                logger.info(f"Cassette {self.path} enregistrée: {self.calls} échanges")
+        if self.misses:
+            logger.warning(f"Cassette {self.path}: {self.misses} requêtes sans échange enregistré")
+
+class RecordingAdapter(HTTPAdapter):
+    """Transport HTTP enregistrant chaque échange dans une cassette."""
+
+    def __init__(self, cassette: Cassette, service: str):
+        """
+        Initialise le transport.
+
+        Args:
+            cassette: Cassette d'enregistrement.
+            service: Nom du service appelé.
+        """
+        super().__init__()
+        self.cassette = cassette
+        self.service = service
+
+    def send(self, request: requests.PreparedRequest, *args: Any, **kwargs: Any) -> requests.Response:
+        """Envoie la requête et enregistre l'échange (les erreurs de connexion ne sont pas enregistrées)."""
+        request_body = _request_body(request)
+        start = time.perf_counter()
+        response = super().send(request, *args, **kwargs)
+        # Le corps est lu ici pour être compté dans la latence enregistrée
+        response.content
+        self.cassette.record(self.service, request, request_body, response, time.perf_counter() - start)
+        return response
+
+class ReplayAdapter(BaseAdapter):
+    """Transport HTTP servant les échanges d'une cassette, sans aucun appel réseau."""
+
+    def __init__(self, cassette: Cassette, service: str):
+        """
+        Initialise le transport.
+
+        Args:
+            cassette: Cassette à rejouer.
+            service: Nom du service appelé.
+        """
+        super().__init__()
+        self.cassette = cassette
+        self.service = service
+
+    def send(self, request: requests.PreparedRequest, *args: Any, **kwargs: Any) -> requests.Response:
+        """
+        Sert l'échange enregistré d'une requête, après la latence d'origine multipliée par le
+        facteur de la cassette.
+
+        Raises:
+            ConnectionError: Si la cassette ne contient aucun échange pour cette requête (traitée
+                par les clients comme une erreur réseau).
+        """
+        entry = self.cassette.match(self.service, request, _request_body(request))
+        if entry is None:
+            raise requests.exceptions.ConnectionError(f"Aucun échange enregistré pour {request.method} {request.url}", request=request)
+        if self.cassette.latency_scale > 0:
+            time.sleep(entry["elapsed"] * self.cassette.latency_scale)
+
+        response = requests.Response()
+        response.status_code = entry["status"]
+        response.reason = http.client.responses.get(entry["status"], "")
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = entry["content"]
+        response._content_consumed = True
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+    def close(self) -> None:
+        """Aucune connexion à fermer."""
+
+def open_cassette(config: Any) -> Optional[Cassette]:
+    """
+    Ouvre la cassette de la configuration, en enregistrement ou en rejeu.
+
+    Args:
+        config: Configuration de la cible (record_path, replay_path, replay_latency).
+
+    Returns:
+        Optional[Cassette]: Cassette ouverte, ou None si aucune n'est configurée.
+
+    Raises:
+        ValueError: Si la cassette à rejouer est illisible.
+    """
+    if config.record_path:
+        return Cassette(config.record_path, "record")
+    if config.replay_path:
+        return Cassette(config.replay_path, "replay", config.replay_latency)
+    return None
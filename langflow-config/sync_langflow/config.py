@@ -2,6 +2,8 @@ import argparse
 import os
 from typing import Dict, Any, Optional
 
+from .shards import parse_shard
+
 class Config:
     """Classe de configuration pour la synchronisation Langflow et OpenWebUI."""
 
@@ -14,13 +16,64 @@ class Config:
         self.before_commit = None
         self.after_commit = None
         self.verbose = False
+        self.cache_dir = None
+        self.cache_max_mb = 100
+        self.compress_uploads = False
+        self.batch_max_mb = 4
+        self.optimize_flows = False
+        self.optimize_keep_notes = True
+        self.index_path = None
+        self.max_workers = 4
+        self.targets_file = None
+        self.report_path = None
+        self.shard = None
+        self.journal_path = None
+        self.resume = False
+        self.profile_path = None
+        self.record_path = None
+        self.replay_path = None
+        self.replay_latency = 0.0
+        
+        # Configuration du mode démon
+        self.daemon = False
+        self.poll_interval = 30
+        self.git_remote = "origin"
+        self.git_branch = None
+        self.status_host = "127.0.0.1"
+        self.status_port = 8787
+        self.webhook_token = None
         
         # Configuration OpenWebUI
         self.openwebui_url = "http://localhost:3000"
         self.openwebui_api_key = None
         self.enable_openwebui = False
         self.openwebui_template_path = None
+        self.verify_endpoints_remote = False
         self.valve_langflow_api_url = "http://langflow:7860"
+        
+        # Variables d'environnement numériques invalides, signalées par validate()
+        self.invalid_env = []
+
+    def _env_number(self, name: str, default: Any, number_type: type = int) -> Any:
+        """
+        Lit une variable d'environnement numérique.
+        
+        Args:
+            name: Nom de la variable d'environnement.
+            default: Valeur utilisée si la variable est absente ou invalide.
+            number_type: Type de la valeur (int ou float).
+            
+        Returns:
+            Any: Valeur de la variable, ou la valeur par défaut (une valeur invalide est signalée par validate()).
+        """
+        value = os.environ.get(name)
+        if value is None:
+            return default
+        try:
+            return number_type(value)
+        except ValueError:
+            self.invalid_env.append(f"{name}={value!r}")
+            return default
 
     def load_from_env(self) -> None:
         """Charge la configuration à partir des variables d'environnement."""
@@ -31,12 +84,39 @@ class Config:
         self.before_commit = os.environ.get("BEFORE_COMMIT", self.before_commit)
         self.after_commit = os.environ.get("AFTER_COMMIT", self.after_commit)
         self.verbose = os.environ.get("VERBOSE", "False").lower() == "true"
+        self.cache_dir = os.environ.get("LANGFLOW_CACHE_DIR", self.cache_dir)
+        self.cache_max_mb = self._env_number("LANGFLOW_CACHE_MAX_MB", self.cache_max_mb)
+        self.compress_uploads = os.environ.get("LANGFLOW_COMPRESS_UPLOADS", "False").lower() == "true"
+        self.batch_max_mb = self._env_number("LANGFLOW_BATCH_MAX_MB", self.batch_max_mb, float)
+        self.optimize_flows = os.environ.get("LANGFLOW_OPTIMIZE_FLOWS", "False").lower() == "true"
+        self.optimize_keep_notes = os.environ.get("LANGFLOW_OPTIMIZE_KEEP_NOTES", "True").lower() == "true"
+        self.index_path = os.environ.get("LANGFLOW_INDEX_PATH", self.index_path)
+        self.max_workers = self._env_number("LANGFLOW_MAX_WORKERS", self.max_workers)
+        self.targets_file = os.environ.get("LANGFLOW_TARGETS_FILE", self.targets_file)
+        self.report_path = os.environ.get("LANGFLOW_REPORT_PATH", self.report_path)
+        self.shard = os.environ.get("LANGFLOW_SHARD", self.shard)
+        self.journal_path = os.environ.get("LANGFLOW_JOURNAL_PATH", self.journal_path)
+        self.resume = os.environ.get("LANGFLOW_RESUME", "False").lower() == "true"
+        self.profile_path = os.environ.get("LANGFLOW_PROFILE_PATH", self.profile_path)
+        self.record_path = os.environ.get("LANGFLOW_RECORD_CASSETTE", self.record_path)
+        self.replay_path = os.environ.get("LANGFLOW_REPLAY_CASSETTE", self.replay_path)
+        self.replay_latency = self._env_number("LANGFLOW_REPLAY_LATENCY", self.replay_latency, float)
+        
+        # Configuration du mode démon
+        self.daemon = os.environ.get("LANGFLOW_DAEMON", "False").lower() == "true"
+        self.poll_interval = self._env_number("LANGFLOW_POLL_INTERVAL", self.poll_interval, float)
+        self.git_remote = os.environ.get("LANGFLOW_GIT_REMOTE", self.git_remote)
+        self.git_branch = os.environ.get("LANGFLOW_GIT_BRANCH", self.git_branch)
+        self.status_host = os.environ.get("LANGFLOW_STATUS_HOST", self.status_host)
+        self.status_port = self._env_number("LANGFLOW_STATUS_PORT", self.status_port)
+        self.webhook_token = os.environ.get("LANGFLOW_WEBHOOK_TOKEN", self.webhook_token)
         
         # Configuration OpenWebUI
         self.openwebui_url = os.environ.get("OPENWEBUI_URL", self.openwebui_url)
         self.openwebui_api_key = os.environ.get("OPENWEBUI_API_KEY", self.openwebui_api_key)
         self.enable_openwebui = os.environ.get("ENABLE_OPENWEBUI", "False").lower() == "true"
         self.openwebui_template_path = os.environ.get("OPENWEBUI_TEMPLATE_PATH", self.openwebui_template_path)
+        self.verify_endpoints_remote = os.environ.get("OPENWEBUI_VERIFY_ENDPOINTS_REMOTE", "False").lower() == "true"
         self.valve_langflow_api_url = os.environ.get("VALVE_LANGFLOW_API_URL", self.valve_langflow_api_url)
 
     def load_from_args(self, args: argparse.Namespace) -> None:
@@ -59,6 +139,56 @@ class Config:
             self.after_commit = args.after_commit
         if args.verbose:
             self.verbose = args.verbose
+        if args.cache_dir:
+            self.cache_dir = args.cache_dir
+        if args.cache_max_mb:
+            self.cache_max_mb = args.cache_max_mb
+        if args.compress_uploads:
+            self.compress_uploads = args.compress_uploads
+        if args.batch_max_mb is not None:
+            self.batch_max_mb = args.batch_max_mb
+        if args.optimize_flows:
+            self.optimize_flows = args.optimize_flows
+        if args.optimize_drop_notes:
+            self.optimize_keep_notes = False
+        if args.index_path:
+            self.index_path = args.index_path
+        if args.max_workers:
+            self.max_workers = args.max_workers
+        if args.targets_file:
+            self.targets_file = args.targets_file
+        if args.report_path:
+            self.report_path = args.report_path
+        if args.shard:
+            self.shard = args.shard
+        if args.journal_path:
+            self.journal_path = args.journal_path
+        if args.resume:
+            self.resume = args.resume
+        if args.profile:
+            self.profile_path = args.profile
+        if args.record_cassette:
+            self.record_path = args.record_cassette
+        if args.replay_cassette:
+            self.replay_path = args.replay_cassette
+        if args.replay_latency is not None:
+            self.replay_latency = args.replay_latency
+        
+        # Configuration du mode démon
+        if args.daemon:
+            self.daemon = args.daemon
+        if args.poll_interval:
+            self.poll_interval = args.poll_interval
+        if args.git_remote is not None:
+            self.git_remote = args.git_remote
+        if args.git_branch:
+            self.git_branch = args.git_branch
+        if args.status_host:
+            self.status_host = args.status_host
+        if args.status_port is not None:
+            self.status_port = args.status_port
+        if args.webhook_token:
+            self.webhook_token = args.webhook_token
         
         # Configuration OpenWebUI
         if args.openwebui_url:
@@ -69,6 +199,8 @@ class Config:
             self.enable_openwebui = args.enable_openwebui
         if args.openwebui_template_path:
             self.openwebui_template_path = args.openwebui_template_path
+        if args.verify_endpoints_remote:
+            self.verify_endpoints_remote = args.verify_endpoints_remote
 
     def to_dict(self) -> Dict[str, Any]:
         """
@@ -85,12 +217,39 @@ class Config:
             "before_commit": self.before_commit,
             "after_commit": self.after_commit,
             "verbose": self.verbose,
+            "cache_dir": self.cache_dir,
+            "cache_max_mb": self.cache_max_mb,
+            "compress_uploads": self.compress_uploads,
+            "batch_max_mb": self.batch_max_mb,
+            "optimize_flows": self.optimize_flows,
+            "optimize_keep_notes": self.optimize_keep_notes,
+            "index_path": self.index_path,
+            "max_workers": self.max_workers,
+            "targets_file": self.targets_file,
+            "report_path": self.report_path,
+            "shard": self.shard,
+            "journal_path": self.journal_path,
+            "resume": self.resume,
+            "profile_path": self.profile_path,
+            "record_path": self.record_path,
+            "replay_path": self.replay_path,
+            "replay_latency": self.replay_latency,
+            
+            # Configuration du mode démon
+            "daemon": self.daemon,
+            "poll_interval": self.poll_interval,
+            "git_remote": self.git_remote,
+            "git_branch": self.git_branch,
+            "status_host": self.status_host,
+            "status_port": self.status_port,
+            "webhook_token": "***" if self.webhook_token else None,
             
             # Configuration OpenWebUI
             "openwebui_url": self.openwebui_url,
             "openwebui_api_key": "***" if self.openwebui_api_key else None,
             "enable_openwebui": self.enable_openwebui,
             "openwebui_template_path": self.openwebui_template_path,
+            "verify_endpoints_remote": self.verify_endpoints_remote,
             "valve_langflow_api_url": self.valve_langflow_api_url
         }
 
@@ -101,6 +260,9 @@ class Config:
         Returns:
             Optional[str]: Message d'erreur si la configuration est invalide, None sinon.
         """
+        if self.invalid_env:
+            return f"Valeur numérique invalide pour la variable d'environnement {', '.join(self.invalid_env)}"
+        
         # Validation Langflow
         if not self.langflow_url:
             return "L'URL de Langflow est requise"
@@ -109,6 +271,47 @@ class Config:
         if not os.path.exists(self.repo_path):
             return f"Le chemin du dépôt '{self.repo_path}' n'existe pas"
         
+        if self.cache_max_mb <= 0:
+            return "La taille maximale du cache doit être strictement positive"
+        
+        if self.max_workers < 1:
+            return "Le nombre de tâches simultanées doit être au moins 1"
+        
+        if self.targets_file and not os.path.exists(self.targets_file):
+            return f"Le fichier des cibles '{self.targets_file}' n'existe pas"
+        
+        if self.targets_file and self.daemon:
+            return "Le mode démon ne prend pas en charge la synchronisation multi-cibles"
+        
+        if self.shard:
+            try:
+                parse_shard(self.shard)
+            except ValueError as e:
+                return str(e)
+            if self.daemon:
+                return "Le mode démon ne prend pas en charge la synchronisation partitionnée"
+        
+        if self.resume and not self.journal_path and not self.cache_dir:
+            return "La reprise d'une synchronisation nécessite un journal (--journal-path ou --cache-dir)"
+        
+        if self.record_path and self.replay_path:
+            return "Une cassette ne peut pas être enregistrée et rejouée dans la même synchronisation"
+        
+        if self.replay_path and not os.path.exists(self.replay_path):
+            return f"La cassette '{self.replay_path}' n'existe pas"
+        
+        if self.replay_latency < 0:
+            return "Le facteur de latence du rejeu ne peut pas être négatif"
+        
+        if self.poll_interval <= 0:
+            return "L'intervalle de scrutation du dépôt distant doit être strictement positif"
+        
+        if not 0 <= self.status_port <= 65535:
+            return "Le port du serveur de statut doit être compris entre 0 et 65535"
+        
+        if self.batch_max_mb < 0:
+            return "La taille maximale des lots de création ne peut pas être négative"
+        
         # Vérifier que le chemin du dépôt est un dépôt Git
         if not os.path.exists(os.path.join(self.repo_path, ".git")):
             return f"Le chemin '{self.repo_path}' n'est pas un dépôt Git"
@@ -0,0 +1,229 @@
+import hmac
+import json
+import logging
+import signal
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Optional
+
+from .managers.index import FlowIndex
+from .sync import SyncContext, run_sync
+
+logger = logging.getLogger("sync_app")
+
+# En-tête portant le jeton des appels de webhook
+WEBHOOK_TOKEN_HEADER = "X-Sync-Token"
+
+def _now() -> str:
+    """Retourne l'heure courante au format ISO 8601 (UTC)."""
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+class SyncDaemon:
+    """
+    Synchronise en continu les nouveaux commits d'une branche vers Langflow et OpenWebUI.
+
+    Le dépôt distant est scruté à intervalle régulier (ou sur appel du webhook local) et chaque
+    nouveau commit est appliqué de façon incrémentale. Les clients, leurs connexions HTTP, la liste
+    des flows et des dossiers de Langflow, le template de pipeline et l'index des flows restent
+    en mémoire entre deux synchronisations.
+    """
+
+    def __init__(self, context: SyncContext):
+        """
+        Initialise le démon.
+
+        Args:
+            context: Clients et gestionnaires, conservés pendant toute la durée du démon.
+        """
+        self.context = context
+        self.config = context.config
+        self.git_manager = context.git_manager
+        self.branch = self.config.git_branch or self.git_manager.current_branch()
+        # Sans chemin d'index configuré, l'index des flows est conservé en mémoire
+        if context.flow_index is None:
+            context.flow_index = FlowIndex(None)
+        self.last_commit = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._status_lock = threading.Lock()
+        self._status = {
+            "state": "starting",
+            "started_at": _now(),
+            "branch": self.branch,
+            "commit": None,
+            "last_sync_at": None,
+            "last_sync_duration": None,
+            "last_error": None,
+            "syncs": 0,
+            "failures": 0
+        }
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Retourne l'état du démon.
+
+        Returns:
+            Dict[str, Any]: État courant (commit synchronisé, dernière synchronisation, erreurs).
+        """
+        with self._status_lock:
+            return dict(self._status)
+
+    def _update_status(self, **values: Any) -> None:
+        with self._status_lock:
+            self._status.update(values)
+
+    def request_sync(self) -> None:
+        """Déclenche une scrutation immédiate du dépôt distant."""
+        self._wake.set()
+
+    def stop(self) -> None:
+        """Arrête le démon à la fin de la synchronisation en cours."""
+        self._stop.set()
+        self._wake.set()
+
+    def _target_commit(self) -> Optional[str]:
+        """
+        Retourne le commit à synchroniser: dernier commit de la branche distante, récupéré et
+        appliqué à la copie de travail, ou HEAD si aucun dépôt distant n'est configuré.
+        """
+        if not self.config.git_remote:
+            return self.git_manager.resolve_commit("HEAD")
+        if not self.branch:
+            logger.error("Branche à suivre inconnue (HEAD détaché): utilisez --git-branch")
+            return None
+        target_commit = self.git_manager.fetch(self.config.git_remote, self.branch)
+        if not target_commit:
+            return None
+        if target_commit != self.last_commit and not self.git_manager.fast_forward(target_commit):
+            return None
+        return target_commit
+
+    def sync_once(self) -> bool:
+        """
+        Synchronise le dernier commit de la branche s'il n'a pas encore été synchronisé.
+
+        Returns:
+            bool: True si une synchronisation a été effectuée avec succès.
+        """
+        target_commit = self._target_commit()
+        if not target_commit:
+            self._update_status(state="error", last_error="impossible de déterminer le commit à synchroniser")
+            return False
+        if target_commit == self.last_commit:
+            self._update_status(state="idle")
+            return False
+
+        logger.info(f"Nouveau commit à synchroniser: {self.last_commit} -> {target_commit}")
+        self._update_status(state="syncing")
+        start = time.perf_counter()
+        try:
+            exit_code = run_sync(self.context, self.last_commit, target_commit)
+        except Exception as e:
+            logger.error(f"Erreur inattendue lors de la synchronisation du commit {target_commit}: {e}")
+            exit_code = 1
+        duration = round(time.perf_counter() - start, 3)
+
+        with self._status_lock:
+            self._status["last_sync_at"] = _now()
+            self._status["last_sync_duration"] = duration
+            if exit_code == 0:
+                self.last_commit = target_commit
+                self._status.update(state="idle", commit=target_commit, last_error=None)
+                self._status["syncs"] += 1
+            else:
+                # Le commit sera de nouveau synchronisé (avec les suivants) à la prochaine scrutation
+                self._status.update(state="error", last_error=f"échec de la synchronisation du commit {target_commit}")
+                self._status["failures"] += 1
+        logger.info(f"Synchronisation du commit {target_commit} terminée en {duration:.2f}s (code {exit_code})")
+        return exit_code == 0
+
+    def _make_handler(self) -> type:
+        """Crée le gestionnaire des requêtes du serveur de statut."""
+        daemon = self
+
+        class StatusHandler(BaseHTTPRequestHandler):
+            def _send_json(self, status_code: int, body: Dict[str, Any]) -> None:
+                content = json.dumps(body).encode("utf-8")
+                self.send_response(status_code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def do_GET(self) -> None:
+                if self.path != "/health":
+                    self._send_json(404, {"error": "not found"})
+                    return
+                status = daemon.status()
+                self._send_json(503 if status["state"] == "error" else 200, status)
+
+            def do_POST(self) -> None:
+                if self.path != "/sync":
+                    self._send_json(404, {"error": "not found"})
+                    return
+                token = daemon.config.webhook_token
+                if token and not hmac.compare_digest(self.headers.get(WEBHOOK_TOKEN_HEADER, ""), token):
+                    self._send_json(401, {"error": "unauthorized"})
+                    return
+                # Le corps (charge utile du webhook) n'est pas utilisé: le dépôt distant fait foi
+                self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                daemon.request_sync()
+                self._send_json(202, {"queued": True})
+
+            def log_message(self, format: str, *args: Any) -> None:
+                logger.debug(f"Serveur de statut: {format % args}")
+
+        return StatusHandler
+
+    def _start_status_server(self) -> ThreadingHTTPServer:
+        """Démarre le serveur de statut et de webhook dans un thread dédié."""
+        server = ThreadingHTTPServer((self.config.status_host, self.config.status_port), self._make_handler())
+        thread = threading.Thread(target=server.serve_forever, name="status-server", daemon=True)
+        thread.start()
+        logger.info(f"Serveur de statut à l'écoute sur http://{self.config.status_host}:{server.server_port} (GET /health, POST /sync)")
+        return server
+
+    def run(self) -> int:
+        """
+        Exécute le démon jusqu'à la réception de SIGINT ou SIGTERM.
+
+        Le commit de départ est --before-commit s'il est fourni, sinon HEAD (considéré comme déjà
+        synchronisé).
+
+        Returns:
+            int: Code de sortie.
+        """
+        self.last_commit = self.git_manager.resolve_commit(self.config.before_commit or "HEAD")
+        if not self.last_commit:
+            logger.error(f"Commit de départ {self.config.before_commit or 'HEAD'} introuvable")
+            return 1
+        self._update_status(commit=self.last_commit)
+
+        # Les gestionnaires de signaux ne peuvent être installés que depuis le thread principal
+        if threading.current_thread() is threading.main_thread():
+            for signal_number in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(signal_number, lambda *_: self.stop())
+
+        server = None
+        if self.config.status_port:
+            try:
+                server = self._start_status_server()
+            except OSError as e:
+                logger.error(f"Impossible de démarrer le serveur de statut: {e}")
+                return 1
+
+        remote = self.config.git_remote or "(copie de travail locale)"
+        logger.info(f"Démon démarré: branche {self.branch} de {remote}, scrutation toutes les {self.config.poll_interval}s")
+        try:
+            while not self._stop.is_set():
+                self.sync_once()
+                self._wake.wait(self.config.poll_interval)
+                self._wake.clear()
+        finally:
+            if server:
+                server.shutdown()
+                server.server_close()
+        logger.info("Démon arrêté.")
+        return 0
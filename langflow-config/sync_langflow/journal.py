@@ -0,0 +1,191 @@
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, Iterable, Any, Optional
+
+logger = logging.getLogger("sync_app")
+
+# Version du format du journal: un journal d'une autre version n'est jamais repris
+JOURNAL_VERSION = 1
+# Nombre d'entrées et délai (en secondes) au-delà desquels les écritures sont forcées sur disque
+FSYNC_EVERY_ENTRIES = 50
+FSYNC_INTERVAL = 1.0
+
+class SyncJournal:
+    """
+    Journal des opérations d'une synchronisation (JSON Lines, en ajout seul).
+
+    Chaque synchronisation y inscrit son identité (commits, shard, cible), les opérations prévues
+    puis chaque opération terminée avec son résultat. Les écritures sont forcées sur disque par lots:
+    après un arrêt brutal, seules les dernières opérations terminées peuvent être perdues, et elles
+    sont simplement rejouées (toutes les opérations de synchronisation sont idempotentes).
+    """
+
+    def __init__(self, journal_path: str, fsync_every: int = FSYNC_EVERY_ENTRIES, fsync_interval: float = FSYNC_INTERVAL):
+        """
+        Initialise le journal.
+
+        Args:
+            journal_path: Chemin du fichier du journal.
+            fsync_every: Nombre d'entrées écrites entre deux écritures forcées sur disque.
+            fsync_interval: Délai maximal en secondes entre deux écritures forcées sur disque.
+        """
+        self.journal_path = journal_path
+        self.fsync_every = max(1, fsync_every)
+        self.fsync_interval = fsync_interval
+        self.completed = {} # opération -> résultat
+        self.resumed = 0 # Nombre d'opérations reprises d'une synchronisation interrompue
+        self._file = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def _read_completed(self, run_key: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Relit les opérations terminées de la dernière synchronisation du journal.
+
+        Args:
+            run_key: Identité de la synchronisation à reprendre.
+
+        Returns:
+            Optional[Dict[str, Any]]: Résultat de chaque opération terminée, ou None si le journal
+            est absent ou porte sur une autre synchronisation.
+        """
+        completed = None
+        try:
+            with open(self.journal_path, "r", encoding="utf-8") as file:
+                for line in file:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # Dernière ligne tronquée par un arrêt brutal
+                        continue
+                    if entry.get("type") == "run":
+                        same_run = entry.get("version") == JOURNAL_VERSION and entry.get("key") == run_key
+                        if not same_run:
+                            completed = None
+                        elif not entry.get("resumed") or completed is None:
+                            # Une reprise prolonge la synchronisation précédente au lieu de la remplacer
+                            completed = {}
+                    elif entry.get("type") == "done" and completed is not None:
+                        completed[entry["op"]] = entry.get("result")
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"Journal {self.journal_path} illisible, la synchronisation repart de zéro: {e}")
+            return None
+        return completed
+
+    def open(self, run_key: Dict[str, Any], resume: bool = False) -> int:
+        """
+        Ouvre le journal pour une synchronisation.
+
+        Args:
+            run_key: Identité de la synchronisation (commits, shard, cible).
+            resume: Si True et si la dernière synchronisation du journal a la même identité,
+                ses opérations terminées sont reprises; sinon le journal est recommencé.
+
+        Returns:
+            int: Nombre d'opérations terminées reprises.
+        """
+        completed = self._read_completed(run_key) if resume else None
+        if resume and completed is None:
+            logger.warning(f"Aucune synchronisation à reprendre dans le journal {self.journal_path}, elle repart de zéro")
+        self.completed = completed or {}
+        self.resumed = len(self.completed)
+
+        journal_dir = os.path.dirname(self.journal_path)
+        if journal_dir:
+            os.makedirs(journal_dir, exist_ok=True)
+        self._file = open(self.journal_path, "a" if completed is not None else "w", encoding="utf-8")
+        if completed is not None and self._file.tell() > 0:
+            # Terminer une éventuelle ligne tronquée avant d'ajouter de nouvelles entrées
+            with open(self.journal_path, "rb") as file:
+                file.seek(-1, os.SEEK_END)
+                if file.read(1) != b"\n":
+                    self._file.write("\n")
+        self._write({"type": "run", "version": JOURNAL_VERSION, "key": run_key, "resumed": completed is not None}, force=True)
+        return self.resumed
+
+    def _write(self, entry: Dict[str, Any], force: bool = False) -> None:
+        """Ajoute une entrée au journal et force l'écriture sur disque par lots."""
+        if self._file is None:
+            return
+        with self._lock:
+            self._file.write(json.dumps(entry, separators=(",", ":"), ensure_ascii=False) + "\n")
+            self._pending += 1
+            if force or self._pending >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+                self._sync()
+
+    def _sync(self) -> None:
+        """Force l'écriture des entrées en attente sur disque (appelé sous le verrou)."""
+        try:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        except OSError as e:
+            logger.warning(f"Impossible d'écrire le journal {self.journal_path} sur disque: {e}")
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def record_planned(self, operations: Iterable[str]) -> None:
+        """
+        Inscrit les opérations prévues par la synchronisation.
+
+        Args:
+            operations: Noms des opérations.
+        """
+        self._write({"type": "planned", "ops": sorted(operations)})
+
+    def is_done(self, operation: str) -> bool:
+        """
+        Indique si une opération a déjà été terminée (synchronisation reprise).
+
+        Args:
+            operation: Nom de l'opération.
+
+        Returns:
+            bool: True si l'opération est terminée.
+        """
+        return operation in self.completed
+
+    def result(self, operation: str) -> Any:
+        """
+        Retourne le résultat enregistré d'une opération terminée.
+
+        Args:
+            operation: Nom de l'opération.
+
+        Returns:
+            Any: Résultat de l'opération (None si elle n'est pas terminée).
+        """
+        return self.completed.get(operation)
+
+    def record_done(self, operation: str, result: Any = None) -> None:
+        """
+        Inscrit une opération terminée.
+
+        Args:
+            operation: Nom de l'opération.
+            result: Résultat de l'opération (sérialisable en JSON).
+        """
+        with self._lock:
+            self.completed[operation] = result
+        self._write({"type": "done", "op": operation, "result": result})
+
+    def close(self, complete: bool = False) -> None:
+        """
+        Ferme le journal.
+
+        Args:
+            complete: Si True, la synchronisation est marquée comme entièrement terminée.
+        """
+        if self._file is None:
+            return
+        if complete:
+            self._write({"type": "complete"})
+        with self._lock:
+            self._sync()
+            self._file.close()
+            self._file = None
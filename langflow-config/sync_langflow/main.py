@@ -1,16 +1,11 @@
 import argparse
-import logging
-import os
-import tempfile
 import sys
 
 from .config import Config
-from .utils import setup_logging, extract_flow_name_from_path
-from .clients.langflow import LangflowClient
-from .clients.openwebui import OpenWebUIManager
-from .managers.git import GitManager
-from .managers.flow import FlowManager
-from .managers.folder import FolderManager
+from .sync import SyncContext, resolve_report_path, run_sync
+from .targets import finalize_shards, load_targets, sync_targets
+from .telemetry import profiling
+from .utils import setup_logging
 
 def parse_arguments() -> argparse.Namespace:
     """Parse les arguments de la ligne de commande."""
@@ -23,11 +18,40 @@ def parse_arguments() -> argparse.Namespace:
     parser.add_argument("--before-commit", help="Commit de référence pour la comparaison (avant)")
     parser.add_argument("--after-commit", help="Commit de référence pour la comparaison (après)")
     parser.add_argument("--verbose", action="store_true", help="Active le mode verbeux pour le logging")
+    parser.add_argument("--validate-only", action="store_true", help="Valide les flows modifiés sans rien synchroniser (mode CI)")
+    parser.add_argument("--cache-dir", help="Répertoire du cache disque des réponses Langflow")
+    parser.add_argument("--cache-max-mb", type=int, help="Taille maximale du cache disque en Mo (défaut: 100)")
+    parser.add_argument("--compress-uploads", action="store_true", help="Compresse en gzip les fichiers de flows envoyés à Langflow")
+    parser.add_argument("--optimize-flows", action="store_true", help="Allège les flows avant l\"envoi (nœuds morts, état de l\"interface)")
+    parser.add_argument("--optimize-drop-notes", action="store_true", help="Supprime aussi les nœuds de notes lors de l\"optimisation")
+    parser.add_argument("--index-path", help="Fichier de l\"index des composants et modèles des flows, mis à jour à chaque synchronisation")
+    parser.add_argument("--max-workers", type=int, help="Nombre maximal de tâches de synchronisation exécutées simultanément (défaut: 4)")
+    parser.add_argument("--targets-file", help="Fichier JSON des cibles Langflow/OpenWebUI synchronisées en parallèle")
+    parser.add_argument("--report-path", help="Fichier du rapport JSON de la synchronisation, mesures comprises (par défaut: sync-report.json dans le répertoire du cache)")
+    parser.add_argument("--shard", help="Synchronise uniquement les dossiers du shard i/N (ex: 2/4), sans les phases globales")
+    parser.add_argument("--merge-reports", nargs="+", metavar="REPORT", help="Fusionne les rapports des shards et exécute une seule fois les phases globales")
+    parser.add_argument("--journal-path", help="Journal des opérations de synchronisation (par défaut: sync-journal.jsonl dans le répertoire du cache)")
+    parser.add_argument("--resume", action="store_true", help="Reprend une synchronisation interrompue sans rejouer les opérations déjà effectuées")
+    parser.add_argument("--profile", nargs="?", const="sync-profile.prof", metavar="PATH", help="Écrit un profil cProfile de l\"exécution (défaut: sync-profile.prof)")
+    parser.add_argument("--record-cassette", metavar="PATH", help="Enregistre les échanges HTTP de la synchronisation dans une cassette (.jsonl.gz)")
+    parser.add_argument("--replay-cassette", metavar="PATH", help="Rejoue les échanges HTTP d\"une cassette au lieu d\"appeler Langflow et OpenWebUI")
+    parser.add_argument("--replay-latency", type=float, metavar="FACTOR", help="Facteur appliqué aux latences enregistrées lors du rejeu (0: réponses immédiates, 1: latences d\"origine, défaut: 0)")
+    parser.add_argument("--batch-max-mb", type=float, help="Taille maximale d\"un lot de création de flows en Mo (0 pour désactiver, défaut: 4)")
+    
+    # Arguments du mode démon
+    parser.add_argument("--daemon", action="store_true", help="Synchronise en continu les nouveaux commits de la branche suivie")
+    parser.add_argument("--poll-interval", type=float, help="Intervalle de scrutation du dépôt distant en secondes (défaut: 30)")
+    parser.add_argument("--git-remote", help="Dépôt distant scruté (défaut: origin, chaîne vide pour suivre le HEAD local)")
+    parser.add_argument("--git-branch", help="Branche suivie (défaut: branche courante)")
+    parser.add_argument("--status-host", help="Adresse d\"écoute du serveur de statut et de webhook (défaut: 127.0.0.1)")
+    parser.add_argument("--status-port", type=int, help="Port du serveur de statut et de webhook (0 pour désactiver, défaut: 8787)")
+    parser.add_argument("--webhook-token", help="Jeton attendu dans l\"en-tête X-Sync-Token des appels de webhook")
     
     # Arguments OpenWebUI
     parser.add_argument("--openwebui-url", help="URL de l\"instance OpenWebUI")
     parser.add_argument("--openwebui-api-key", help="Clé API pour l\"authentification OpenWebUI")
     parser.add_argument("--enable-openwebui", action="store_true", help="Active l\"intégration avec OpenWebUI")
+    parser.add_argument("--verify-endpoints-remote", action="store_true", help="Contrôle les endpoints du dépôt avec les métadonnées des flows de Langflow avant de supprimer des pipelines")
     parser.add_argument("--openwebui-template-path", help="Chemin vers le template de pipeline personnalisé")
     
     return parser.parse_args()
@@ -48,8 +72,10 @@ def main():
         sys.exit(1)
         
     # Configurer le logging
-    logger = setup_logging(config.verbose)
-    logger.info("Configuration chargée:")
+    logger = setup_logging(config.verbose, show_threads=bool(config.targets_file))
+    # Configuration détaillée (secrets masqués) en mode verbeux uniquement: une synchronisation sans
+    # changement se termine sans autre sortie que la détection des changements
+    logger.debug("Configuration chargée:")
     # Utiliser des variables temporaires pour éviter les erreurs de syntaxe f-string
     log_config = config.to_dict()
     valve_langflow_api_url = log_config["valve_langflow_api_url"]
@@ -59,173 +85,111 @@ def main():
     before_commit = log_config["before_commit"]
     after_commit = log_config["after_commit"]
     verbose = log_config["verbose"]
+    cache_dir = log_config["cache_dir"]
+    cache_max_mb = log_config["cache_max_mb"]
+    compress_uploads = log_config["compress_uploads"]
+    batch_max_mb = log_config["batch_max_mb"]
+    optimize_flows = log_config["optimize_flows"]
+    optimize_keep_notes = log_config["optimize_keep_notes"]
+    index_path = log_config["index_path"]
+    max_workers = log_config["max_workers"]
+    targets_file = log_config["targets_file"]
+    report_path = log_config["report_path"]
+    shard = log_config["shard"]
+    journal_path = log_config["journal_path"]
+    resume = log_config["resume"]
+    profile_path = log_config["profile_path"]
+    record_path = log_config["record_path"]
+    replay_path = log_config["replay_path"]
+    replay_latency = log_config["replay_latency"]
+    daemon = log_config["daemon"]
+    poll_interval = log_config["poll_interval"]
+    git_remote = log_config["git_remote"]
+    git_branch = log_config["git_branch"]
+    status_host = log_config["status_host"]
+    status_port = log_config["status_port"]
     enable_openwebui = log_config["enable_openwebui"]
     openwebui_url = log_config["openwebui_url"]
     openwebui_api_key = log_config["openwebui_api_key"]
     openwebui_template_path = log_config["openwebui_template_path"]
+    verify_endpoints_remote = log_config["verify_endpoints_remote"]
     
-    logger.info(f"  Langflow URL: {langflow_url}")
-    logger.info(f"  API Token: {api_token}")
-    logger.info(f"  Repo Path: {repo_path}")
-    logger.info(f"  Before Commit: {before_commit}")
-    logger.info(f"  After Commit: {after_commit}")
-    logger.info(f"  Verbose: {verbose}")
-    logger.info(f"  Enable OpenWebUI: {enable_openwebui}")
+    logger.debug(f"  Langflow URL: {langflow_url}")
+    logger.debug(f"  API Token: {api_token}")
+    logger.debug(f"  Repo Path: {repo_path}")
+    logger.debug(f"  Before Commit: {before_commit}")
+    logger.debug(f"  After Commit: {after_commit}")
+    logger.debug(f"  Verbose: {verbose}")
+    if config.cache_dir:
+        logger.debug(f"  Cache Dir: {cache_dir} (max {cache_max_mb} Mo)")
+    logger.debug(f"  Compress Uploads: {compress_uploads}")
+    logger.debug(f"  Batch Max Size: {batch_max_mb} Mo")
+    logger.debug(f"  Max Workers: {max_workers}")
+    logger.debug(f"  Optimize Flows: {optimize_flows} (notes conservées: {optimize_keep_notes})")
+    if config.index_path:
+        logger.debug(f"  Index Path: {index_path}")
+    if config.targets_file:
+        logger.debug(f"  Targets File: {targets_file}")
+    if config.report_path:
+        logger.debug(f"  Report Path: {report_path}")
+    if config.shard:
+        logger.debug(f"  Shard: {shard}")
+    if config.journal_path or config.resume:
+        logger.debug(f"  Journal Path: {journal_path} (reprise: {resume})")
+    if config.profile_path:
+        logger.debug(f"  Profile Path: {profile_path}")
+    if config.record_path:
+        logger.debug(f"  Record Cassette: {record_path}")
+    if config.replay_path:
+        logger.debug(f"  Replay Cassette: {replay_path} (latence x{replay_latency})")
+    if config.daemon:
+        logger.debug(f"  Daemon: {daemon} (remote: {git_remote}, branche: {git_branch}, intervalle: {poll_interval}s)")
+        logger.debug(f"  Status Server: {status_host}:{status_port}")
+    logger.debug(f"  Enable OpenWebUI: {enable_openwebui}")
     if config.enable_openwebui:
-        logger.info(f"  OpenWebUI URL: {openwebui_url}")
-        logger.info(f"  OpenWebUI API Key: {openwebui_api_key}")
-        logger.info(f"  OpenWebUI Template Path: {openwebui_template_path}")
-        logger.info(f"  Valves Langflow Default Api Url : {valve_langflow_api_url}")
-
-    # Initialiser les clients
-    try:
-        langflow_client = LangflowClient(config.langflow_url, config.api_token)
-        openwebui_manager = None
-        if config.enable_openwebui:
-            openwebui_manager = OpenWebUIManager(
-                config.openwebui_url,
-                config.openwebui_api_key,
-                config.openwebui_template_path,
-                config.valve_langflow_api_url
-            )
-    except Exception as e:
-        logger.error(f"Erreur lors de l\"initialisation des clients: {e}")
-        sys.exit(1)
-
-    # Initialiser les gestionnaires
-    git_manager = GitManager(config.repo_path)
-    flow_manager = FlowManager(langflow_client)
-    folder_manager = FolderManager(langflow_client)
-
-    logger.info("Démarrage de la synchronisation Langflow...")
+        logger.debug(f"  OpenWebUI URL: {openwebui_url}")
+        logger.debug(f"  OpenWebUI API Key: {openwebui_api_key}")
+        logger.debug(f"  OpenWebUI Template Path: {openwebui_template_path}")
+        logger.debug(f"  Verify Endpoints Remote: {verify_endpoints_remote}")
+        logger.debug(f"  Valves Langflow Default Api Url : {valve_langflow_api_url}")
 
-    # 1. Détecter les changements Git
-    logger.info("Détection des changements Git...")
-    if not config.before_commit or not config.after_commit:
+    if not config.daemon and not args.merge_reports and (not config.before_commit or not config.after_commit):
         logger.error("Les commits de référence (before et after) sont requis pour détecter les changements.")
         sys.exit(1)
-        
-    changes = git_manager.detect_changes(config.before_commit, config.after_commit)
-    logger.info("Changements détectés:")
-    # Correction: Utiliser des variables temporaires pour les longueurs
-    num_flows_added = len(changes["flows_added"])
-    num_flows_modified = len(changes["flows_modified"])
-    num_flows_deleted = len(changes["flows_deleted"])
-    logger.info(f"  - Flows ajoutés: {num_flows_added}")
-    logger.info(f"  - Flows modifiés: {num_flows_modified}")
-    logger.info(f"  - Flows supprimés: {num_flows_deleted}")
-
-    # 2. Traiter les flows supprimés
-    if changes["flows_deleted"]:
-        logger.info("Traitement des flows supprimés...")
-        deleted_flow_ids = flow_manager.process_deleted_flows(changes["flows_deleted"])
-        logger.info(f"Flows supprimés avec succès: {len(deleted_flow_ids)}")
-
-    # 3. Traiter les flows ajoutés
-    processed_added_flows = {}
-    if changes["flows_added"]:
-        logger.info("Traitement des flows ajoutés...")
-        processed_added_flows = flow_manager.process_added_flows(changes["flows_added"], config.repo_path)
-        logger.info(f"Flows ajoutés traités (ajoutés/mis à jour dans Langflow): {len(processed_added_flows)}")
-
-    # 4. Traiter les flows modifiés
-    processed_modified_flows = {}
-    if changes["flows_modified"]:
-        logger.info("Traitement des flows modifiés...")
-        processed_modified_flows = flow_manager.process_modified_flows(changes["flows_modified"], config.repo_path)
-        logger.info(f"Flows modifiés traités (ajoutés/mis à jour dans Langflow): {len(processed_modified_flows)}")
-
-    # 5. Combiner les flows ajoutés et modifiés pour l\"organisation et OpenWebUI
-    all_processed_flows = {**processed_added_flows, **processed_modified_flows}
-    all_processed_flow_paths = changes["flows_added"] + changes["flows_modified"]
-
-    # 6. Organiser les flows en dossiers
-    if all_processed_flow_paths:
-        logger.info("Organisation des flows en dossiers...")
-        folder_manager.organize_flows_by_folder(all_processed_flow_paths, all_processed_flows)
-
-    # 7. Intégration OpenWebUI (si activée)
-    if config.enable_openwebui and openwebui_manager and all_processed_flows:
-        logger.info("Intégration OpenWebUI...")
-        # Créer un répertoire temporaire pour les pipelines générés
-        with tempfile.TemporaryDirectory() as temp_dir:
-            pipelines_uploaded = 0
-            for flow_id, flow_data in all_processed_flows.items():
-                # Trouver le chemin correspondant pour extraire le nom de fichier original si nécessaire
-                flow_path_for_name = None
-                flow_name_from_data = flow_data.get("name")
-                if flow_name_from_data:
-                     for path in all_processed_flow_paths:
-                         if extract_flow_name_from_path(path) == flow_name_from_data:
-                             flow_path_for_name = path
-                             break
-                if not flow_path_for_name:
-                     # Fallback si on ne trouve pas le chemin exact (devrait être rare)
-                     logger.warning(f"Impossible de trouver le chemin exact pour le flow ID {flow_id}, utilisation d\"un nom par défaut.")
-                     flow_path_for_name = f"unknown_flow_{flow_id}.json"
-
-                logger.debug(f"Traitement du flow {flow_id} pour OpenWebUI...")
-                endpoint_name, flow_name = openwebui_manager.extract_flow_info(flow_data, flow_path_for_name)
-                
-                if endpoint_name and flow_name:
-                    logger.info(f"  -> Génération du pipeline pour 	{flow_name}	 (Endpoint: {endpoint_name})")
-                    pipeline_path = openwebui_manager.generate_pipeline(endpoint_name, flow_name, temp_dir)
-                    
-                    if pipeline_path:
-                        logger.info(f"  -> Téléchargement du pipeline {os.path.basename(pipeline_path)} vers OpenWebUI...")
-                        success = openwebui_manager.upload_pipeline(pipeline_path)
-                        if success:
-                            pipelines_uploaded += 1
-                        # Le fichier temporaire sera supprimé automatiquement à la sortie du bloc `with`
-                    else:
-                        logger.error(f"  -> Échec de la génération du pipeline pour {flow_name}")
-                else:
-                    logger.warning(f"  -> Informations insuffisantes (endpoint ou nom) pour générer le pipeline pour le flow ID {flow_id}")
-            logger.info(f"Pipelines OpenWebUI téléchargés/mis à jour: {pipelines_uploaded}")
-        
-    # 7.5 Supprimer les pipelines OpenWebUI non utilisés
-    if config.enable_openwebui and openwebui_manager:
-        logger.info("Suppression des pipelines OpenWebUI non utilisés...")
-        
-        # Collecter tous les endpoints utilisés par les flows existants
-        used_endpoints = []
-        
-        # Récupérer tous les flows actifs dans Langflow
-        all_flows = langflow_client.get_flows()
-        
-        for flow in all_flows:
-            # Extraire l'endpoint_name du flow
-            endpoint_name = flow.get("data", {}).get("endpoint_name")
-            flow_name = flow.get("name", "")
-            
-            # Si l'endpoint_name n'est pas disponible, utiliser le nom du flow comme fallback
-            if not endpoint_name and flow_name:
-                endpoint_name = flow_name.lower().replace(" ", "_")
-            
-            if endpoint_name:
-                used_endpoints.append(endpoint_name)
-        
-        # Appeler la méthode pour supprimer les pipelines non utilisés
-        deleted_count, deleted_pipelines = openwebui_manager.delete_unused_pipelines(used_endpoints)
-        
-        if deleted_count > 0:
-            logger.info(f"Pipelines OpenWebUI supprimés: {deleted_count}")
-            for pipeline_name in deleted_pipelines:
-                logger.info(f"  - {pipeline_name}")
-        else:
-            logger.info("Aucun pipeline OpenWebUI non utilisé à supprimer")
-
-    # 8. Supprimer les dossiers vides
-    logger.info("Suppression des dossiers vides...")
-    deleted_folders = folder_manager.delete_empty_folders()
-    if deleted_folders:
-        logger.info(f"Dossiers vides supprimés: {len(deleted_folders)}")
-        for folder_name in deleted_folders:
-            logger.info(f"  - {folder_name}")
-    else:
-        logger.info("Aucun dossier vide à supprimer")
 
-    logger.info("Synchronisation terminée.")
+    # Plusieurs cibles: chacune dispose de ses propres clients et gestionnaires
+    targets = [("default", config)]
+    if config.targets_file:
+        try:
+            targets = load_targets(config.targets_file, config)
+        except ValueError as e:
+            logger.error(f"Erreur de configuration des cibles: {e}")
+            sys.exit(1)
+
+    # Profilage optionnel de toute l'exécution, écrit même en cas de sortie anticipée
+    with profiling(config.profile_path):
+        # Fusion des shards: phases globales exécutées une seule fois pour toutes les cibles
+        if args.merge_reports:
+            sys.exit(finalize_shards(config, targets, args.merge_reports, config.report_path))
+
+        if config.targets_file:
+            sys.exit(sync_targets(
+                config, targets, config.before_commit, config.after_commit, args.validate_only,
+                resolve_report_path(config)
+            ))
+
+        # Initialiser le contexte de la cible: les clients ne sont créés qu'au premier appel réseau
+        try:
+            context = SyncContext(config)
+        except Exception as e:
+            logger.error(f"Erreur lors de l\"initialisation des clients: {e}")
+            sys.exit(1)
+
+        if config.daemon:
+            # Import différé: le serveur de statut n'est chargé qu'en mode démon
+            from .daemon import SyncDaemon
+            sys.exit(SyncDaemon(context).run())
+        sys.exit(run_sync(context, config.before_commit, config.after_commit, args.validate_only))
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,149 @@
+import logging
+from typing import Dict, Iterable, List, Any, Optional, Set, Tuple
+
+from .index import FlowIndex
+from ..processing.loader import FlowLoader
+from ..utils import derive_endpoint_name, derive_pipeline_name, extract_flow_id, extract_flow_name_from_path
+
+logger = logging.getLogger("sync_app")
+
+class EndpointIndex:
+    """Index des IDs, endpoint_names et noms de pipelines OpenWebUI de tous les flows du dépôt."""
+
+    def __init__(self):
+        """Initialise un index vide."""
+        self.endpoints = {} # endpoint_name -> chemins des flows
+        self.pipelines = {} # nom du pipeline -> chemins des flows
+        self.flow_ids = {} # chemin du flow -> ID du flow (flows portant un ID seulement)
+
+    def add_flow(self, flow_path: str, flow_name: Optional[str], endpoint_name: Optional[str],
+                 flow_id: Optional[str] = None) -> None:
+        """
+        Ajoute un flow à l'index, avec les mêmes règles de dérivation que l'intégration OpenWebUI.
+
+        Args:
+            flow_path: Chemin relatif du fichier de flow dans le dépôt.
+            flow_name: Nom du flow (le nom du fichier est utilisé s'il est absent).
+            endpoint_name: endpoint_name du flow (dérivé du nom s'il est absent).
+            flow_id: ID du flow (optionnel).
+        """
+        flow_name = flow_name or extract_flow_name_from_path(flow_path)
+        endpoint_name = endpoint_name or derive_endpoint_name(flow_name)
+        self.endpoints.setdefault(endpoint_name, []).append(flow_path)
+        self.pipelines.setdefault(derive_pipeline_name(flow_name), []).append(flow_path)
+        if flow_id:
+            self.flow_ids[flow_path] = flow_id
+
+    @classmethod
+    def from_flow_files(cls, flow_paths: List[str], loader: FlowLoader) -> "EndpointIndex":
+        """
+        Construit l'index à partir des fichiers de flows du dépôt.
+
+        Args:
+            flow_paths: Chemins relatifs de tous les fichiers de flows.
+            loader: Chargeur des fichiers de flows.
+
+        Returns:
+            EndpointIndex: Index construit (les flows illisibles sont ignorés).
+        """
+        endpoint_index = cls()
+        for flow_path in flow_paths:
+            try:
+                flow_data = loader.load(flow_path)
+            except Exception as e:
+                logger.warning(f"Flow {flow_path} illisible, ignoré dans l'index des endpoints: {e}")
+                continue
+            endpoint_index.add_flow(
+                flow_path, flow_data.get("name"), flow_data.get("endpoint_name"), extract_flow_id(flow_data)
+            )
+        return endpoint_index
+
+    @classmethod
+    def from_flow_index(cls, flow_index: FlowIndex) -> "EndpointIndex":
+        """
+        Construit l'index à partir de l'index des flows, sans relire aucun fichier de flow.
+
+        Args:
+            flow_index: Index des flows, à jour au commit synchronisé.
+
+        Returns:
+            EndpointIndex: Index construit.
+        """
+        endpoint_index = cls()
+        for flow_path, entry in flow_index.flows.items():
+            endpoint_index.add_flow(flow_path, entry.get("name"), entry.get("endpoint_name"), entry.get("id"))
+        return endpoint_index
+
+    def cross_check(self, remote_flows: Iterable[Dict[str, Any]]) -> Tuple[List[str], List[str]]:
+        """
+        Compare les endpoints du dépôt à ceux des flows présents dans Langflow (métadonnées seules).
+
+        Les endpoints des flows présents uniquement dans Langflow sont ajoutés à l'index, afin que
+        leurs pipelines ne soient pas supprimés.
+
+        Args:
+            remote_flows: En-têtes des flows de Langflow (name, endpoint_name).
+
+        Returns:
+            Tuple[List[str], List[str]]: Endpoints absents de Langflow et endpoints présents
+            uniquement dans Langflow.
+        """
+        repo_endpoints = set(self.endpoints)
+        remote_endpoints = set()
+        for flow in remote_flows:
+            flow_name = flow.get("name") or ""
+            endpoint_name = flow.get("endpoint_name") or derive_endpoint_name(flow_name)
+            if not endpoint_name:
+                continue
+            remote_endpoints.add(endpoint_name)
+            if endpoint_name not in repo_endpoints:
+                self.add_flow(f"langflow:{flow.get('id')}", flow_name, endpoint_name)
+        return sorted(repo_endpoints - remote_endpoints), sorted(remote_endpoints - repo_endpoints)
+
+    def shared_ids(self) -> Dict[str, List[str]]:
+        """
+        Liste les IDs portés par plusieurs fichiers de flows.
+
+        Un fichier de flow copié garde l'ID de l'original: ces flows ne peuvent pas être retrouvés
+        par leur ID (ils se remplaceraient dans Langflow) et le sont par leur nom.
+
+        Returns:
+            Dict[str, List[str]]: Chemins des flows de chaque ID partagé (ID -> chemins).
+        """
+        paths_by_id = {}
+        for flow_path, flow_id in self.flow_ids.items():
+            paths_by_id.setdefault(flow_id, []).append(flow_path)
+        return {flow_id: flow_paths for flow_id, flow_paths in paths_by_id.items() if len(flow_paths) > 1}
+
+    def collisions(self, include_pipelines: bool = True) -> List[str]:
+        """
+        Liste les endpoint_names (et noms de pipelines) partagés par plusieurs flows.
+
+        Les IDs partagés ne sont pas bloquants (voir shared_ids).
+
+        Args:
+            include_pipelines: Si True, les collisions de noms de pipelines sont aussi signalées.
+
+        Returns:
+            List[str]: Description de chaque collision (liste vide s'il n'y en a aucune).
+        """
+        collisions = [
+            f"endpoint_name '{endpoint_name}' partagé par: {', '.join(flow_paths)}"
+            for endpoint_name, flow_paths in sorted(self.endpoints.items()) if len(flow_paths) > 1
+        ]
+        if include_pipelines:
+            collisions.extend(
+                f"pipeline '{pipeline_name}.py' partagé par: {', '.join(flow_paths)}"
+                for pipeline_name, flow_paths in sorted(self.pipelines.items()) if len(flow_paths) > 1
+            )
+        return collisions
+
+    def used_names(self) -> Set[str]:
+        """
+        Retourne les noms utilisés par les flows du dépôt, pour l'élagage des pipelines OpenWebUI:
+        endpoint_names et noms de pipelines (l'ID d'un pipeline est le nom de son fichier).
+
+        Returns:
+            Set[str]: Noms utilisés.
+        """
+        return set(self.endpoints) | set(self.pipelines)
@@ -1,40 +1,190 @@
 import json
 import logging
 import os
-from typing import Dict, List, Optional, Tuple, Any # Ajout de Any
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple, Any # Ajout de Any
 
-from ..clients.langflow import LangflowClient
-from ..utils import extract_flow_name_from_path
+from ..clients.langflow import FLOW_HEADER_FIELDS, LangflowClient
+from ..processing.diff import PATCH_CLEARABLE_FIELDS, compute_flow_patch, diff_flows
+from ..processing.loader import FlowLoader
+from ..processing.optimize import optimize_flow
+from ..records import FlowRecord
+from ..utils import extract_flow_name_from_path, extract_folder_name_from_path
 
 logger = logging.getLogger("sync_app")
 
 class FlowManager:
     """Gestionnaire pour les opérations sur les flows Langflow."""
 
-    def __init__(self, client: LangflowClient):
+    def __init__(self, client: LangflowClient, batch_max_bytes: int = 4 * 1024 * 1024,
+                 optimize: bool = False, keep_notes: bool = True):
         """
         Initialise le gestionnaire de flows.
         
         Args:
             client: Client API Langflow.
+            batch_max_bytes: Taille maximale d'un lot de création de flows (0 pour désactiver les lots).
+            optimize: Si True, les flows sont allégés (nœuds morts, état de l'interface) avant l'envoi.
+            keep_notes: Si True, l'optimisation conserve les nœuds de notes.
         """
         self.client = client
-        self._flows_cache = None # Cache pour find_flow_by_name
+        self.batch_max_bytes = batch_max_bytes
+        self._loader = None # Chargeur des fichiers de flows (overlays de templates développés)
+        self.optimize = optimize
+        self.keep_notes = keep_notes
+        # Statistiques de l'optimisation avant envoi
+        self.optimize_stats = {"flows": 0, "nodes_removed": 0, "bytes_removed": 0}
+        # Les flows peuvent être traités en parallèle: protéger la liste des flows et les statistiques
+        self._flows_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._flows_cache = None # Cache pour find_flow_by_name (nom -> métadonnées)
+        self._flow_names = {} # Nom de chaque flow du cache (ID -> nom), pour le tenir à jour
+        # Cache mis à jour pendant la synchronisation en cours: un flow absent du cache n'existait pas
+        # au début de la synchronisation, inutile de relister tous les flows à chaque recherche
+        self._flows_refreshed = False
+        # Statistiques des PATCH minimaux (octets du flow complet / octets réellement envoyés)
+        self.patch_stats = {"full_bytes": 0, "sent_bytes": 0}
+        # IDs stables des flows, lus dans les fichiers (chemin -> ID): les flows sont d'abord
+        # recherchés par ID, le nom ne sert qu'en dernier recours
+        self.flow_ids = {}
+        self.moved_flows = {} # Flows déplacés ou renommés (nouveau chemin -> ancien chemin)
+        # Flows dont l'ID est partagé avec d'autres fichiers: retrouvés par leur nom et créés sans leur ID
+        self.shared_id_flows = set()
 
-    def _get_all_flows(self, refresh: bool = False) -> List[Dict[str, Any]]:
+    def _get_all_flows(self, refresh: bool = False) -> Dict[str, Dict[str, Any]]:
         """
-        Récupère tous les flows (avec cache).
+        Récupère l\"index des flows par nom (avec cache).
+        
+        Seules les métadonnées des flows (id, name, folder_id, endpoint_name, updated_at)
+        sont récupérées et conservées, jamais leur graphe.
         
         Args:
             refresh: Si True, force la récupération des flows depuis l\"API.
             
         Returns:
-            List[Dict[str, Any]]: Liste des flows.
+            Dict[str, Dict[str, Any]]: Métadonnées des flows indexées par nom.
+        """
+        with self._flows_lock:
+            flows_cache = self._flows_cache
+            if flows_cache is None or refresh:
+                logger.debug("Mise à jour du cache des flows...")
+                flows_cache = {}
+                flow_names = {}
+                for header in self.client.iter_flow_headers():
+                    # En cas de doublon de nom, conserver le premier flow comme l'ancienne recherche linéaire
+                    if header.get("name") and header["name"] not in flows_cache:
+                        flows_cache[header["name"]] = header
+                        flow_names[header.get("id")] = header["name"]
+                self._flows_cache = flows_cache
+                self._flow_names = flow_names
+                self._flows_refreshed = True
+            return flows_cache
+
+    def _remember_flow(self, flow_data: Dict[str, Any]) -> None:
+        """
+        Enregistre un flow créé ou mis à jour dans le cache des flows, sans relister Langflow.
+        
+        Args:
+            flow_data: Données du flow renvoyées par Langflow (seules ses métadonnées sont conservées).
+        """
+        header = {field: flow_data.get(field) for field in FLOW_HEADER_FIELDS}
+        flow_id, flow_name = header["id"], header["name"]
+        if not flow_id:
+            return
+        with self._flows_lock:
+            if self._flows_cache is None:
+                return
+            # Un flow renommé ne doit plus être trouvé sous son ancien nom
+            previous_name = self._flow_names.pop(flow_id, None)
+            if previous_name is not None and self._flows_cache.get(previous_name, {}).get("id") == flow_id:
+                del self._flows_cache[previous_name]
+            cached_flow = self._flows_cache.get(flow_name) if flow_name else None
+            if flow_name and (cached_flow is None or cached_flow.get("id") == flow_id):
+                self._flows_cache[flow_name] = header
+                self._flow_names[flow_id] = flow_name
+
+    def _forget_flow(self, flow_id: str) -> None:
+        """
+        Retire un flow supprimé du cache des flows, sans relister Langflow.
+        
+        Args:
+            flow_id: ID du flow supprimé.
+        """
+        with self._flows_lock:
+            if self._flows_cache is None:
+                return
+            flow_name = self._flow_names.pop(flow_id, None)
+            if flow_name is not None and self._flows_cache.get(flow_name, {}).get("id") == flow_id:
+                del self._flows_cache[flow_name]
+
+    def reset(self) -> None:
+        """
+        Prépare le gestionnaire pour une nouvelle synchronisation: les statistiques sont remises à zéro
+        et le chargeur (qui garde les templates lus en cache) est recréé. La liste des flows de
+        Langflow est conservée, mais sera rafraîchie à la première recherche infructueuse.
+        """
+        with self._stats_lock:
+            self.optimize_stats = {"flows": 0, "nodes_removed": 0, "bytes_removed": 0}
+            self.patch_stats = {"full_bytes": 0, "sent_bytes": 0}
+        self._loader = None
+        with self._flows_lock:
+            self._flows_refreshed = False
+
+    def _get_loader(self, repo_path: str) -> FlowLoader:
+        """
+        Retourne le chargeur de flows du dépôt (créé à la première utilisation).
+        
+        Args:
+            repo_path: Chemin absolu du dépôt Git.
+            
+        Returns:
+            FlowLoader: Chargeur de flows.
+        """
+        if self._loader is None or self._loader.repo_path != repo_path:
+            self._loader = FlowLoader(repo_path)
+        return self._loader
+
+    def _load_flow(self, flow_path: str, repo_path: str) -> Dict[str, Any]:
+        """
+        Charge un flow du dépôt tel qu'il sera envoyé à Langflow (développé puis optimisé si activé).
+        
+        Args:
+            flow_path: Chemin relatif du fichier de flow dans le dépôt.
+            repo_path: Chemin absolu du dépôt Git.
+            
+        Returns:
+            Dict[str, Any]: Données du flow à envoyer.
         """
-        if self._flows_cache is None or refresh:
-            logger.debug("Mise à jour du cache des flows...")
-            self._flows_cache = self.client.get_flows()
-        return self._flows_cache
+        flow_data = self._get_loader(repo_path).load(flow_path)
+        if not self.optimize:
+            return flow_data
+        
+        flow_data, report = optimize_flow(flow_data, keep_notes=self.keep_notes)
+        with self._stats_lock:
+            self.optimize_stats["flows"] += 1
+            self.optimize_stats["nodes_removed"] += report["nodes_removed"]
+            self.optimize_stats["bytes_removed"] += report["bytes_removed"]
+        if report["nodes_removed"]:
+            logger.info(f"Flow {flow_path} optimisé: {report['nodes_removed']} nœuds supprimés ({', '.join(report['removed_node_ids'])})")
+        logger.debug(f"Flow {flow_path} optimisé: {report['bytes_removed']} octets supprimés sur {report['bytes_before']}")
+        return flow_data
+
+    def _load_flow_for_create(self, flow_path: str, repo_path: str) -> Dict[str, Any]:
+        """
+        Charge un flow à créer. L'ID d'un flow qui le partage avec d'autres fichiers n'est pas
+        envoyé: Langflow en attribue un, et le flow sera retrouvé par son nom.
+        
+        Args:
+            flow_path: Chemin relatif du fichier de flow dans le dépôt.
+            repo_path: Chemin absolu du dépôt Git.
+            
+        Returns:
+            Dict[str, Any]: Données du flow à envoyer.
+        """
+        flow_data = self._load_flow(flow_path, repo_path)
+        if flow_path in self.shared_id_flows:
+            flow_data = {key: value for key, value in flow_data.items() if key != "id"}
+        return flow_data
 
     def add_flow(self, flow_path: str, repo_path: str) -> Tuple[bool, Optional[str], Optional[Dict[str, Any]]]:
         """
@@ -57,39 +207,197 @@ class FlowManager:
             return False, None, None
         
         try:
-            # Lire le contenu du fichier
-            with open(full_path, "r", encoding="utf-8") as file:
-                flow_data = json.load(file)
-            
-            # Créer le flow
-            result = self.client.create_flow(flow_data)
+            loader = self._get_loader(repo_path)
+            result = None
+            if self.optimize or loader.needs_expansion(flow_path) or flow_path in self.shared_id_flows:
+                # Les flows optimisés, les overlays de templates, les références de composants et
+                # les flows à ID partagé doivent être décodés et transformés avant l\"envoi
+                result = self.client.create_flow(self._load_flow_for_create(flow_path, repo_path))
+            # Envoyer les octets du fichier sans les décoder: endpoint d'upload si disponible,
+            # sinon création classique (compressée si le client l'a activée)
+            elif not self.client.compress_requests and self.client.file_upload_supported is not False:
+                created_flows = self.client.upload_flow_file(full_path)
+                result = created_flows[0] if created_flows else None
+                if result is None and self.client.file_upload_supported is False:
+                    result = self.client.create_flow_from_file(full_path)
+            else:
+                result = self.client.create_flow_from_file(full_path)
             
             if result and "id" in result:
                 flow_id = result["id"]
                 logger.info(f"Flow ajouté avec succès: {flow_path} (ID: {flow_id})")
-                self._flows_cache = None # Invalider le cache
+                self._check_assigned_id(flow_path, flow_id)
+                self._remember_flow(result)
                 return True, flow_id, result # Retourner les données complètes du flow créé
             else:
                 logger.error(f"Échec de l\"ajout du flow: {flow_path}")
                 return False, None, None
-        except json.JSONDecodeError as e:
-            logger.error(f"Erreur de décodage JSON pour le flow {flow_path}: {e}")
-            return False, None, None
         except Exception as e:
             logger.error(f"Erreur lors de l\"ajout du flow {flow_path}: {e}")
             return False, None, None
     
-    def update_flow(self, flow_id: str, flow_path: str, repo_path: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+    def _check_assigned_id(self, flow_path: str, flow_id: str) -> None:
+        """Signale un flow créé sous un autre ID que celui de son fichier (serveur qui attribue ses propres IDs)."""
+        file_flow_id = self.flow_ids.get(flow_path)
+        if file_flow_id and file_flow_id != flow_id:
+            logger.debug(f"Langflow a attribué l'ID {flow_id} au flow {flow_path} (ID du fichier: {file_flow_id}): il sera retrouvé par son nom")
+    
+    def _get_deployed_flow(self, flow_id: str, existing_flow: Optional[Dict[str, Any]] = None) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """
+        Récupère la version déployée d'un flow dans Langflow, référence du PATCH minimal.
+        
+        La copie distante fait foi: un PATCH précédent en échec ou une modification faite dans
+        l'interface de Langflow sont ainsi corrigés à la synchronisation suivante. Avec le cache
+        disque, le flow n'est re-téléchargé que si son updated_at a changé.
+        
+        Args:
+            flow_id: ID du flow dans Langflow.
+            existing_flow: Métadonnées du flow distant, dont updated_at (optionnel).
+            
+        Returns:
+            Tuple[bool, Optional[Dict[str, Any]]]: False si aucun flow ne porte cet ID, et la version
+            déployée du flow (None si elle n'a pas pu être lue: le flow complet sera envoyé).
+        """
+        updated_at = existing_flow.get("updated_at") if existing_flow else None
+        return self.client.get_flow_if_exists(flow_id, updated_at)
+    
+    def _iter_batches(self, flow_paths: List[str], repo_path: str) -> Iterator[List[Tuple[str, bytes]]]:
+        """
+        Découpe une liste de flows en lots dont la taille cumulée reste sous batch_max_bytes.
+        
+        Args:
+            flow_paths: Liste des chemins relatifs des flows.
+            repo_path: Chemin absolu du dépôt Git.
+            
+        Yields:
+            List[Tuple[str, bytes]]: Lot de flows (chemin relatif, corps JSON).
+        """
+        current_batch = []
+        current_size = 0
+        for flow_path in flow_paths:
+            try:
+                if self.optimize or flow_path in self.shared_id_flows:
+                    body = json.dumps(self._load_flow_for_create(flow_path, repo_path)).encode("utf-8")
+                else:
+                    body = self._get_loader(repo_path).read_bytes(flow_path)
+            except Exception as e:
+                # Un flow illisible est traité seul: son ajout individuel journalisera l'erreur
+                logger.warning(f"Flow {flow_path} exclu des lots: {e}")
+                yield [(flow_path, None)]
+                continue
+            if current_batch and current_size + len(body) > self.batch_max_bytes:
+                yield current_batch
+                current_batch, current_size = [], 0
+            current_batch.append((flow_path, body))
+            current_size += len(body)
+        if current_batch:
+            yield current_batch
+    
+    def _find_created_flow(self, flow_path: str) -> Optional[Dict[str, Any]]:
+        """
+        Recherche un flow dont la création par lot a pu aboutir malgré une erreur: par son ID,
+        puis par son nom dans la liste des flows (rafraîchie par l'appelant).
+        
+        Args:
+            flow_path: Chemin relatif du fichier de flow dans le dépôt.
+            
+        Returns:
+            Optional[Dict[str, Any]]: Données ou métadonnées du flow, ou None s'il n'a pas été créé.
+            
+        Raises:
+            Exception: Si le flow n'a pas pu être lu: il ne doit pas être recréé.
+        """
+        flow_id = self.flow_ids.get(flow_path)
+        if flow_id:
+            found, flow_data = self.client.get_flow_if_exists(flow_id)
+            if found:
+                if flow_data is None:
+                    raise Exception(f"lecture du flow {flow_id} impossible")
+                return flow_data
+        return self._get_all_flows().get(extract_flow_name_from_path(flow_path))
+
+    def add_flows_batch(self, flow_paths: List[str], repo_path: str) -> Dict[str, FlowRecord]:
+        """
+        Ajoute plusieurs flows à Langflow par lots, une requête par lot.
+        
+        Les flows créés sont associés aux fichiers dans l'ordre de la réponse. Si une requête
+        groupée est refusée, chaque flow du lot est ajouté individuellement; si son résultat est
+        inconnu (réponse perdue, erreur du serveur), les flows déjà créés sont d'abord recherchés
+        par ID ou par nom, afin de ne pas les créer en double.
+        
+        Args:
+            flow_paths: Liste des chemins relatifs des flows à ajouter.
+            repo_path: Chemin absolu du dépôt Git.
+            
+        Returns:
+            Dict[str, FlowRecord]: Dictionnaire des flows ajoutés (ID -> enregistrement).
+        """
+        added_flows = {}
+        batches = [[(flow_path, None)] for flow_path in flow_paths]
+        if len(flow_paths) > 1 and self.batch_max_bytes > 0:
+            batches = self._iter_batches(flow_paths, repo_path)
+        
+        for batch in batches:
+            batch_paths = [flow_path for flow_path, _ in batch]
+            results, maybe_created = None, False
+            if len(batch) > 1 and self.client.batch_create_supported is not False:
+                logger.info(f"Création par lot de {len(batch)} flows...")
+                results, maybe_created = self.client.create_flows_batch([body for _, body in batch])
+            del batch
+            
+            if results is None:
+                results = [None] * len(batch_paths)
+                if maybe_created:
+                    logger.warning(f"Résultat de la création par lot inconnu, recherche des {len(batch_paths)} flows avant leur ajout individuel")
+                    try:
+                        # La liste des flows en cache ignore ceux que le lot a pu créer
+                        self._get_all_flows(refresh=True)
+                    except Exception as e:
+                        logger.error(f"{len(batch_paths)} flows non ajoutés, impossible de vérifier leur création par lot: {e}")
+                        continue
+                elif len(batch_paths) > 1:
+                    logger.warning(f"Création par lot impossible, ajout individuel de {len(batch_paths)} flows")
+            
+            for flow_path, result in zip(batch_paths, results):
+                if result and "id" in result:
+                    logger.info(f"Flow ajouté avec succès (lot): {flow_path} (ID: {result['id']})")
+                    self._check_assigned_id(flow_path, result["id"])
+                    self._remember_flow(result)
+                    added_flows[result["id"]] = FlowRecord.from_flow_data(flow_path, result)
+                    continue
+                if maybe_created:
+                    try:
+                        result = self._find_created_flow(flow_path)
+                    except Exception as e:
+                        logger.error(f"Flow {flow_path} non ajouté, impossible de vérifier sa création par lot: {e}")
+                        continue
+                    if result:
+                        logger.info(f"Flow créé par le lot malgré l'erreur: {flow_path} (ID: {result['id']})")
+                        added_flows[result["id"]] = FlowRecord.from_flow_data(flow_path, result)
+                        continue
+                # Ajouter individuellement les éléments non créés par le lot
+                success, flow_id, flow_data = self.add_flow(flow_path, repo_path)
+                if success and flow_id and flow_data:
+                    added_flows[flow_id] = FlowRecord.from_flow_data(flow_path, flow_data)
+        return added_flows
+    
+    def update_flow(self, flow_id: str, flow_path: str, repo_path: str,
+                    previous_data: Optional[Dict[str, Any]] = None) -> Tuple[bool, Optional[Dict[str, Any]]]:
         """
         Met à jour un flow existant.
         
+        Si la version déployée du flow est fournie, seuls les champs de premier niveau qui
+        en diffèrent sont envoyés dans le PATCH.
+        
         Args:
             flow_id: ID du flow à mettre à jour.
             flow_path: Chemin relatif du fichier de flow dans le dépôt.
             repo_path: Chemin absolu du dépôt Git.
+            previous_data: Dernière version déployée du flow (optionnel).
             
         Returns:
-            Tuple[bool, Optional[Dict[str, Any]]]: Tuple contenant un booléen indiquant le succès et les données du flow.
+            Tuple[Optional[bool], Optional[Dict[str, Any]]]: Tuple contenant un booléen indiquant le succès
+            (None si aucun flow de Langflow ne porte cet ID) et les données du flow.
         """
         # Construire le chemin complet du fichier
         full_path = os.path.join(repo_path, flow_path)
@@ -100,16 +408,36 @@ class FlowManager:
             return False, None
         
         try:
-            # Lire le contenu du fichier
-            with open(full_path, "r", encoding="utf-8") as file:
-                flow_data = json.load(file)
+            # Lire le contenu du fichier (développé et optimisé si activé)
+            flow_data = self._load_flow(flow_path, repo_path)
+            
+            # Ne conserver que les champs qui diffèrent de la version déployée
+            patch, full_size, patch_size = compute_flow_patch(previous_data, flow_data)
+            with self._stats_lock:
+                self.patch_stats["full_bytes"] += full_size
+                self.patch_stats["sent_bytes"] += patch_size
+            
+            if not patch:
+                # Le flow reste synchronisé: son dossier et son pipeline sont tout de même vérifiés
+                logger.info(f"Flow identique à sa version déployée, aucune mise à jour envoyée: {flow_path} (ID: {flow_id})")
+                return True, {**flow_data, "id": flow_id}
+            if previous_data is not None:
+                # Résumer l'écart avec la version déployée (hors champs gérés par le serveur)
+                deployed_fields = {key: value for key, value in previous_data.items()
+                                   if key in flow_data or key in PATCH_CLEARABLE_FIELDS}
+                logger.info(f"Flow {flow_path}: {diff_flows(deployed_fields, flow_data).summary()}")
+            
+            logger.debug(f"PATCH du flow {flow_path}: champs {sorted(patch)} ({patch_size} octets au lieu de {full_size})")
             
             # Mettre à jour le flow
-            result = self.client.update_flow(flow_id, flow_data)
+            found, result = self.client.update_flow_if_exists(flow_id, patch)
+            if not found:
+                logger.debug(f"Aucun flow d'ID {flow_id} dans Langflow pour {flow_path}")
+                return None, None
             
             if result:
                 logger.info(f"Flow mis à jour avec succès: {flow_path} (ID: {flow_id})")
-                self._flows_cache = None # Invalider le cache
+                self._remember_flow(result)
                 return True, result # Retourner les données complètes du flow mis à jour
             else:
                 logger.error(f"Échec de la mise à jour du flow: {flow_path} (ID: {flow_id})")
@@ -137,7 +465,7 @@ class FlowManager:
             
             if result:
                 logger.info(f"Flow supprimé avec succès (ID: {flow_id})")
-                self._flows_cache = None # Invalider le cache
+                self._forget_flow(flow_id)
                 return True
             else:
                 logger.error(f"Échec de la suppression du flow (ID: {flow_id})")
@@ -146,6 +474,51 @@ class FlowManager:
             logger.error(f"Erreur lors de la suppression du flow (ID: {flow_id}): {e}")
             return False
     
+    def _update_by_id(self, flow_id: str, flow_path: str, repo_path: str) -> Optional[Tuple[bool, Optional[Dict[str, Any]]]]:
+        """
+        Met à jour un flow directement par son ID stable, sans consulter la liste des flows de Langflow.
+        
+        Le flow est lu par son ID (GET), ce qui vérifie son existence et fournit la version
+        déployée servant de référence au PATCH minimal.
+        
+        Args:
+            flow_id: ID du flow, lu dans son fichier.
+            flow_path: Chemin relatif du fichier de flow dans le dépôt.
+            repo_path: Chemin absolu du dépôt Git.
+            
+        Returns:
+            Optional[Tuple[bool, Optional[Dict[str, Any]]]]: Résultat de update_flow, ou None si aucun
+            flow de Langflow ne porte cet ID.
+        """
+        found, deployed_data = self._get_deployed_flow(flow_id)
+        if not found:
+            return None
+        
+        logger.info(f"Flow {flow_path} retrouvé par son ID ({flow_id}). Mise à jour...")
+        success, flow_data = self.update_flow(flow_id, flow_path, repo_path, deployed_data)
+        if success is None:
+            return None
+        return success, flow_data
+    
+    def _find_existing_flow(self, flow_path: str) -> Optional[Dict[str, Any]]:
+        """
+        Recherche par nom le flow de Langflow correspondant à un fichier, lorsqu'il n'a pas pu être
+        retrouvé par son ID (fichier sans ID, flow créé avant le suivi des IDs ou serveur qui
+        attribue ses propres IDs). Un flow déplacé ou renommé est d'abord recherché sous son ancien nom.
+        
+        Args:
+            flow_path: Chemin relatif du fichier de flow dans le dépôt.
+            
+        Returns:
+            Optional[Dict[str, Any]]: Métadonnées du flow ou None si non trouvé.
+        """
+        previous_path = self.moved_flows.get(flow_path)
+        if previous_path:
+            existing_flow = self.find_flow_by_name(extract_flow_name_from_path(previous_path))
+            if existing_flow:
+                return existing_flow
+        return self.find_flow_by_name(extract_flow_name_from_path(flow_path))
+    
     def find_flow_by_name(self, flow_name: str) -> Optional[Dict[str, Any]]:
         """
         Recherche un flow par son nom (utilise le cache).
@@ -154,31 +527,34 @@ class FlowManager:
             flow_name: Nom du flow.
             
         Returns:
-            Optional[Dict[str, Any]]: Données du flow ou None si non trouvé.
+            Optional[Dict[str, Any]]: Métadonnées du flow (sans le graphe) ou None si non trouvé.
+            
+        Raises:
+            Exception: Si la liste des flows de Langflow n'a pas pu être récupérée: le flow ne doit
+            pas être considéré comme absent (il serait créé en double).
         """
         try:
             # Utiliser le cache
-            flows = self._get_all_flows()
+            flow = self._get_all_flows().get(flow_name)
+            if flow:
+                return flow
             
-            # Rechercher le flow par son nom
-            for flow in flows:
-                if flow.get("name") == flow_name:
-                    return flow
-            
-            # Si non trouvé dans le cache, rafraîchir et réessayer
+            # Si non trouvé dans le cache, rafraîchir (une fois par synchronisation) et réessayer
+            if self._flows_refreshed:
+                logger.debug(f"Flow 	{flow_name}	 non trouvé dans le cache, à jour pour cette synchronisation.")
+                return None
             logger.debug(f"Flow 	{flow_name}	 non trouvé dans le cache, rafraîchissement...")
-            flows = self._get_all_flows(refresh=True)
-            for flow in flows:
-                if flow.get("name") == flow_name:
-                    return flow
+            flow = self._get_all_flows(refresh=True).get(flow_name)
+            if flow:
+                return flow
                     
             logger.debug(f"Flow 	{flow_name}	 non trouvé même après rafraîchissement.")
             return None
         except Exception as e:
             logger.error(f"Erreur lors de la recherche du flow {flow_name}: {e}")
-            return None
+            raise
     
-    def process_added_flows(self, flow_paths: List[str], repo_path: str) -> Dict[str, Dict[str, Any]]:
+    def process_added_flows(self, flow_paths: List[str], repo_path: str) -> Dict[str, FlowRecord]:
         """
         Traite les flows ajoutés.
         
@@ -187,31 +563,54 @@ class FlowManager:
             repo_path: Chemin absolu du dépôt Git.
             
         Returns:
-            Dict[str, Dict[str, Any]]: Dictionnaire des flows ajoutés ou mis à jour (ID -> données).
+            Dict[str, FlowRecord]: Dictionnaire des flows ajoutés ou mis à jour (ID -> enregistrement).
         """
         processed_flows = {}
+        # Nouveaux flows regroupés par dossier cible, créés par lots
+        new_flows_by_folder = {}
         
         for flow_path in flow_paths:
             flow_name = extract_flow_name_from_path(flow_path)
             logger.debug(f"Traitement du flow ajouté: {flow_path} (Nom extrait: {flow_name})")
             
-            existing_flow = self.find_flow_by_name(flow_name)
+            flow_id = self.flow_ids.get(flow_path)
+            if flow_id:
+                result = self._update_by_id(flow_id, flow_path, repo_path)
+                if result is not None:
+                    success, flow_data = result
+                    if success and flow_data:
+                        processed_flows[flow_id] = FlowRecord(flow_path, flow_id, flow_data.get("name"), flow_data.get("endpoint_name"))
+                    continue
+            
+            existing_flow = self._find_existing_flow(flow_path)
             
             if existing_flow:
                 flow_id = existing_flow["id"]
                 logger.info(f"Flow 	{flow_name}	 (ajouté dans Git) existe déjà dans Langflow (ID: {flow_id}). Mise à jour...")
-                success, flow_data = self.update_flow(flow_id, flow_path, repo_path)
+                _, deployed_data = self._get_deployed_flow(flow_id, existing_flow)
+                success, flow_data = self.update_flow(flow_id, flow_path, repo_path, deployed_data)
                 if success and flow_data:
-                    processed_flows[flow_id] = flow_data
+                    # Seul l'enregistrement est conservé: le graphe est libéré dès l'envoi
+                    processed_flows[flow_id] = FlowRecord(flow_path, flow_id, flow_data.get("name"), flow_data.get("endpoint_name"))
             else:
                 logger.info(f"Flow 	{flow_name}	 (ajouté dans Git) n\"existe pas dans Langflow. Ajout...")
-                success, flow_id, flow_data = self.add_flow(flow_path, repo_path)
-                if success and flow_id and flow_data:
-                    processed_flows[flow_id] = flow_data
+                folder_name = extract_folder_name_from_path(flow_path)
+                new_flows_by_folder.setdefault(folder_name, []).append(flow_path)
+        
+        for folder_name, folder_flow_paths in new_flows_by_folder.items():
+            # Les flows hors dossier passent par l'upload individuel, qui les range dans le dossier par défaut
+            if folder_name is None:
+                for flow_path in folder_flow_paths:
+                    success, flow_id, flow_data = self.add_flow(flow_path, repo_path)
+                    if success and flow_id and flow_data:
+                        processed_flows[flow_id] = FlowRecord.from_flow_data(flow_path, flow_data)
+            else:
+                logger.debug(f"Ajout de {len(folder_flow_paths)} flows pour le dossier '{folder_name}'")
+                processed_flows.update(self.add_flows_batch(folder_flow_paths, repo_path))
         
         return processed_flows
     
-    def process_modified_flows(self, flow_paths: List[str], repo_path: str) -> Dict[str, Dict[str, Any]]:
+    def process_modified_flows(self, flow_paths: List[str], repo_path: str) -> Dict[str, FlowRecord]:
         """
         Traite les flows modifiés.
         
@@ -220,7 +619,7 @@ class FlowManager:
             repo_path: Chemin absolu du dépôt Git.
             
         Returns:
-            Dict[str, Dict[str, Any]]: Dictionnaire des flows modifiés ou ajoutés (ID -> données).
+            Dict[str, FlowRecord]: Dictionnaire des flows modifiés ou ajoutés (ID -> enregistrement).
         """
         processed_flows = {}
         
@@ -228,19 +627,30 @@ class FlowManager:
             flow_name = extract_flow_name_from_path(flow_path)
             logger.debug(f"Traitement du flow modifié: {flow_path} (Nom extrait: {flow_name})")
             
-            existing_flow = self.find_flow_by_name(flow_name)
+            flow_id = self.flow_ids.get(flow_path)
+            if flow_id:
+                result = self._update_by_id(flow_id, flow_path, repo_path)
+                if result is not None:
+                    success, flow_data = result
+                    if success and flow_data:
+                        processed_flows[flow_id] = FlowRecord(flow_path, flow_id, flow_data.get("name"), flow_data.get("endpoint_name"))
+                    continue
+            
+            existing_flow = self._find_existing_flow(flow_path)
             
             if existing_flow:
                 flow_id = existing_flow["id"]
                 logger.info(f"Flow 	{flow_name}	 (modifié dans Git) existe dans Langflow (ID: {flow_id}). Mise à jour...")
-                success, flow_data = self.update_flow(flow_id, flow_path, repo_path)
+                _, deployed_data = self._get_deployed_flow(flow_id, existing_flow)
+                success, flow_data = self.update_flow(flow_id, flow_path, repo_path, deployed_data)
                 if success and flow_data:
-                    processed_flows[flow_id] = flow_data
+                    # Seul l'enregistrement est conservé: le graphe est libéré dès l'envoi
+                    processed_flows[flow_id] = FlowRecord(flow_path, flow_id, flow_data.get("name"), flow_data.get("endpoint_name"))
             else:
                 logger.warning(f"Flow 	{flow_name}	 (modifié dans Git) n\"existe pas dans Langflow. Tentative d\"ajout...")
                 success, flow_id, flow_data = self.add_flow(flow_path, repo_path)
                 if success and flow_id and flow_data:
-                    processed_flows[flow_id] = flow_data
+                    processed_flows[flow_id] = FlowRecord.from_flow_data(flow_path, flow_data)
         
         return processed_flows
     
@@ -260,6 +670,17 @@ class FlowManager:
             flow_name = extract_flow_name_from_path(flow_path)
             logger.debug(f"Traitement du flow supprimé: {flow_path} (Nom extrait: {flow_name})")
             
+            flow_id = self.flow_ids.get(flow_path)
+            if flow_id:
+                found, deleted = self.client.delete_flow_if_exists(flow_id)
+                if found:
+                    if deleted:
+                        logger.info(f"Flow 	{flow_name}	 (supprimé dans Git) supprimé par son ID ({flow_id})")
+                        self._forget_flow(flow_id)
+                        deleted_flow_ids.append(flow_id)
+                    continue
+                logger.debug(f"Aucun flow d'ID {flow_id} dans Langflow, recherche par nom")
+            
             existing_flow = self.find_flow_by_name(flow_name)
             
             if existing_flow:
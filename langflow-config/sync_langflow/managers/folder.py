@@ -1,11 +1,10 @@
 import logging
-import os
-from typing import Dict, List, Optional, Tuple, Any
-import requests
+from typing import Dict, Iterable, List, Optional, Tuple, Any
 
 from ..clients.langflow import LangflowClient
 # Correction: Importer les deux fonctions utilitaires
 from ..utils import extract_folder_name_from_path, extract_flow_name_from_path
+from ..records import FlowRecord
 
 logger = logging.getLogger("sync_app")
 
@@ -149,14 +148,13 @@ class FolderManager:
             logger.error(f"Erreur lors de l'ajout de flows au dossier {folder_id}: {e}")
             return False, None
     
-    def organize_flows_by_folder(self, flow_paths: List[str], flow_ids: Dict[str, Dict[str, Any]]) -> Dict[str, List[str]]:
+    def organize_flows_by_folder(self, flow_records: Iterable[FlowRecord]) -> Dict[str, List[str]]:
         """
         Organise les flows en dossiers basés sur leur chemin, en préservant les flows existants
         et en traitant chaque dossier indépendamment.
         
         Args:
-            flow_paths: Liste des chemins de flows modifiés/ajoutés.
-            flow_ids: Dictionnaire des flows ajoutés/modifiés (ID -> données).
+            flow_records: Enregistrements des flows ajoutés/modifiés (chemin, ID et dossier).
             
         Returns:
             Dict[str, List[str]]: Dictionnaire des dossiers créés/mis à jour (nom -> liste d'IDs).
@@ -164,33 +162,14 @@ class FolderManager:
         # Initialiser le résultat
         organized_folders = {}
         
-        # Créer un dictionnaire pour mapper les noms de flows à leurs IDs
-        flow_name_to_id = {}
-        for flow_id, flow_data in flow_ids.items():
-            flow_name = flow_data.get("name")
-            if flow_name:
-                flow_name_to_id[flow_name] = flow_id
-        
-        # Regrouper les flows par dossier
+        # Regrouper les flows par dossier (exemple: langflow-config/flows/excel/flow.json -> excel)
         folder_flows = {}
-        for flow_path in flow_paths:
-            # Extraire le nom du dossier à partir du chemin (exemple: langflow-config/flows/excel/flow.json -> excel)
-            path_parts = flow_path.split(os.sep)
-            if len(path_parts) >= 3 and path_parts[0] == "langflow-config" and path_parts[1] == "flows":
-                folder_name = path_parts[2]  # langflow-config/flows/folder_name/...
-                
-                # Initialiser la liste des flows pour ce dossier si nécessaire
-                if folder_name not in folder_flows:
-                    folder_flows[folder_name] = []
-                
-                # Extraire le nom du flow à partir du chemin
-                flow_name = os.path.basename(flow_path).replace(".json", "")
-                
-                # Ajouter le flow à la liste du dossier s'il existe dans flow_ids
-                if flow_name in flow_name_to_id:
-                    flow_id = flow_name_to_id[flow_name]
-                    if flow_id not in folder_flows[folder_name]:  # Éviter les doublons
-                        folder_flows[folder_name].append(flow_id)
+        for flow_record in flow_records:
+            if not flow_record.folder or not flow_record.id:
+                continue
+            folder_flow_ids = folder_flows.setdefault(flow_record.folder, [])
+            if flow_record.id not in folder_flow_ids:  # Éviter les doublons
+                folder_flow_ids.append(flow_record.id)
         
         # Récupérer tous les dossiers existants une seule fois
         existing_folders = {folder.get("name"): folder for folder in self._get_all_folders(refresh=True) if folder.get("name")}
@@ -286,7 +265,7 @@ class FolderManager:
                 # Supprimer le dossier vide
                 try:
                     url = f"{self.client.base_url}/api/v1/folders/{folder_id}"
-                    response = requests.delete(url, headers=self.client.headers)
+                    response = self.client.session.delete(url, headers=self.client.headers)
                     
                     if response.status_code in [200, 204]:
                         logging.info(f"Dossier vide '{folder_name}' (ID: {folder_id}) supprimé avec succès")
@@ -1,7 +1,9 @@
 import logging
 import os
 import subprocess
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
+
+from ..utils import is_flow_path
 
 logger = logging.getLogger("sync_app")
 
@@ -112,22 +114,19 @@ class GitManager:
                 
                 # Traiter comme suppression de l'ancien chemin
                 changes["deleted"].append(old_path)
-                if old_path.endswith(".json") and ("langflow-config/flows/" in old_path or "/flows/" in old_path):
+                if is_flow_path(old_path):
                     changes["flows_deleted"].append(old_path)
                     
                 # Traiter comme ajout du nouveau chemin
                 changes["added"].append(new_path)
-                if new_path.endswith(".json") and ("langflow-config/flows/" in new_path or "/flows/" in new_path):
+                if is_flow_path(new_path):
                     changes["flows_added"].append(new_path)
                     
             elif len(parts) >= 2:
                 file_path = parts[1]
                 
                 # Vérifier si le fichier est un flow Langflow (fichier JSON dans un dossier flows)
-                is_flow = False
-                # Logique plus flexible pour détecter les flows
-                if file_path.endswith(".json") and ("langflow-config/flows/" in file_path or "/flows/" in file_path):
-                    is_flow = True
+                is_flow = is_flow_path(file_path)
                 
                 # Ajouter le fichier à la liste appropriée
                 if status == "A":  # Ajouté
@@ -149,3 +148,122 @@ class GitManager:
         logger.debug(f"Changements de flows: Added({len(changes['flows_added'])}), Modified({len(changes['flows_modified'])}), Deleted({len(changes['flows_deleted'])})")
         return changes
 
+    def read_file_at_commit(self, commit: str, file_path: str) -> Optional[str]:
+        """
+        Lit le contenu d'un fichier tel qu'il était à un commit donné.
+        
+        Args:
+            commit: Commit de référence.
+            file_path: Chemin du fichier relatif à la racine du dépôt.
+            
+        Returns:
+            Optional[str]: Contenu du fichier ou None s'il n'existe pas à ce commit.
+        """
+        success, content = self._run_git_command(["show", f"{commit}:{file_path}"])
+        if not success:
+            logger.debug(f"Fichier {file_path} introuvable au commit {commit}")
+            return None
+        return content
+
+    def resolve_commit(self, commit: str) -> Optional[str]:
+        """
+        Résout une référence Git (branche, HEAD, SHA abrégé) en SHA complet.
+        
+        Args:
+            commit: Référence à résoudre.
+            
+        Returns:
+            Optional[str]: SHA complet du commit ou None si la référence est inconnue.
+        """
+        success, output = self._run_git_command(["rev-parse", "--verify", f"{commit}^{{commit}}"])
+        if not success:
+            return None
+        return output.strip()
+
+    def current_branch(self) -> Optional[str]:
+        """
+        Retourne la branche de la copie de travail.
+
+        Returns:
+            Optional[str]: Nom de la branche ou None si HEAD est détaché.
+        """
+        success, output = self._run_git_command(["rev-parse", "--abbrev-ref", "HEAD"])
+        branch = output.strip()
+        if not success or branch == "HEAD":
+            return None
+        return branch
+
+    def fetch(self, remote: str, branch: str) -> Optional[str]:
+        """
+        Récupère une branche d'un dépôt distant.
+
+        Args:
+            remote: Nom du dépôt distant (ex: origin).
+            branch: Branche à récupérer.
+
+        Returns:
+            Optional[str]: SHA du dernier commit de la branche distante ou None en cas d'erreur.
+        """
+        success, _ = self._run_git_command(["fetch", "--quiet", remote, branch])
+        if not success:
+            logger.error(f"Impossible de récupérer la branche {branch} du dépôt distant {remote}.")
+            return None
+        return self.resolve_commit("FETCH_HEAD")
+
+    def fast_forward(self, commit: str) -> bool:
+        """
+        Avance la copie de travail jusqu'à un commit, sans jamais créer de commit de fusion.
+
+        Args:
+            commit: Commit cible (descendant de HEAD).
+
+        Returns:
+            bool: True si la copie de travail est au commit cible.
+        """
+        success, _ = self._run_git_command(["merge", "--ff-only", "--quiet", commit])
+        if not success:
+            logger.error(f"Impossible d'avancer la copie de travail jusqu'au commit {commit} (historique divergent ou modifications locales).")
+        return success
+
+    def get_blob_hashes(self, commit: str, file_paths: List[str]) -> Dict[str, str]:
+        """
+        Récupère, en une seule commande, l'empreinte Git (blob) de fichiers à un commit donné.
+        
+        Args:
+            commit: Commit de référence.
+            file_paths: Chemins des fichiers relatifs à la racine du dépôt.
+            
+        Returns:
+            Dict[str, str]: Empreinte de chaque fichier présent à ce commit (chemin -> SHA du blob).
+        """
+        if not file_paths:
+            return {}
+        success, output = self._run_git_command(["ls-tree", "-z", commit, "--"] + file_paths)
+        if not success:
+            logger.error(f"Impossible de lire les empreintes des fichiers au commit {commit}.")
+            return {}
+        blob_hashes = {}
+        for entry in output.split("\0"):
+            if not entry:
+                continue
+            # Format: <mode> <type> <sha><tab><chemin>
+            object_info, file_path = entry.split("\t", 1)
+            blob_hashes[file_path] = object_info.split()[2]
+        return blob_hashes
+
+    def list_flow_files(self, commit: str) -> List[str]:
+        """
+        Liste tous les fichiers de flows présents dans le dépôt à un commit donné.
+        
+        Args:
+            commit: Commit de référence.
+            
+        Returns:
+            List[str]: Chemins des flows relatifs à la racine du dépôt.
+        """
+        # -z: chemins séparés par NUL et jamais échappés (espaces, accents)
+        success, output = self._run_git_command(["ls-tree", "-r", "-z", "--name-only", commit])
+        if not success:
+            logger.error(f"Impossible de lister les fichiers du commit {commit}.")
+            return []
+        return [path for path in output.split("\0") if path and is_flow_path(path)]
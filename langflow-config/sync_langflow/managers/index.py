@@ -0,0 +1,280 @@
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from typing import Dict, List, Any, Optional
+
+from .git import GitManager
+from ..processing.loader import FlowLoader
+from ..processing.validate import parse_handle
+from ..utils import extract_flow_id, extract_folder_name_from_path
+
+logger = logging.getLogger("sync_app")
+
+# Version du format de l'index: un index d'une autre version est reconstruit
+INDEX_VERSION = 2
+# Champs des templates de nœuds portant le nom du modèle utilisé
+MODEL_FIELDS = ("model_name", "model")
+# Champ des agents auquel sont branchés les outils
+TOOLS_FIELD = "tools"
+
+def _target_field(edge: Dict[str, Any]) -> Optional[str]:
+    """Retourne le champ du nœud cible alimenté par un lien."""
+    handle = edge.get("data", {}).get("targetHandle") or parse_handle(edge.get("targetHandle"))
+    return handle.get("fieldName") if handle else None
+
+def extract_flow_entry(flow_data: Dict[str, Any], flow_path: str) -> Dict[str, Any]:
+    """
+    Extrait d'un flow les informations indexées: types de nœuds, modèles, outils et liens.
+
+    Args:
+        flow_data: Contenu complet du flow.
+        flow_path: Chemin relatif du fichier de flow dans le dépôt.
+
+    Returns:
+        Dict[str, Any]: Entrée de l'index pour ce flow.
+    """
+    graph = flow_data.get("data", {})
+    node_types = {}
+    models = set()
+    for node in graph.get("nodes", []):
+        node_data = node.get("data", {})
+        node_types[node.get("id")] = node_data.get("type", "")
+        template = node_data.get("node", {}).get("template", {})
+        for field_name in MODEL_FIELDS:
+            field = template.get(field_name)
+            if isinstance(field, dict) and isinstance(field.get("value"), str) and field["value"]:
+                models.add(field["value"])
+
+    tools = set()
+    edges = []
+    for edge in graph.get("edges", []):
+        source_type = node_types.get(edge.get("source"), "")
+        target_field = _target_field(edge)
+        if target_field == TOOLS_FIELD:
+            tools.add(source_type)
+        edges.append([source_type, node_types.get(edge.get("target"), ""), target_field])
+
+    return {
+        "id": extract_flow_id(flow_data),
+        "name": flow_data.get("name"),
+        "endpoint_name": flow_data.get("endpoint_name"),
+        "folder": extract_folder_name_from_path(flow_path),
+        "node_types": sorted(set(node_types.values())),
+        "models": sorted(models),
+        "tools": sorted(tools),
+        "edges": edges
+    }
+
+class FlowIndex:
+    """Index disque des composants, modèles et outils utilisés par l'ensemble des flows du dépôt."""
+
+    def __init__(self, index_path: Optional[str]):
+        """
+        Initialise l'index et charge son contenu s'il existe déjà sur disque.
+
+        Args:
+            index_path: Chemin du fichier de l'index (None: index conservé en mémoire seulement).
+        """
+        self.index_path = index_path
+        self.commit = None
+        self.flows = {}
+        self._load()
+
+    def _load(self) -> None:
+        """Charge l'index depuis le disque; un index absent, illisible ou d'une autre version est ignoré."""
+        if not self.index_path:
+            return
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as file:
+                content = json.load(file)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.warning(f"Index des flows illisible ({self.index_path}), il sera reconstruit: {e}")
+            return
+        if content.get("version") != INDEX_VERSION:
+            logger.info(f"Index des flows d'une autre version ({self.index_path}), il sera reconstruit")
+            return
+        self.commit = content.get("commit")
+        self.flows = content.get("flows", {})
+
+    def save(self) -> bool:
+        """
+        Enregistre l'index sur disque.
+
+        Returns:
+            bool: True si l'index a été écrit (ou s'il n'est conservé qu'en mémoire).
+        """
+        if not self.index_path:
+            return True
+        content = {"version": INDEX_VERSION, "commit": self.commit, "flows": self.flows}
+        temp_path = f"{self.index_path}.tmp"
+        try:
+            index_dir = os.path.dirname(self.index_path)
+            if index_dir:
+                os.makedirs(index_dir, exist_ok=True)
+            with open(temp_path, "w", encoding="utf-8") as file:
+                json.dump(content, file, separators=(",", ":"), ensure_ascii=False)
+            # Remplacement atomique pour ne jamais laisser un index tronqué
+            os.replace(temp_path, self.index_path)
+            return True
+        except Exception as e:
+            logger.warning(f"Impossible d'écrire l'index des flows {self.index_path}: {e}")
+            return False
+
+    def index_flows(self, flow_paths: List[str], loader: FlowLoader) -> int:
+        """
+        Indexe (ou réindexe) des flows du dépôt.
+
+        Args:
+            flow_paths: Chemins relatifs des fichiers de flows.
+            loader: Chargeur des fichiers de flows.
+
+        Returns:
+            int: Nombre de flows indexés.
+        """
+        indexed_count = 0
+        for flow_path in flow_paths:
+            try:
+                self.flows[flow_path] = extract_flow_entry(loader.load(flow_path), flow_path)
+                indexed_count += 1
+            except Exception as e:
+                logger.warning(f"Impossible d'indexer le flow {flow_path}: {e}")
+                self.flows.pop(flow_path, None)
+        return indexed_count
+
+    def rebuild(self, git_manager: GitManager, commit: str, repo_path: str) -> int:
+        """
+        Reconstruit entièrement l'index à partir des flows présents à un commit.
+
+        Args:
+            git_manager: Gestionnaire Git du dépôt.
+            commit: Commit indexé (celui de la copie de travail).
+            repo_path: Chemin absolu du dépôt Git.
+
+        Returns:
+            int: Nombre de flows indexés.
+        """
+        self.flows = {}
+        indexed_count = self.index_flows(git_manager.list_flow_files(commit), FlowLoader(repo_path))
+        self.commit = commit
+        return indexed_count
+
+    def update(self, git_manager: GitManager, changes: Dict[str, List[str]], before_commit: str,
+               after_commit: str, repo_path: str) -> int:
+        """
+        Met à jour l'index à partir des changements détectés entre deux commits.
+
+        Seuls les flows ajoutés, modifiés ou supprimés sont traités; si l'index ne
+        correspond pas au commit de départ, il est reconstruit entièrement.
+
+        Args:
+            git_manager: Gestionnaire Git du dépôt.
+            changes: Changements renvoyés par GitManager.detect_changes.
+            before_commit: Commit de départ des changements.
+            after_commit: Commit d'arrivée (celui de la copie de travail).
+            repo_path: Chemin absolu du dépôt Git.
+
+        Returns:
+            int: Nombre de flows (ré)indexés.
+        """
+        before_commit = git_manager.resolve_commit(before_commit)
+        after_commit = git_manager.resolve_commit(after_commit) or after_commit
+        if self.commit is None or self.commit != before_commit:
+            logger.info(f"Index des flows reconstruit au commit {after_commit}")
+            return self.rebuild(git_manager, after_commit, repo_path)
+
+        for flow_path in changes["flows_deleted"]:
+            self.flows.pop(flow_path, None)
+        indexed_count = self.index_flows(changes["flows_added"] + changes["flows_modified"], FlowLoader(repo_path))
+        self.commit = after_commit
+        return indexed_count
+
+    def find(self, node_type: Optional[str] = None, model: Optional[str] = None, tool: Optional[str] = None,
+             folder: Optional[str] = None) -> List[str]:
+        """
+        Recherche les flows correspondant à tous les critères donnés.
+
+        Args:
+            node_type: Type de nœud utilisé (optionnel).
+            model: Nom de modèle utilisé (optionnel).
+            tool: Type de nœud branché comme outil d'un agent (optionnel).
+            folder: Dossier du flow (optionnel).
+
+        Returns:
+            List[str]: Chemins des flows correspondants, triés.
+        """
+        matching_paths = []
+        for flow_path, entry in self.flows.items():
+            if node_type and node_type not in entry["node_types"]:
+                continue
+            if model and model not in entry["models"]:
+                continue
+            if tool and tool not in entry["tools"]:
+                continue
+            if folder and entry["folder"] != folder:
+                continue
+            matching_paths.append(flow_path)
+        return sorted(matching_paths)
+
+    def endpoint_names(self) -> Dict[str, List[str]]:
+        """
+        Retourne les endpoint_names déclarés par les flows indexés.
+
+        Returns:
+            Dict[str, List[str]]: Chemins des flows déclarant chaque endpoint_name.
+        """
+        endpoints = {}
+        for flow_path, entry in sorted(self.flows.items()):
+            if entry["endpoint_name"]:
+                endpoints.setdefault(entry["endpoint_name"], []).append(flow_path)
+        return endpoints
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Point d'entrée de l'outil de requête de l'index des flows."""
+    parser = argparse.ArgumentParser(description="Construit et interroge l'index des composants et modèles des flows.")
+    parser.add_argument("--index-path", required=True, help="Chemin du fichier de l'index")
+    parser.add_argument("--repo-path", default=os.getcwd(), help="Chemin vers le dépôt Git local")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help="Reconstruit l'index à partir des flows d'un commit")
+    build_parser.add_argument("--commit", default="HEAD", help="Commit à indexer (par défaut: HEAD)")
+
+    query_parser = subparsers.add_parser("query", help="Liste les flows correspondant à tous les critères")
+    query_parser.add_argument("--node-type", help="Type de nœud (ex: URL, Agent)")
+    query_parser.add_argument("--model", help="Nom de modèle (ex: gpt-4o)")
+    query_parser.add_argument("--tool", help="Type de nœud branché comme outil d'un agent")
+    query_parser.add_argument("--folder", help="Dossier du flow")
+
+    subparsers.add_parser("endpoints", help="Liste les endpoint_names déclarés par les flows")
+
+    args = parser.parse_args(argv)
+    start = time.perf_counter()
+    flow_index = FlowIndex(args.index_path)
+
+    if args.command == "build":
+        git_manager = GitManager(args.repo_path)
+        commit = git_manager.resolve_commit(args.commit)
+        if not commit:
+            print(f"Commit {args.commit} introuvable", file=sys.stderr)
+            return 1
+        indexed_count = flow_index.rebuild(git_manager, commit, args.repo_path)
+        if not flow_index.save():
+            return 1
+        print(f"{indexed_count} flows indexés dans {args.index_path}")
+    elif args.command == "query":
+        for flow_path in flow_index.find(args.node_type, args.model, args.tool, args.folder):
+            print(flow_path)
+    else:
+        for endpoint_name, flow_paths in sorted(flow_index.endpoint_names().items()):
+            print(f"{endpoint_name}\t{', '.join(flow_paths)}")
+
+    elapsed = time.perf_counter() - start
+    print(f"Terminé en {elapsed * 1000:.0f}ms", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
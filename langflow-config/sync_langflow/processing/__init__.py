@@ -0,0 +1 @@
+# Fichier d'initialisation pour le package processing
@@ -0,0 +1,191 @@
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sys
+from typing import Callable, Dict, Iterator, List, Any, Optional
+
+logger = logging.getLogger("sync_app")
+
+# Préfixe des références vers le code d'un composant stocké dans le répertoire des composants
+COMPONENT_REF_PREFIX = "$component:"
+# Répertoire conventionnel du code des composants, un fichier par empreinte SHA-256
+COMPONENTS_DIR = "langflow-config/components"
+
+def component_hash(code: str) -> str:
+    """
+    Calcule l'empreinte du code d'un composant.
+
+    Args:
+        code: Code source du composant.
+
+    Returns:
+        str: Empreinte SHA-256 hexadécimale.
+    """
+    return hashlib.sha256(code.encode("utf-8")).hexdigest()
+
+def component_path(code_hash: str) -> str:
+    """
+    Retourne le chemin, relatif à la racine du dépôt, du fichier stockant un composant.
+
+    Args:
+        code_hash: Empreinte du code du composant.
+
+    Returns:
+        str: Chemin du fichier de code.
+    """
+    return f"{COMPONENTS_DIR}/{code_hash}.py"
+
+def has_component_refs(raw_content: bytes) -> bool:
+    """
+    Indique, sans décoder le JSON, si un fichier de flow peut contenir des références de composants.
+
+    Args:
+        raw_content: Octets du fichier de flow.
+
+    Returns:
+        bool: True si le fichier contient le préfixe de référence.
+    """
+    return COMPONENT_REF_PREFIX.encode("utf-8") in raw_content
+
+def iter_code_fields(flow_data: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """
+    Parcourt les champs "code" des templates des nœuds d'un flow.
+
+    Args:
+        flow_data: Contenu du flow.
+
+    Yields:
+        Dict[str, Any]: Champ "code" d'un nœud (dont la clé "value" porte le code ou une référence).
+    """
+    for node in flow_data.get("data", {}).get("nodes", []):
+        code_field = node.get("data", {}).get("node", {}).get("template", {}).get("code")
+        if isinstance(code_field, dict) and isinstance(code_field.get("value"), str):
+            yield code_field
+
+def expand_components(flow_data: Dict[str, Any], read_component: Callable[[str], str]) -> Dict[str, Any]:
+    """
+    Remplace, en place, les références de composants d'un flow par leur code.
+
+    Args:
+        flow_data: Contenu du flow.
+        read_component: Fonction renvoyant le code d'un composant à partir de son empreinte.
+
+    Returns:
+        Dict[str, Any]: Le flow, avec le code des composants.
+    """
+    for code_field in iter_code_fields(flow_data):
+        value = code_field["value"]
+        if value.startswith(COMPONENT_REF_PREFIX):
+            code_field["value"] = read_component(value[len(COMPONENT_REF_PREFIX):])
+    return flow_data
+
+def dedupe_components(flow_data: Dict[str, Any], repo_path: str) -> int:
+    """
+    Déplace, en place, le code des composants d'un flow vers le répertoire des composants.
+
+    Chaque code est écrit une seule fois, sous son empreinte, et remplacé dans le flow par
+    une référence.
+
+    Args:
+        flow_data: Contenu du flow.
+        repo_path: Chemin absolu du dépôt Git.
+
+    Returns:
+        int: Nombre d'octets de code retirés du flow.
+    """
+    saved_bytes = 0
+    for code_field in iter_code_fields(flow_data):
+        code = code_field["value"]
+        if code.startswith(COMPONENT_REF_PREFIX):
+            continue
+        code_hash = component_hash(code)
+        full_path = os.path.join(repo_path, component_path(code_hash))
+        if not os.path.exists(full_path):
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            with open(full_path, "w", encoding="utf-8", newline="") as file:
+                file.write(code)
+        code_field["value"] = f"{COMPONENT_REF_PREFIX}{code_hash}"
+        saved_bytes += len(code.encode("utf-8")) - len(code_field["value"])
+    return saved_bytes
+
+def make_component_reader(read_file: Callable[[str], Optional[str]]) -> Callable[[str], str]:
+    """
+    Crée une fonction de lecture des composants, avec cache et vérification de l'empreinte.
+
+    Args:
+        read_file: Fonction renvoyant le contenu d'un fichier à partir de son chemin relatif
+            à la racine du dépôt (None s'il n'existe pas).
+
+    Returns:
+        Callable[[str], str]: Fonction renvoyant le code d'un composant à partir de son empreinte.
+    """
+    components_cache = {}
+
+    def read_component(code_hash: str) -> str:
+        if code_hash not in components_cache:
+            code = read_file(component_path(code_hash))
+            if code is None:
+                raise ValueError(f"Composant {code_hash} introuvable dans {COMPONENTS_DIR}")
+            if component_hash(code) != code_hash:
+                raise ValueError(f"Le contenu du composant {code_hash} ne correspond pas à son empreinte")
+            components_cache[code_hash] = code
+        return components_cache[code_hash]
+
+    return read_component
+
+def make_disk_component_reader(repo_path: str) -> Callable[[str], str]:
+    """
+    Crée une fonction de lecture des composants depuis le disque.
+
+    Args:
+        repo_path: Chemin absolu du dépôt Git.
+
+    Returns:
+        Callable[[str], str]: Fonction renvoyant le code d'un composant à partir de son empreinte.
+    """
+    def read_file(file_path: str) -> Optional[str]:
+        try:
+            with open(os.path.join(repo_path, file_path), "r", encoding="utf-8", newline="") as file:
+                return file.read()
+        except FileNotFoundError:
+            return None
+
+    return make_component_reader(read_file)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Point d'entrée de l'outil de gestion du répertoire des composants."""
+    parser = argparse.ArgumentParser(description="Déduplique le code des composants embarqué dans les flows.")
+    parser.add_argument("--repo-path", default=os.getcwd(), help="Chemin vers le dépôt Git local")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    dedupe_parser = subparsers.add_parser("dedupe", help="Remplace le code des composants des flows par des références")
+    dedupe_parser.add_argument("flows", nargs="+", help="Fichiers de flows (ou templates) à convertir")
+
+    expand_parser = subparsers.add_parser("expand", help="Réintègre le code des composants dans des flows")
+    expand_parser.add_argument("flows", nargs="+", help="Fichiers de flows à développer")
+
+    args = parser.parse_args(argv)
+    read_component = make_disk_component_reader(args.repo_path)
+    total_saved = 0
+
+    for flow_file in args.flows:
+        with open(flow_file, "r", encoding="utf-8") as file:
+            flow_data = json.load(file)
+        if args.command == "dedupe":
+            saved_bytes = dedupe_components(flow_data, args.repo_path)
+            total_saved += saved_bytes
+            print(f"{flow_file}: {saved_bytes} octets de code déplacés vers {COMPONENTS_DIR}")
+        else:
+            expand_components(flow_data, read_component)
+        with open(flow_file, "w", encoding="utf-8") as file:
+            json.dump(flow_data, file, indent=2, ensure_ascii=False)
+            file.write("\n")
+
+    if args.command == "dedupe":
+        print(f"Total: {total_saved} octets retirés des flows")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
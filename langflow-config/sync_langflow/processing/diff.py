@@ -0,0 +1,240 @@
+import argparse
+import json
+import logging
+import os
+import sys
+from typing import Dict, List, Any, Optional, Tuple
+
+from ..managers.git import GitManager
+from .loader import FlowLoader, load_flow_at_commit
+from .normalize import normalized_graph_copy
+from .validate import parse_handle
+
+logger = logging.getLogger("sync_app")
+
+# Champs de premier niveau jamais envoyés dans un PATCH (l'ID est porté par l'URL)
+PATCH_EXCLUDED_FIELDS = ("id",)
+
+# Champs portés par le fichier du flow et effacés dans Langflow lorsqu'ils en sont retirés
+# (les autres champs de la version déployée, comme folder_id ou user_id, sont gérés par le serveur)
+PATCH_CLEARABLE_FIELDS = ("description", "endpoint_name", "icon", "icon_bg_color", "gradient", "tags",
+                          "action_name", "action_description")
+
+def _payload_size(data: Any) -> int:
+    """Retourne la taille en octets de la sérialisation JSON envoyée par requests."""
+    return len(json.dumps(data).encode("utf-8"))
+
+def compute_flow_patch(previous_data: Optional[Dict[str, Any]], new_data: Dict[str, Any]) -> Tuple[Dict[str, Any], int, int]:
+    """
+    Calcule le corps minimal d'un PATCH à partir de la version déployée d'un flow.
+
+    Seuls les champs de premier niveau dont la valeur a changé sont conservés; le graphe
+    ("data") n'est envoyé que s'il a été modifié, les champs volatils de l'interface
+    (sélection, viewport...) étant ignorés dans la comparaison. Les champs de
+    PATCH_CLEARABLE_FIELDS retirés du flow sont effacés (valeur None). Sans version de
+    référence, le flow complet est renvoyé.
+
+    Args:
+        previous_data: Dernière version déployée du flow (optionnel).
+        new_data: Nouvelle version du flow.
+
+    Returns:
+        Tuple[Dict[str, Any], int, int]: Corps du PATCH, taille du flow complet et taille du PATCH en octets.
+    """
+    full_patch = {key: value for key, value in new_data.items() if key not in PATCH_EXCLUDED_FIELDS}
+    full_size = _payload_size(full_patch)
+
+    if previous_data is None:
+        return full_patch, full_size, full_size
+
+    patch = {}
+    for key, value in full_patch.items():
+        if key not in previous_data:
+            patch[key] = value
+        elif key == "data":
+            if normalized_graph_copy(previous_data[key]) != normalized_graph_copy(value):
+                patch[key] = value
+        elif previous_data[key] != value:
+            patch[key] = value
+    for key in PATCH_CLEARABLE_FIELDS:
+        if key not in new_data and previous_data.get(key) is not None:
+            patch[key] = None
+    return patch, full_size, _payload_size(patch) if patch else 0
+
+def _edge_key(edge: Dict[str, Any]) -> Tuple[Any, Any, Any, Any]:
+    """Identifie un lien par ses extrémités: (source, sortie, cible, champ alimenté)."""
+    edge_data = edge.get("data", {})
+    source_handle = edge_data.get("sourceHandle") or parse_handle(edge.get("sourceHandle")) or {}
+    target_handle = edge_data.get("targetHandle") or parse_handle(edge.get("targetHandle")) or {}
+    return edge.get("source"), source_handle.get("name"), edge.get("target"), target_handle.get("fieldName")
+
+def _node_shape(node: Dict[str, Any]) -> Dict[str, Any]:
+    """Retourne un nœud sans sa position ni son template, sans copier le template."""
+    shape = {key: value for key, value in node.items() if key not in ("data", "position")}
+    node_data = dict(node.get("data", {}))
+    if isinstance(node_data.get("node"), dict):
+        node_data["node"] = {key: value for key, value in node_data["node"].items() if key != "template"}
+    shape["data"] = node_data
+    return shape
+
+def _node_template(node: Dict[str, Any]) -> Dict[str, Any]:
+    return node.get("data", {}).get("node", {}).get("template", {})
+
+class FlowDiff:
+    """Différence sémantique entre deux versions d'un flow, nœud par nœud."""
+
+    def __init__(self):
+        """Initialise une différence vide."""
+        self.metadata_changed = [] # Champs de premier niveau modifiés (name, description...)
+        self.nodes_added = []
+        self.nodes_removed = []
+        self.fields_changed = {} # ID du nœud -> champs du template modifiés
+        self.nodes_changed = [] # Nœuds modifiés hors template et position (sorties, type...)
+        self.nodes_moved = []
+        self.edges_added = []
+        self.edges_removed = []
+
+    @property
+    def is_noop(self) -> bool:
+        """True si les deux versions ne diffèrent que par des champs volatils de l'interface."""
+        return not (self.metadata_changed or self.nodes_added or self.nodes_removed or self.fields_changed
+                    or self.nodes_changed or self.nodes_moved or self.edges_added or self.edges_removed)
+
+    @property
+    def is_layout_only(self) -> bool:
+        """True si seules les positions des nœuds ont changé."""
+        return bool(self.nodes_moved) and not (self.metadata_changed or self.nodes_added or self.nodes_removed
+                                               or self.fields_changed or self.nodes_changed
+                                               or self.edges_added or self.edges_removed)
+
+    def summary(self) -> str:
+        """
+        Résume la différence sur une ligne, pour les logs.
+
+        Returns:
+            str: Résumé de la différence.
+        """
+        if self.is_noop:
+            return "aucune modification"
+        parts = []
+        if self.metadata_changed:
+            parts.append(f"métadonnées: {', '.join(self.metadata_changed)}")
+        counts = (
+            (self.nodes_added, "nœud(s) ajouté(s)"),
+            (self.nodes_removed, "nœud(s) supprimé(s)"),
+            (self.fields_changed, "nœud(s) reconfiguré(s)"),
+            (self.nodes_changed, "nœud(s) modifié(s)"),
+            (self.nodes_moved, "nœud(s) déplacé(s)"),
+            (self.edges_added, "lien(s) ajouté(s)"),
+            (self.edges_removed, "lien(s) supprimé(s)")
+        )
+        parts.extend(f"{len(items)} {label}" for items, label in counts if items)
+        return ", ".join(parts)
+
+    def to_markdown(self, title: str) -> str:
+        """
+        Met en forme la différence pour un commentaire de pull request.
+
+        Args:
+            title: Titre de la section (généralement le chemin du flow).
+
+        Returns:
+            str: Résumé Markdown de la différence.
+        """
+        lines = [f"#### {title}", ""]
+        if self.is_noop:
+            lines.append("Aucune modification sémantique (seuls des champs de l'interface ont changé).")
+            return "\n".join(lines)
+        if self.metadata_changed:
+            lines.append(f"- Métadonnées modifiées : {', '.join(f'`{field}`' for field in self.metadata_changed)}")
+        for node_id in self.nodes_added:
+            lines.append(f"- Nœud ajouté : `{node_id}`")
+        for node_id in self.nodes_removed:
+            lines.append(f"- Nœud supprimé : `{node_id}`")
+        for node_id, fields in self.fields_changed.items():
+            lines.append(f"- Nœud `{node_id}` reconfiguré : {', '.join(f'`{field}`' for field in fields)}")
+        for node_id in self.nodes_changed:
+            lines.append(f"- Nœud `{node_id}` : définition du composant modifiée")
+        if self.nodes_moved:
+            lines.append(f"- Nœuds déplacés : {len(self.nodes_moved)}")
+        for source, output, target, field in self.edges_removed:
+            lines.append(f"- Lien supprimé : `{source}.{output}` → `{target}.{field}`")
+        for source, output, target, field in self.edges_added:
+            lines.append(f"- Lien ajouté : `{source}.{output}` → `{target}.{field}`")
+        return "\n".join(lines)
+
+def diff_flows(previous_data: Dict[str, Any], new_data: Dict[str, Any]) -> FlowDiff:
+    """
+    Compare deux versions d'un flow, nœuds appariés par ID, en un passage sur chaque graphe.
+
+    Les champs volatils de l'interface (sélection, viewport...) sont ignorés.
+
+    Args:
+        previous_data: Version précédente du flow.
+        new_data: Nouvelle version du flow.
+
+    Returns:
+        FlowDiff: Différence sémantique entre les deux versions.
+    """
+    flow_diff = FlowDiff()
+    for key in sorted(set(previous_data) | set(new_data)):
+        if key not in ("data",) + PATCH_EXCLUDED_FIELDS and previous_data.get(key) != new_data.get(key):
+            flow_diff.metadata_changed.append(key)
+
+    previous_graph = normalized_graph_copy(previous_data.get("data")) or {}
+    new_graph = normalized_graph_copy(new_data.get("data")) or {}
+    previous_nodes = {node.get("id"): node for node in previous_graph.get("nodes", [])}
+    new_nodes = {node.get("id"): node for node in new_graph.get("nodes", [])}
+
+    for node_id, node in new_nodes.items():
+        previous_node = previous_nodes.get(node_id)
+        if previous_node is None:
+            flow_diff.nodes_added.append(node_id)
+            continue
+        previous_template = _node_template(previous_node)
+        template = _node_template(node)
+        changed_fields = [field for field in sorted(set(previous_template) | set(template))
+                          if previous_template.get(field) != template.get(field)]
+        if changed_fields:
+            flow_diff.fields_changed[node_id] = changed_fields
+        if _node_shape(previous_node) != _node_shape(node):
+            flow_diff.nodes_changed.append(node_id)
+        if previous_node.get("position") != node.get("position"):
+            flow_diff.nodes_moved.append(node_id)
+    flow_diff.nodes_removed = [node_id for node_id in previous_nodes if node_id not in new_nodes]
+
+    previous_edges = {_edge_key(edge) for edge in previous_graph.get("edges", [])}
+    new_edges = {_edge_key(edge) for edge in new_graph.get("edges", [])}
+    flow_diff.edges_added = sorted(new_edges - previous_edges, key=str)
+    flow_diff.edges_removed = sorted(previous_edges - new_edges, key=str)
+    return flow_diff
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Point d'entrée de l'outil de résumé des modifications de flows (commentaires de pull request)."""
+    parser = argparse.ArgumentParser(description="Résume en Markdown les modifications sémantiques des flows.")
+    parser.add_argument("--repo-path", default=os.getcwd(), help="Chemin vers le dépôt Git local")
+    parser.add_argument("--base", required=True, help="Commit de référence (ex: origin/main)")
+    parser.add_argument("flows", nargs="*", help="Flows à comparer (par défaut: flows modifiés depuis la référence)")
+    args = parser.parse_args(argv)
+
+    git_manager = GitManager(args.repo_path)
+    flow_paths = args.flows
+    if not flow_paths:
+        changes = git_manager.detect_changes(args.base, "HEAD")
+        flow_paths = changes["flows_modified"]
+        for flow_path in changes["flows_added"]:
+            print(f"#### {flow_path}\n\nNouveau flow.\n")
+        for flow_path in changes["flows_deleted"]:
+            print(f"#### {flow_path}\n\nFlow supprimé.\n")
+
+    loader = FlowLoader(args.repo_path)
+    for flow_path in flow_paths:
+        previous_data = load_flow_at_commit(git_manager, args.base, flow_path)
+        if previous_data is None:
+            print(f"#### {flow_path}\n\nNouveau flow.\n")
+            continue
+        print(diff_flows(previous_data, loader.load(flow_path)).to_markdown(flow_path) + "\n")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
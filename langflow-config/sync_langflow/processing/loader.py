@@ -0,0 +1,153 @@
+import json
+import logging
+import os
+from typing import Dict, Any, Optional
+
+from ..managers.git import GitManager
+from .components import expand_components, has_component_refs, make_component_reader, make_disk_component_reader
+from .templates import TEMPLATE_KEY, expand_overlay, is_overlay, make_disk_template_reader
+from ..utils import extract_flow_id
+
+logger = logging.getLogger("sync_app")
+
+def _needs_expansion(raw_content: bytes) -> bool:
+    """Indique, sans décoder le JSON, si un fichier de flow peut être un overlay ou référencer des composants."""
+    return TEMPLATE_KEY.encode("utf-8") in raw_content or has_component_refs(raw_content)
+
+class FlowLoader:
+    """Charge les fichiers de flows du dépôt en développant les overlays de templates et les composants."""
+
+    def __init__(self, repo_path: str):
+        """
+        Initialise le chargeur de flows.
+
+        Args:
+            repo_path: Chemin absolu du dépôt Git.
+        """
+        self.repo_path = repo_path
+        self._read_template = make_disk_template_reader(repo_path)
+        self._read_component = make_disk_component_reader(repo_path)
+
+    def _full_path(self, flow_path: str) -> str:
+        return os.path.join(self.repo_path, flow_path)
+
+    def needs_expansion(self, flow_path: str) -> bool:
+        """
+        Indique si un fichier de flow doit être développé avant l'envoi (overlay de template
+        ou références de composants).
+
+        Args:
+            flow_path: Chemin relatif du fichier de flow dans le dépôt.
+
+        Returns:
+            bool: True si le fichier ne peut pas être envoyé tel quel.
+        """
+        with open(self._full_path(flow_path), "rb") as file:
+            raw_content = file.read()
+        # Les flows complets ne contiennent ni clé de template ni référence: inutile de les décoder
+        return _needs_expansion(raw_content)
+
+    def load(self, flow_path: str) -> Dict[str, Any]:
+        """
+        Charge un flow du dépôt, overlay et composants développés.
+
+        Args:
+            flow_path: Chemin relatif du fichier de flow dans le dépôt.
+
+        Returns:
+            Dict[str, Any]: Flow complet.
+
+        Raises:
+            json.JSONDecodeError: Si le fichier n'est pas un JSON valide.
+            ValueError: Si l'overlay ne peut pas être développé.
+        """
+        with open(self._full_path(flow_path), "r", encoding="utf-8") as file:
+            flow_data = json.load(file)
+        return self.expand(flow_data)
+
+    def expand(self, flow_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Développe un flow décodé: overlay de template puis références de composants.
+
+        Args:
+            flow_data: Contenu décodé du fichier de flow.
+
+        Returns:
+            Dict[str, Any]: Flow complet.
+        """
+        if is_overlay(flow_data):
+            flow_data = expand_overlay(flow_data, self._read_template)
+        return expand_components(flow_data, self._read_component)
+
+    def read_bytes(self, flow_path: str) -> bytes:
+        """
+        Lit le corps à envoyer à Langflow pour un flow: les octets du fichier tels quels,
+        ou le flow développé et sérialisé s'il s'agit d'un overlay ou s'il référence des composants.
+
+        Args:
+            flow_path: Chemin relatif du fichier de flow dans le dépôt.
+
+        Returns:
+            bytes: Corps JSON du flow.
+        """
+        with open(self._full_path(flow_path), "rb") as file:
+            raw_content = file.read()
+        if _needs_expansion(raw_content):
+            return json.dumps(self.expand(json.loads(raw_content))).encode("utf-8")
+        return raw_content
+
+def load_flow_at_commit(git_manager: GitManager, commit: str, flow_path: str) -> Optional[Dict[str, Any]]:
+    """
+    Charge un flow tel qu'il était à un commit donné, overlay et composants développés
+    avec les fichiers de ce commit.
+
+    Args:
+        git_manager: Gestionnaire Git du dépôt.
+        commit: Commit de référence.
+        flow_path: Chemin relatif du fichier de flow dans le dépôt.
+
+    Returns:
+        Optional[Dict[str, Any]]: Flow complet ou None s'il est absent ou illisible à ce commit.
+    """
+    content = git_manager.read_file_at_commit(commit, flow_path)
+    if content is None:
+        return None
+
+    def read_template(template_path: str) -> Dict[str, Any]:
+        template_content = git_manager.read_file_at_commit(commit, template_path)
+        if template_content is None:
+            raise ValueError(f"Template {template_path} introuvable au commit {commit}")
+        return json.loads(template_content)
+
+    read_component = make_component_reader(lambda file_path: git_manager.read_file_at_commit(commit, file_path))
+
+    try:
+        flow_data = json.loads(content)
+        if is_overlay(flow_data):
+            flow_data = expand_overlay(flow_data, read_template)
+        return expand_components(flow_data, read_component)
+    except ValueError as e:
+        logger.warning(f"Version du flow {flow_path} au commit {commit} illisible: {e}")
+        return None
+
+def load_flow_id_at_commit(git_manager: GitManager, commit: str, flow_path: str) -> Optional[str]:
+    """
+    Lit l'ID d'un flow tel qu'il était à un commit donné, sans développer l'overlay (un flow
+    développé ne porte que l'ID de son overlay).
+
+    Args:
+        git_manager: Gestionnaire Git du dépôt.
+        commit: Commit de référence.
+        flow_path: Chemin relatif du fichier de flow dans le dépôt.
+
+    Returns:
+        Optional[str]: ID du flow ou None s'il est absent, invalide ou si le fichier est illisible.
+    """
+    content = git_manager.read_file_at_commit(commit, flow_path)
+    if content is None:
+        return None
+    try:
+        return extract_flow_id(json.loads(content))
+    except ValueError as e:
+        logger.debug(f"ID du flow {flow_path} au commit {commit} illisible: {e}")
+        return None
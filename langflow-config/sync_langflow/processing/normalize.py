@@ -0,0 +1,140 @@
+import argparse
+import copy
+import json
+import logging
+import sys
+import time
+from typing import Dict, List, Any, Optional
+
+logger = logging.getLogger("sync_app")
+
+# Champs d'état de l'interface réécrits par Langflow à chaque manipulation, sans effet sur le flow
+VOLATILE_NODE_FIELDS = ("selected", "dragging", "measured", "positionAbsolute")
+VOLATILE_EDGE_FIELDS = ("selected", "animated")
+VOLATILE_GRAPH_FIELDS = ("viewport",)
+
+def normalize_graph(graph: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Normalise, en place, le graphe ("data") d'un flow.
+
+    Les champs volatils de l'interface sont supprimés et les positions des nœuds sont
+    arrondies au pixel.
+
+    Args:
+        graph: Graphe du flow (nodes, edges, viewport).
+
+    Returns:
+        Dict[str, Any]: Le graphe normalisé.
+    """
+    for field in VOLATILE_GRAPH_FIELDS:
+        graph.pop(field, None)
+
+    for node in graph.get("nodes", []):
+        for field in VOLATILE_NODE_FIELDS:
+            node.pop(field, None)
+        position = node.get("position")
+        if isinstance(position, dict):
+            for axis in ("x", "y"):
+                if isinstance(position.get(axis), float):
+                    position[axis] = round(position[axis])
+
+    for edge in graph.get("edges", []):
+        for field in VOLATILE_EDGE_FIELDS:
+            edge.pop(field, None)
+
+    return graph
+
+def normalize_flow(flow_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Normalise, en place, un flow (ou un overlay de template).
+
+    Args:
+        flow_data: Contenu du flow.
+
+    Returns:
+        Dict[str, Any]: Le flow normalisé.
+    """
+    if isinstance(flow_data.get("data"), dict):
+        normalize_graph(flow_data["data"])
+    return flow_data
+
+def normalized_graph_copy(graph: Any) -> Any:
+    """
+    Retourne une copie normalisée d'un graphe, pour comparer deux versions d'un flow
+    sans tenir compte des champs volatils.
+
+    Args:
+        graph: Graphe du flow.
+
+    Returns:
+        Any: Copie normalisée (ou la valeur elle-même si ce n'est pas un graphe).
+    """
+    if not isinstance(graph, dict):
+        return graph
+    return normalize_graph(copy.deepcopy(graph))
+
+def format_flow(flow_data: Dict[str, Any]) -> str:
+    """
+    Sérialise un flow dans sa forme canonique: clés triées, indentation de 2 espaces,
+    caractères non ASCII conservés et retour à la ligne final.
+
+    Args:
+        flow_data: Contenu du flow.
+
+    Returns:
+        str: Texte canonique du flow.
+    """
+    return json.dumps(flow_data, indent=2, sort_keys=True, ensure_ascii=False) + "\n"
+
+def canonicalize_file(file_path: str, check_only: bool = False) -> bool:
+    """
+    Réécrit un fichier de flow dans sa forme canonique.
+
+    Args:
+        file_path: Chemin du fichier de flow.
+        check_only: Si True, le fichier n'est pas modifié.
+
+    Returns:
+        bool: True si le fichier n'était pas dans sa forme canonique.
+    """
+    with open(file_path, "r", encoding="utf-8") as file:
+        content = file.read()
+    canonical_content = format_flow(normalize_flow(json.loads(content)))
+    if canonical_content == content:
+        return False
+    if not check_only:
+        with open(file_path, "w", encoding="utf-8") as file:
+            file.write(canonical_content)
+    return True
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Point d'entrée du formateur de flows (utilisable comme hook pre-commit)."""
+    parser = argparse.ArgumentParser(description="Réécrit les flows Langflow dans une forme canonique.")
+    parser.add_argument("--check", action="store_true", help="Vérifie seulement; code de sortie 1 si un fichier doit être réécrit")
+    parser.add_argument("files", nargs="+", help="Fichiers de flows à normaliser")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    changed_files = []
+    exit_code = 0
+    for file_path in args.files:
+        try:
+            if canonicalize_file(file_path, check_only=args.check):
+                changed_files.append(file_path)
+        except (OSError, ValueError) as e:
+            print(f"{file_path}: fichier de flow illisible: {e}", file=sys.stderr)
+            exit_code = 1
+
+    action = "à normaliser" if args.check else "normalisé"
+    for file_path in changed_files:
+        print(f"{file_path}: {action}")
+    elapsed = time.perf_counter() - start
+    print(f"{len(args.files)} fichiers traités en {elapsed:.2f}s, {len(changed_files)} {action}(s)", file=sys.stderr)
+
+    # Comme les formateurs usuels, signaler à pre-commit que des fichiers ont été réécrits
+    if changed_files:
+        exit_code = 1
+    return exit_code
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+import json
+import logging
+from typing import Dict, List, Any, Tuple
+
+from .normalize import normalize_graph
+
+logger = logging.getLogger("sync_app")
+
+# Types de nœuds produisant la sortie d'un flow: tout nœud qui n'y mène pas est mort
+OUTPUT_NODE_TYPES = ("ChatOutput", "TextOutput")
+# Type des nœuds de notes (commentaires de l'interface)
+NOTE_NODE_TYPE = "note"
+# Champs des templates de composants affichés uniquement par l'interface (infobulles)
+DISPLAY_ONLY_TEMPLATE_FIELDS = ("info",)
+
+def _node_type(node: Dict[str, Any]) -> str:
+    return node.get("data", {}).get("type", "")
+
+def find_live_nodes(nodes: List[Dict[str, Any]], edges: List[Dict[str, Any]]) -> set:
+    """
+    Détermine les nœuds qui contribuent à une sortie du flow.
+
+    Un nœud est vivant s'il existe un chemin de liens de ce nœud vers un nœud de sortie
+    (ChatInput -> Agent -> ChatOutput, ou un outil branché sur l'agent).
+
+    Args:
+        nodes: Nœuds du flow.
+        edges: Liens du flow.
+
+    Returns:
+        set: IDs des nœuds vivants.
+    """
+    sources_by_target = {}
+    for edge in edges:
+        sources_by_target.setdefault(edge.get("target"), []).append(edge.get("source"))
+
+    live_nodes = {node.get("id") for node in nodes if _node_type(node) in OUTPUT_NODE_TYPES}
+    pending = list(live_nodes)
+    while pending:
+        node_id = pending.pop()
+        for source_id in sources_by_target.get(node_id, []):
+            if source_id not in live_nodes:
+                live_nodes.add(source_id)
+                pending.append(source_id)
+    return live_nodes
+
+def optimize_flow(flow_data: Dict[str, Any], keep_notes: bool = True) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Allège, en place, un flow avant son envoi à Langflow.
+
+    Les nœuds qui ne mènent à aucune sortie sont supprimés avec leurs liens (les notes sont
+    conservées si keep_notes est actif), ainsi que l'état de l'interface et les infobulles
+    des champs. Un flow sans nœud de sortie n'est pas élagué.
+
+    Args:
+        flow_data: Contenu du flow.
+        keep_notes: Si True, les nœuds de notes sont conservés.
+
+    Returns:
+        Tuple[Dict[str, Any], Dict[str, Any]]: Le flow optimisé et le rapport
+        (nodes_removed, removed_node_ids, bytes_before, bytes_removed).
+    """
+    bytes_before = len(json.dumps(flow_data).encode("utf-8"))
+    report = {"nodes_removed": 0, "removed_node_ids": [], "bytes_before": bytes_before, "bytes_removed": 0}
+
+    graph = flow_data.get("data")
+    if not isinstance(graph, dict):
+        return flow_data, report
+
+    nodes = graph.get("nodes", [])
+    edges = graph.get("edges", [])
+    live_nodes = find_live_nodes(nodes, edges)
+
+    if live_nodes:
+        kept_nodes = []
+        for node in nodes:
+            is_note = _node_type(node) == NOTE_NODE_TYPE
+            if node.get("id") in live_nodes or (is_note and keep_notes):
+                kept_nodes.append(node)
+            else:
+                report["removed_node_ids"].append(node.get("id"))
+        if report["removed_node_ids"]:
+            kept_ids = {node.get("id") for node in kept_nodes}
+            graph["nodes"] = kept_nodes
+            graph["edges"] = [edge for edge in edges if edge.get("source") in kept_ids and edge.get("target") in kept_ids]
+        report["nodes_removed"] = len(report["removed_node_ids"])
+    else:
+        logger.debug(f"Aucun nœud de sortie dans le flow '{flow_data.get('name')}', élagage ignoré")
+
+    normalize_graph(graph)
+    for node in graph.get("nodes", []):
+        for field in node.get("data", {}).get("node", {}).get("template", {}).values():
+            if isinstance(field, dict):
+                for display_field in DISPLAY_ONLY_TEMPLATE_FIELDS:
+                    field.pop(display_field, None)
+
+    report["bytes_removed"] = bytes_before - len(json.dumps(flow_data).encode("utf-8"))
+    return flow_data, report
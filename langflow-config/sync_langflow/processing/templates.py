@@ -0,0 +1,226 @@
+import argparse
+import copy
+import json
+import logging
+import os
+import sys
+from typing import Callable, Dict, List, Any, Optional
+
+logger = logging.getLogger("sync_app")
+
+# Clé désignant le flow de base d'un overlay (chemin relatif à la racine du dépôt)
+TEMPLATE_KEY = "$template"
+# Clé des surcharges de champs de nœuds: {node_id: {field_name: value}}
+NODES_KEY = "$nodes"
+# Répertoire conventionnel des flows de base (hors de "flows/" pour ne pas être synchronisés)
+TEMPLATES_DIR = "langflow-config/templates"
+
+def is_overlay(flow_data: Any) -> bool:
+    """
+    Indique si un flow est un overlay à développer à partir d'un flow de base.
+
+    Args:
+        flow_data: Contenu décodé du fichier de flow.
+
+    Returns:
+        bool: True si le flow référence un template.
+    """
+    return isinstance(flow_data, dict) and isinstance(flow_data.get(TEMPLATE_KEY), str)
+
+def is_template_path(file_path: str) -> bool:
+    """
+    Indique si un chemin du dépôt correspond à un flow de base.
+
+    Args:
+        file_path: Chemin du fichier relatif à la racine du dépôt.
+
+    Returns:
+        bool: True si le fichier est un template de flow.
+    """
+    return file_path.endswith(".json") and file_path.startswith(f"{TEMPLATES_DIR}/")
+
+def expand_overlay(overlay: Dict[str, Any], read_template: Callable[[str], Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Développe un overlay en flow complet.
+
+    Les clés de premier niveau de l'overlay remplacent celles du flow de base, et chaque
+    entrée de "$nodes" remplace la valeur d'un champ du template d'un nœud. L'ID du flow de
+    base n'est jamais repris: le flow porte l'ID de l'overlay, ou aucun.
+
+    Args:
+        overlay: Contenu de l'overlay.
+        read_template: Fonction renvoyant le contenu décodé d'un template à partir de son chemin.
+
+    Returns:
+        Dict[str, Any]: Flow complet.
+
+    Raises:
+        ValueError: Si l'overlay référence un nœud ou un champ absent du flow de base.
+    """
+    template_path = overlay[TEMPLATE_KEY]
+    flow_data = copy.deepcopy(read_template(template_path))
+    # Tous les overlays d'un template partageraient son ID, qui identifie le flow dans Langflow
+    flow_data.pop("id", None)
+
+    for key, value in overlay.items():
+        if key not in (TEMPLATE_KEY, NODES_KEY):
+            flow_data[key] = copy.deepcopy(value)
+
+    node_overrides = overlay.get(NODES_KEY) or {}
+    if node_overrides:
+        nodes_by_id = {node.get("id"): node for node in flow_data.get("data", {}).get("nodes", [])}
+        for node_id, fields in node_overrides.items():
+            node = nodes_by_id.get(node_id)
+            if node is None:
+                raise ValueError(f"Le nœud '{node_id}' n'existe pas dans le template {template_path}")
+            template = node.get("data", {}).get("node", {}).get("template", {})
+            for field_name, value in fields.items():
+                if not isinstance(template.get(field_name), dict):
+                    raise ValueError(f"Le champ '{field_name}' du nœud '{node_id}' n'existe pas dans le template {template_path}")
+                template[field_name]["value"] = copy.deepcopy(value)
+
+    return flow_data
+
+def build_overlay(base_data: Dict[str, Any], flow_data: Dict[str, Any], template_path: str) -> Dict[str, Any]:
+    """
+    Calcule l'overlay qui reproduit un flow complet à partir d'un flow de base.
+
+    Args:
+        base_data: Contenu du flow de base.
+        flow_data: Contenu du flow complet.
+        template_path: Chemin du template, relatif à la racine du dépôt.
+
+    Returns:
+        Dict[str, Any]: Overlay équivalent au flow.
+
+    Raises:
+        ValueError: Si le flow diffère du template autrement que par des champs de premier
+            niveau ou des valeurs de champs de nœuds.
+    """
+    overlay = {TEMPLATE_KEY: template_path}
+    for key, value in flow_data.items():
+        if key != "data" and (key == "id" or base_data.get(key) != value):
+            overlay[key] = value
+
+    base_graph = base_data.get("data", {})
+    graph = flow_data.get("data", {})
+    if base_graph == graph:
+        return overlay
+
+    base_nodes = {node.get("id"): node for node in base_graph.get("nodes", [])}
+    nodes = {node.get("id"): node for node in graph.get("nodes", [])}
+    if base_nodes.keys() != nodes.keys() or base_graph.get("edges") != graph.get("edges"):
+        raise ValueError("Les nœuds ou les liens du flow diffèrent du template")
+
+    node_overrides = {}
+    for node_id, node in nodes.items():
+        base_node = base_nodes[node_id]
+        if node == base_node:
+            continue
+        base_template = base_node.get("data", {}).get("node", {}).get("template", {})
+        template = node.get("data", {}).get("node", {}).get("template", {})
+        fields = {
+            field_name: field.get("value")
+            for field_name, field in template.items()
+            if isinstance(field, dict) and field != base_template.get(field_name)
+        }
+        node_overrides[node_id] = fields
+    overlay[NODES_KEY] = node_overrides
+
+    # L'overlay doit reproduire exactement le flow (sinon le flow diffère au-delà des valeurs des champs)
+    if expand_overlay(overlay, lambda _: base_data) != flow_data:
+        raise ValueError("Le flow diffère du template au-delà des valeurs des champs de ses nœuds")
+    return overlay
+
+def make_disk_template_reader(repo_path: str) -> Callable[[str], Dict[str, Any]]:
+    """
+    Crée une fonction de lecture des templates depuis le disque, avec cache.
+
+    Args:
+        repo_path: Chemin absolu du dépôt Git.
+
+    Returns:
+        Callable[[str], Dict[str, Any]]: Fonction renvoyant le contenu d'un template.
+    """
+    templates_cache = {}
+
+    def read_template(template_path: str) -> Dict[str, Any]:
+        if template_path not in templates_cache:
+            with open(os.path.join(repo_path, template_path), "r", encoding="utf-8") as file:
+                templates_cache[template_path] = json.load(file)
+        return templates_cache[template_path]
+
+    return read_template
+
+def find_dependent_overlays(template_paths: List[str], flow_paths: List[str], repo_path: str) -> List[str]:
+    """
+    Trouve les overlays qui référencent l'un des templates donnés.
+
+    Args:
+        template_paths: Chemins des templates, relatifs à la racine du dépôt.
+        flow_paths: Chemins des flows à examiner, relatifs à la racine du dépôt.
+        repo_path: Chemin absolu du dépôt Git.
+
+    Returns:
+        List[str]: Chemins des overlays dépendants.
+    """
+    template_set = set(template_paths)
+    dependents = []
+    for flow_path in flow_paths:
+        full_path = os.path.join(repo_path, flow_path)
+        try:
+            with open(full_path, "rb") as file:
+                raw_content = file.read()
+            # Éviter de décoder les flows complets, qui ne référencent aucun template
+            if TEMPLATE_KEY.encode("utf-8") not in raw_content:
+                continue
+            flow_data = json.loads(raw_content)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Impossible de lire le flow {flow_path} pour la détection des templates: {e}")
+            continue
+        if is_overlay(flow_data) and flow_data[TEMPLATE_KEY] in template_set:
+            dependents.append(flow_path)
+    return dependents
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Point d'entrée de l'outil de gestion des templates de flows."""
+    parser = argparse.ArgumentParser(description="Gère les flows définis comme overlays d'un flow de base.")
+    parser.add_argument("--repo-path", default=os.getcwd(), help="Chemin vers le dépôt Git local")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    extract_parser = subparsers.add_parser("extract", help="Remplace des flows complets par des overlays d'un template")
+    extract_parser.add_argument("--template", required=True, help="Chemin du template, relatif à la racine du dépôt")
+    extract_parser.add_argument("flows", nargs="+", help="Fichiers de flows à convertir")
+
+    expand_parser = subparsers.add_parser("expand", help="Affiche le flow complet d'un overlay")
+    expand_parser.add_argument("overlay", help="Fichier d'overlay à développer")
+
+    args = parser.parse_args(argv)
+    read_template = make_disk_template_reader(args.repo_path)
+
+    if args.command == "expand":
+        with open(args.overlay, "r", encoding="utf-8") as file:
+            overlay = json.load(file)
+        json.dump(expand_overlay(overlay, read_template), sys.stdout, indent=2, ensure_ascii=False)
+        sys.stdout.write("\n")
+        return 0
+
+    base_data = read_template(args.template)
+    exit_code = 0
+    for flow_file in args.flows:
+        with open(flow_file, "r", encoding="utf-8") as file:
+            flow_data = json.load(file)
+        try:
+            overlay = build_overlay(base_data, flow_data, args.template)
+        except ValueError as e:
+            print(f"{flow_file}: conversion impossible: {e}", file=sys.stderr)
+            exit_code = 1
+            continue
+        with open(flow_file, "w", encoding="utf-8") as file:
+            json.dump(overlay, file, indent=2, ensure_ascii=False)
+            file.write("\n")
+        print(f"{flow_file}: converti en overlay de {args.template}")
+    return exit_code
+
+if __name__ == "__main__":
+    sys.exit(main())
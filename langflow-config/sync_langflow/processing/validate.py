@@ -0,0 +1,143 @@
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from typing import Dict, List, Any, Optional
+
+from .loader import FlowLoader
+from .optimize import OUTPUT_NODE_TYPES
+
+logger = logging.getLogger("sync_app")
+
+# Caractère utilisé par Langflow à la place des guillemets dans les poignées sérialisées des liens
+HANDLE_QUOTE_CHAR = "œ"
+
+def parse_handle(handle: Any) -> Optional[Dict[str, Any]]:
+    """
+    Décode une poignée de lien (dictionnaire ou chaîne sérialisée par Langflow).
+
+    Args:
+        handle: Valeur de sourceHandle ou targetHandle.
+
+    Returns:
+        Optional[Dict[str, Any]]: Poignée décodée ou None si elle est illisible.
+    """
+    if isinstance(handle, dict):
+        return handle
+    if not isinstance(handle, str):
+        return None
+    try:
+        parsed_handle = json.loads(handle.replace(HANDLE_QUOTE_CHAR, '"'))
+    except ValueError:
+        return None
+    return parsed_handle if isinstance(parsed_handle, dict) else None
+
+def validate_flow(flow_data: Any) -> List[str]:
+    """
+    Vérifie l'intégrité structurelle d'un flow, en un seul passage sur ses nœuds et ses liens.
+
+    Sont détectés: les IDs de nœuds en double, les liens dont la source, la cible ou les
+    poignées ne correspondent à aucun nœud, l'absence de nœud de sortie et l'absence
+    d'endpoint_name (ces deux derniers contrôles ne s'appliquent pas aux composants).
+
+    Args:
+        flow_data: Contenu complet du flow (overlays et composants développés).
+
+    Returns:
+        List[str]: Erreurs détectées (liste vide si le flow est valide).
+    """
+    if not isinstance(flow_data, dict):
+        return ["le flow n'est pas un objet JSON"]
+    graph = flow_data.get("data")
+    if not isinstance(graph, dict):
+        return ["le graphe (\"data\") est absent"]
+    nodes = graph.get("nodes", [])
+    edges = graph.get("edges", [])
+    if not isinstance(nodes, list) or not isinstance(edges, list):
+        return ["les nœuds et les liens du graphe doivent être des listes"]
+
+    errors = []
+    node_types = {}
+    for node in nodes:
+        node_id = node.get("id") if isinstance(node, dict) else None
+        if not node_id:
+            errors.append("nœud sans ID")
+            continue
+        if node_id in node_types:
+            errors.append(f"ID de nœud en double: {node_id}")
+        node_types[node_id] = node.get("data", {}).get("type", "")
+
+    edge_ids = set()
+    for edge in edges:
+        if not isinstance(edge, dict):
+            errors.append("lien invalide (objet attendu)")
+            continue
+        edge_id = edge.get("id", "")
+        if edge_id and edge_id in edge_ids:
+            errors.append(f"ID de lien en double: {edge_id}")
+        edge_ids.add(edge_id)
+
+        for end, handle_key in (("source", "sourceHandle"), ("target", "targetHandle")):
+            node_id = edge.get(end)
+            if node_id not in node_types:
+                errors.append(f"lien {edge_id}: {end} '{node_id}' inexistant")
+                continue
+            if edge.get(handle_key) is None:
+                continue
+            handle = parse_handle(edge[handle_key])
+            if handle is None:
+                errors.append(f"lien {edge_id}: {handle_key} illisible")
+            elif handle.get("id") != node_id:
+                errors.append(f"lien {edge_id}: {handle_key} pointe vers '{handle.get('id')}' au lieu de '{node_id}'")
+
+    if not flow_data.get("is_component"):
+        if not any(node_type in OUTPUT_NODE_TYPES for node_type in node_types.values()):
+            errors.append(f"aucun nœud de sortie ({', '.join(OUTPUT_NODE_TYPES)})")
+        if not flow_data.get("endpoint_name"):
+            errors.append("endpoint_name absent")
+
+    return errors
+
+def validate_flow_files(flow_paths: List[str], repo_path: str) -> Dict[str, List[str]]:
+    """
+    Valide des fichiers de flows du dépôt, sans aucun appel réseau.
+
+    Args:
+        flow_paths: Chemins relatifs des fichiers de flows.
+        repo_path: Chemin absolu du dépôt Git.
+
+    Returns:
+        Dict[str, List[str]]: Erreurs par chemin, pour les seuls flows invalides.
+    """
+    loader = FlowLoader(repo_path)
+    invalid_flows = {}
+    for flow_path in flow_paths:
+        try:
+            errors = validate_flow(loader.load(flow_path))
+        except (OSError, ValueError) as e:
+            errors = [f"fichier de flow illisible: {e}"]
+        if errors:
+            invalid_flows[flow_path] = errors
+    return invalid_flows
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Point d'entrée du validateur de flows (utilisable en CI ou comme hook pre-commit)."""
+    parser = argparse.ArgumentParser(description="Vérifie l'intégrité structurelle des flows Langflow.")
+    parser.add_argument("--repo-path", default=os.getcwd(), help="Chemin vers le dépôt Git local")
+    parser.add_argument("files", nargs="+", help="Fichiers de flows à valider")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    flow_paths = [os.path.relpath(os.path.abspath(file_path), args.repo_path) for file_path in args.files]
+    invalid_flows = validate_flow_files(flow_paths, args.repo_path)
+    for flow_path, errors in invalid_flows.items():
+        for error in errors:
+            print(f"{flow_path}: {error}")
+    elapsed = time.perf_counter() - start
+    print(f"{len(flow_paths)} flows validés en {elapsed * 1000:.0f}ms, {len(invalid_flows)} invalide(s)", file=sys.stderr)
+    return 1 if invalid_flows else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+from typing import Dict, Any, Optional
+
+from .utils import extract_flow_name_from_path, extract_folder_name_from_path
+
+class FlowRecord:
+    """
+    Description minimale d'un flow synchronisé, transmise de la détection Git jusqu'à OpenWebUI
+    à la place des données complètes renvoyées par Langflow (graphe compris).
+    """
+
+    __slots__ = ("path", "id", "name", "endpoint_name", "folder", "content_hash")
+
+    def __init__(self, path: str, flow_id: Optional[str] = None, name: Optional[str] = None,
+                 endpoint_name: Optional[str] = None, folder: Optional[str] = None,
+                 content_hash: Optional[str] = None):
+        """
+        Initialise l'enregistrement d'un flow.
+
+        Args:
+            path: Chemin relatif du fichier de flow dans le dépôt.
+            flow_id: ID du flow dans Langflow (optionnel).
+            name: Nom du flow (par défaut: nom du fichier).
+            endpoint_name: endpoint_name du flow (optionnel).
+            folder: Dossier du flow (par défaut: déduit du chemin).
+            content_hash: Empreinte Git (blob) du fichier de flow synchronisé (optionnel).
+        """
+        self.path = path
+        self.id = flow_id
+        self.name = name or extract_flow_name_from_path(path)
+        self.endpoint_name = endpoint_name
+        self.folder = folder if folder is not None else extract_folder_name_from_path(path)
+        self.content_hash = content_hash
+
+    @classmethod
+    def from_flow_data(cls, path: str, flow_data: Dict[str, Any]) -> "FlowRecord":
+        """
+        Crée l'enregistrement d'un flow à partir des données renvoyées par Langflow,
+        qui peuvent ensuite être libérées.
+
+        Args:
+            path: Chemin relatif du fichier de flow dans le dépôt.
+            flow_data: Données du flow renvoyées par Langflow.
+
+        Returns:
+            FlowRecord: Enregistrement du flow.
+        """
+        return cls(path, flow_data.get("id"), flow_data.get("name"), flow_data.get("endpoint_name"))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convertit l'enregistrement en dictionnaire sérialisable (journal de synchronisation).
+
+        Returns:
+            Dict[str, Any]: Champs de l'enregistrement.
+        """
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, values: Dict[str, Any]) -> "FlowRecord":
+        """
+        Recrée un enregistrement à partir de son dictionnaire (voir to_dict).
+
+        Args:
+            values: Champs de l'enregistrement.
+
+        Returns:
+            FlowRecord: Enregistrement du flow.
+        """
+        return cls(values["path"], values.get("id"), values.get("name"), values.get("endpoint_name"),
+                   values.get("folder"), values.get("content_hash"))
+
+    def __repr__(self) -> str:
+        return f"FlowRecord(path={self.path!r}, id={self.id!r}, name={self.name!r})"
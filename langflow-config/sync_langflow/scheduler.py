@@ -0,0 +1,178 @@
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, List, Any, Optional
+
+from .telemetry import profile_call
+
+logger = logging.getLogger("sync_app")
+
+# États d'une tâche
+TASK_PENDING = "pending"
+TASK_RUNNING = "running"
+TASK_DONE = "done"
+TASK_FAILED = "failed"
+TASK_SKIPPED = "skipped"
+
+# Tâche en cours d'exécution dans chaque thread (voir current_task_name)
+_current_task = threading.local()
+
+def current_task_name() -> Optional[str]:
+    """
+    Retourne le nom de la tâche exécutée par le thread courant.
+
+    Returns:
+        Optional[str]: Nom de la tâche, ou None hors d'une tâche de l'ordonnanceur.
+    """
+    return getattr(_current_task, "name", None)
+
+class Task:
+    """Tâche du graphe de synchronisation."""
+
+    __slots__ = ("name", "func", "requires", "after", "state", "result", "error", "duration")
+
+    def __init__(self, name: str, func: Callable[[], Any], requires: List[str], after: List[str]):
+        """
+        Initialise une tâche.
+
+        Args:
+            name: Nom unique de la tâche.
+            func: Fonction exécutée, sans argument.
+            requires: Tâches qui doivent avoir réussi avant celle-ci.
+            after: Tâches qui doivent seulement être terminées (réussies ou non) avant celle-ci.
+        """
+        self.name = name
+        self.func = func
+        self.requires = requires
+        self.after = after
+        self.state = TASK_PENDING
+        self.result = None
+        self.error = None
+        self.duration = 0.0
+
+class TaskScheduler:
+    """
+    Exécute un graphe de tâches en parallèle: chaque tâche démarre dès que ses dépendances sont
+    terminées. L'échec d'une tâche n'annule que les tâches qui en requièrent le succès.
+    """
+
+    def __init__(self, max_workers: int = 4, name: str = "sync"):
+        """
+        Initialise l'ordonnanceur.
+
+        Args:
+            max_workers: Nombre maximal de tâches exécutées simultanément.
+            name: Préfixe des noms des threads d'exécution (visible dans les journaux multi-cibles).
+        """
+        self.max_workers = max(1, max_workers)
+        self.name = name
+        self.tasks = {}
+
+    def add_task(self, name: str, func: Callable[[], Any], requires: Iterable[str] = (),
+                 after: Iterable[str] = ()) -> str:
+        """
+        Ajoute une tâche au graphe. Les dépendances doivent avoir été ajoutées auparavant,
+        ce qui garantit l'absence de cycle.
+
+        Args:
+            name: Nom unique de la tâche.
+            func: Fonction exécutée, sans argument.
+            requires: Tâches qui doivent avoir réussi avant celle-ci.
+            after: Tâches qui doivent seulement être terminées avant celle-ci.
+
+        Returns:
+            str: Nom de la tâche.
+
+        Raises:
+            ValueError: Si le nom est déjà utilisé ou si une dépendance est inconnue.
+        """
+        if name in self.tasks:
+            raise ValueError(f"Tâche déjà définie: {name}")
+        requires, after = list(requires), list(after)
+        for dependency in requires + after:
+            if dependency not in self.tasks:
+                raise ValueError(f"Dépendance inconnue pour la tâche {name}: {dependency}")
+        self.tasks[name] = Task(name, func, requires, after)
+        return name
+
+    def result(self, name: str) -> Any:
+        """
+        Retourne le résultat d'une tâche terminée (None si elle a échoué ou n'a pas été exécutée).
+
+        Args:
+            name: Nom de la tâche.
+
+        Returns:
+            Any: Résultat de la tâche.
+        """
+        return self.tasks[name].result
+
+    def _run_task(self, task: Task) -> Any:
+        start = time.perf_counter()
+        _current_task.name = task.name
+        try:
+            return profile_call(task.func)
+        finally:
+            _current_task.name = None
+            task.duration = time.perf_counter() - start
+
+    def run(self) -> Dict[str, str]:
+        """
+        Exécute toutes les tâches du graphe.
+
+        Returns:
+            Dict[str, str]: État final de chaque tâche (done, failed ou skipped).
+        """
+        dependents = {name: [] for name in self.tasks}
+        remaining = {}
+        for task in self.tasks.values():
+            remaining[task.name] = set(task.requires + task.after)
+            for dependency in remaining[task.name]:
+                dependents[dependency].append(task.name)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name) as executor:
+            running = {}
+
+            def submit(task: Task) -> None:
+                task.state = TASK_RUNNING
+                running[executor.submit(self._run_task, task)] = task
+
+            def settle(task: Task) -> None:
+                # Débloquer les dépendants d'une tâche terminée, ignorer ceux qui en requéraient le succès
+                for dependent_name in dependents[task.name]:
+                    dependent = self.tasks[dependent_name]
+                    if dependent.state != TASK_PENDING:
+                        continue
+                    if task.state != TASK_DONE and task.name in dependent.requires:
+                        dependent.state = TASK_SKIPPED
+                        logger.warning(f"Tâche {dependent.name} ignorée: la tâche {task.name} n'a pas abouti")
+                        settle(dependent)
+                        continue
+                    remaining[dependent_name].discard(task.name)
+                    if not remaining[dependent_name]:
+                        submit(dependent)
+
+            for task in list(self.tasks.values()):
+                if not remaining[task.name]:
+                    submit(task)
+
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task = running.pop(future)
+                    try:
+                        task.result = future.result()
+                        task.state = TASK_DONE
+                        logger.debug(f"Tâche {task.name} terminée en {task.duration:.2f}s")
+                    except Exception as e:
+                        task.state = TASK_FAILED
+                        task.error = e
+                        logger.error(f"Échec de la tâche {task.name}: {e}")
+                    settle(task)
+
+        elapsed = time.perf_counter() - start
+        failed_count = sum(1 for task in self.tasks.values() if task.state == TASK_FAILED)
+        logger.info(f"{len(self.tasks)} tâches exécutées en {elapsed:.2f}s ({failed_count} échec(s))")
+        return {name: task.state for name, task in self.tasks.items()}
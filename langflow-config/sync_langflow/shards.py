@@ -0,0 +1,144 @@
+import hashlib
+from typing import Dict, List, Any, Tuple
+
+from .utils import extract_flow_name_from_path, extract_folder_name_from_path
+
+# Ordre de gravité des statuts de synchronisation d'une cible
+STATUS_SEVERITY = {"ok": 0, "partial": 1, "error": 2}
+
+def parse_shard(shard_spec: str) -> Tuple[int, int]:
+    """
+    Décode une spécification de shard de la forme "i/N" (i de 1 à N).
+
+    Args:
+        shard_spec: Spécification du shard (ex: "2/4").
+
+    Returns:
+        Tuple[int, int]: Numéro du shard et nombre total de shards.
+
+    Raises:
+        ValueError: Si la spécification est invalide.
+    """
+    try:
+        shard_index, shard_count = (int(part) for part in shard_spec.split("/"))
+    except ValueError:
+        raise ValueError(f"Shard invalide '{shard_spec}' (forme attendue: i/N)")
+    if shard_count < 1 or not 1 <= shard_index <= shard_count:
+        raise ValueError(f"Shard invalide '{shard_spec}' (i doit être compris entre 1 et N)")
+    return shard_index, shard_count
+
+def shard_of(flow_path: str, shard_count: int) -> int:
+    """
+    Retourne le shard propriétaire d'un flow: une empreinte stable du nom de son dossier, afin
+    qu'un dossier ne soit jamais modifié par deux shards.
+
+    Args:
+        flow_path: Chemin relatif du fichier de flow dans le dépôt.
+        shard_count: Nombre total de shards.
+
+    Returns:
+        int: Numéro du shard (de 1 à shard_count).
+    """
+    folder_name = extract_folder_name_from_path(flow_path) or ""
+    digest = hashlib.sha1(folder_name.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % shard_count + 1
+
+def filter_changes_for_shard(changes: Dict[str, List[str]], shard_index: int, shard_count: int) -> Dict[str, List[str]]:
+    """
+    Restreint les changements de flows à ceux d'un shard.
+
+    Un flow supprimé suit le shard d'un flow ajouté sous le même nom (fichier déplacé d'un dossier
+    à l'autre), afin que la suppression précède toujours l'ajout.
+
+    Args:
+        changes: Changements renvoyés par GitManager.detect_changes.
+        shard_index: Numéro du shard (de 1 à shard_count).
+        shard_count: Nombre total de shards.
+
+    Returns:
+        Dict[str, List[str]]: Changements du shard.
+    """
+    added_owners = {
+        extract_flow_name_from_path(flow_path): shard_of(flow_path, shard_count)
+        for flow_path in changes["flows_added"]
+    }
+    shard_changes = dict(changes)
+    shard_changes["flows_added"] = [
+        flow_path for flow_path in changes["flows_added"] if shard_of(flow_path, shard_count) == shard_index
+    ]
+    shard_changes["flows_modified"] = [
+        flow_path for flow_path in changes["flows_modified"] if shard_of(flow_path, shard_count) == shard_index
+    ]
+    shard_changes["flows_deleted"] = [
+        flow_path for flow_path in changes["flows_deleted"]
+        if added_owners.get(extract_flow_name_from_path(flow_path), shard_of(flow_path, shard_count)) == shard_index
+    ]
+    return shard_changes
+
+def merge_reports(reports: List[Dict[str, Any]]) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Fusionne les rapports des shards d'une même synchronisation.
+
+    Args:
+        reports: Rapports écrits par chaque shard (--report-path).
+
+    Returns:
+        Tuple[Dict[str, Any], List[str]]: Rapport fusionné et incohérences détectées (shard
+        manquant ou en double, commits différents).
+    """
+    errors = []
+    commits = {(report.get("before_commit"), report.get("after_commit")) for report in reports}
+    if len(commits) > 1:
+        errors.append(f"les rapports portent sur des commits différents: {sorted(commits)}")
+
+    shard_specs = [report.get("shard") for report in reports]
+    if None in shard_specs:
+        errors.append("un rapport ne provient pas d'une synchronisation partitionnée (--shard)")
+    else:
+        shards = [parse_shard(shard_spec) for shard_spec in shard_specs]
+        shard_counts = {shard_count for _, shard_count in shards}
+        if len(shard_counts) > 1:
+            errors.append(f"nombres de shards différents: {sorted(shard_counts)}")
+        else:
+            shard_count = shard_counts.pop()
+            shard_indexes = [shard_index for shard_index, _ in shards]
+            missing = sorted(set(range(1, shard_count + 1)) - set(shard_indexes))
+            if missing:
+                errors.append(f"shards manquants: {', '.join(f'{index}/{shard_count}' for index in missing)}")
+            if len(shard_indexes) != len(set(shard_indexes)):
+                errors.append("un même shard apparaît dans plusieurs rapports")
+
+    merged = {
+        "before_commit": reports[0].get("before_commit") if reports else None,
+        "after_commit": reports[0].get("after_commit") if reports else None,
+        "shards": sorted(spec for spec in shard_specs if spec),
+        "flows_added": sum(report.get("flows_added", 0) for report in reports),
+        "flows_modified": sum(report.get("flows_modified", 0) for report in reports),
+        "flows_deleted": sum(report.get("flows_deleted", 0) for report in reports),
+        # Les shards s'exécutent en parallèle: la durée est celle du plus lent
+        "duration": max((report.get("duration", 0) for report in reports), default=0),
+        "targets": {}
+    }
+    for report in reports:
+        for name, result in report.get("targets", {}).items():
+            merged_result = merged["targets"].setdefault(name, {
+                "status": "ok",
+                "langflow_url": result.get("langflow_url"),
+                "flows_deleted": 0,
+                "flows_processed": 0,
+                "pipelines_uploaded": 0,
+                "failed_tasks": [],
+                "skipped_tasks": [],
+                "duration": 0
+            })
+            if STATUS_SEVERITY.get(result.get("status"), 2) > STATUS_SEVERITY[merged_result["status"]]:
+                merged_result["status"] = result.get("status", "error")
+            if result.get("status") == "error":
+                merged_result.setdefault("errors", []).append(result.get("error"))
+                continue
+            for counter in ("flows_deleted", "flows_processed", "pipelines_uploaded"):
+                merged_result[counter] += result.get(counter, 0)
+            merged_result["failed_tasks"].extend(result.get("failed_tasks", []))
+            merged_result["skipped_tasks"].extend(result.get("skipped_tasks", []))
+            merged_result["duration"] = max(merged_result["duration"], result.get("duration", 0))
+    return merged, errors
@@ -0,0 +1,848 @@
+import copy
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from functools import partial
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+
+from .config import Config
+from .journal import SyncJournal
+from .records import FlowRecord
+from .shards import filter_changes_for_shard, parse_shard
+from .scheduler import TASK_FAILED, TASK_SKIPPED, TaskScheduler
+from .telemetry import Telemetry
+from .utils import extract_flow_name_from_path, extract_folder_name_from_path
+from .managers.git import GitManager
+from .managers.endpoints import EndpointIndex
+from .managers.index import FlowIndex
+from .processing.loader import FlowLoader, load_flow_id_at_commit
+from .processing.templates import find_dependent_overlays, is_template_path
+from .processing.validate import validate_flow_files
+
+if TYPE_CHECKING:
+    from .clients.langflow import LangflowClient
+    from .clients.openwebui import OpenWebUIManager
+    from .clients.transport import Cassette
+    from .managers.flow import FlowManager
+    from .managers.folder import FolderManager
+
+logger = logging.getLogger("sync_app")
+
+def publish_pipeline(openwebui_manager: "OpenWebUIManager", flow_record: FlowRecord, output_dir: str) -> bool:
+    """
+    Génère et télécharge vers OpenWebUI le pipeline d\"un flow synchronisé.
+    
+    Args:
+        openwebui_manager: Gestionnaire OpenWebUI.
+        flow_record: Enregistrement du flow.
+        output_dir: Répertoire temporaire des pipelines générés.
+        
+    Returns:
+        bool: True si le pipeline a été téléchargé.
+    """
+    logger.debug(f"Traitement du flow {flow_record.id} ({flow_record.path}) pour OpenWebUI...")
+    endpoint_name, flow_name = openwebui_manager.extract_flow_info(
+        {"name": flow_record.name, "endpoint_name": flow_record.endpoint_name}, flow_record.path
+    )
+    if not endpoint_name or not flow_name:
+        logger.warning(f"  -> Informations insuffisantes (endpoint ou nom) pour générer le pipeline pour le flow ID {flow_record.id}")
+        return False
+    
+    logger.info(f"  -> Génération du pipeline pour 	{flow_name}	 (Endpoint: {endpoint_name})")
+    pipeline_path = openwebui_manager.generate_pipeline(endpoint_name, flow_name, output_dir)
+    if not pipeline_path:
+        logger.error(f"  -> Échec de la génération du pipeline pour {flow_name}")
+        return False
+    
+    logger.info(f"  -> Téléchargement du pipeline {os.path.basename(pipeline_path)} vers OpenWebUI...")
+    # Le fichier temporaire sera supprimé avec le répertoire temporaire
+    return openwebui_manager.upload_pipeline(pipeline_path)
+
+def prune_pipelines(openwebui_manager: "OpenWebUIManager", langflow_client: "LangflowClient",
+                    endpoint_index: EndpointIndex, verify_remote: bool) -> int:
+    """
+    Supprime les pipelines OpenWebUI qui ne correspondent à aucun flow du dépôt.
+    
+    Args:
+        openwebui_manager: Gestionnaire OpenWebUI.
+        langflow_client: Client API Langflow, utilisé pour le contrôle croisé.
+        endpoint_index: Index des endpoints et pipelines des flows du dépôt.
+        verify_remote: Si True, les endpoints sont contrôlés avec les métadonnées des flows de Langflow.
+        
+    Returns:
+        int: Nombre de pipelines supprimés.
+    """
+    logger.info("Suppression des pipelines OpenWebUI non utilisés...")
+    
+    # Endpoints et pipelines utilisés par les flows du dépôt, indexés avant la synchronisation
+    if verify_remote:
+        # Contrôle croisé avec les métadonnées des flows de Langflow (sans télécharger les graphes),
+        # sur une copie de l'index: il est partagé entre les cibles
+        endpoint_index = copy.deepcopy(endpoint_index)
+        missing_remote, remote_only = endpoint_index.cross_check(langflow_client.iter_flow_headers())
+        for endpoint_name in missing_remote:
+            logger.warning(f"Endpoint '{endpoint_name}' présent dans le dépôt mais absent de Langflow")
+        for endpoint_name in remote_only:
+            logger.warning(f"Endpoint '{endpoint_name}' présent uniquement dans Langflow, son pipeline est conservé")
+    used_endpoints = sorted(endpoint_index.used_names())
+    
+    # Appeler la méthode pour supprimer les pipelines non utilisés
+    deleted_count, deleted_pipelines = openwebui_manager.delete_unused_pipelines(used_endpoints)
+    
+    if deleted_count > 0:
+        logger.info(f"Pipelines OpenWebUI supprimés: {deleted_count}")
+        for pipeline_name in deleted_pipelines:
+            logger.info(f"  - {pipeline_name}")
+    else:
+        logger.info("Aucun pipeline OpenWebUI non utilisé à supprimer")
+    return deleted_count
+
+def delete_empty_folders(folder_manager: "FolderManager") -> List[str]:
+    """
+    Supprime les dossiers Langflow vides.
+    
+    Args:
+        folder_manager: Gestionnaire de dossiers.
+        
+    Returns:
+        List[str]: Noms des dossiers supprimés.
+    """
+    logger.info("Suppression des dossiers vides...")
+    deleted_folders = folder_manager.delete_empty_folders()
+    if deleted_folders:
+        logger.info(f"Dossiers vides supprimés: {len(deleted_folders)}")
+        for folder_name in deleted_folders:
+            logger.info(f"  - {folder_name}")
+    else:
+        logger.info("Aucun dossier vide à supprimer")
+    return deleted_folders
+
+def build_sync_tasks(scheduler: TaskScheduler, changes: Dict[str, List[str]], config: Config,
+                     flow_manager: "FlowManager", folder_manager: "FolderManager",
+                     openwebui_manager: Optional["OpenWebUIManager"], langflow_client: "LangflowClient",
+                     endpoint_index: EndpointIndex, blob_hashes: Dict[str, str],
+                     pipeline_dir: str, global_phases: bool = True,
+                     journal: Optional[SyncJournal] = None) -> Dict[str, List[str]]:
+    """
+    Construit le graphe des tâches de synchronisation.
+    
+    Chaque flow suit sa propre chaîne: suppression d\"un flow de même nom, envoi à Langflow,
+    puis rattachement à son dossier d\"une part, génération et téléchargement de son pipeline
+    d\"autre part. Les nouveaux flows d\"un même dossier sont envoyés ensemble (création par lots).
+    L\"élagage des pipelines et la suppression des dossiers vides terminent le graphe.
+    
+    Args:
+        scheduler: Ordonnanceur auquel ajouter les tâches.
+        changes: Changements détectés par GitManager.detect_changes.
+        config: Configuration de la synchronisation.
+        flow_manager: Gestionnaire de flows.
+        folder_manager: Gestionnaire de dossiers.
+        openwebui_manager: Gestionnaire OpenWebUI (None si l\"intégration est désactivée).
+        langflow_client: Client API Langflow.
+        endpoint_index: Index des endpoints et pipelines des flows du dépôt.
+        blob_hashes: Empreintes Git des flows ajoutés et modifiés.
+        pipeline_dir: Répertoire temporaire des pipelines générés.
+        global_phases: Si False, l\"élagage des pipelines et la suppression des dossiers vides
+            sont omis (synchronisation partitionnée: ils sont exécutés une seule fois à la fusion).
+        journal: Journal des opérations (optionnel). Les opérations qu\"il marque comme terminées
+            ne sont pas rejouées: leur résultat est lu dans le journal.
+        
+    Returns:
+        Dict[str, List[str]]: Noms des tâches par catégorie (delete, upload, folder, pipeline).
+    """
+    sync_tasks = {"delete": [], "upload": [], "folder": [], "pipeline": []}
+    upload_task_by_path = {}
+    
+    def journaled(operation: str, func: Callable[[], Any],
+                  succeeded: Callable[[Any], bool] = lambda result: True) -> Callable[[], Any]:
+        # Une opération déjà terminée (synchronisation reprise) n'est pas rejouée
+        if journal is None:
+            return func
+        def run() -> Any:
+            if journal.is_done(operation):
+                logger.debug(f"Opération {operation} déjà effectuée, résultat repris du journal")
+                return journal.result(operation)
+            result = func()
+            if succeeded(result):
+                journal.record_done(operation, result)
+            return result
+        return run
+    
+    # Suppressions: un flow ajouté sous le même nom (renommage de fichier) doit attendre la suppression
+    delete_task_by_name = {}
+    for flow_path in changes["flows_deleted"]:
+        task_name = f"delete:{flow_path}"
+        scheduler.add_task(
+            task_name, journaled(task_name, partial(flow_manager.process_deleted_flows, [flow_path]), bool)
+        )
+        delete_task_by_name[extract_flow_name_from_path(flow_path)] = task_name
+        sync_tasks["delete"].append(task_name)
+    
+    def upload(process: Callable[..., Dict[str, FlowRecord]], flow_paths: List[str], *args: Any) -> Dict[str, FlowRecord]:
+        # Chaque flow envoyé est journalisé individuellement: un lot interrompu n'est repris que pour
+        # ses flows restants
+        flow_records = {}
+        remaining_paths = []
+        for flow_path in flow_paths:
+            if journal is not None and journal.is_done(f"upload:{flow_path}"):
+                flow_record = FlowRecord.from_dict(journal.result(f"upload:{flow_path}"))
+                flow_records[flow_record.id] = flow_record
+            else:
+                remaining_paths.append(flow_path)
+        if remaining_paths:
+            for flow_id, flow_record in process(remaining_paths, *args).items():
+                flow_record.content_hash = blob_hashes.get(flow_record.path)
+                flow_records[flow_id] = flow_record
+                if journal is not None:
+                    journal.record_done(f"upload:{flow_record.path}", flow_record.to_dict())
+        return flow_records
+    
+    def previous_deletions(flow_paths: List[str]) -> List[str]:
+        flow_names = {extract_flow_name_from_path(flow_path) for flow_path in flow_paths}
+        return [delete_task_by_name[flow_name] for flow_name in flow_names if flow_name in delete_task_by_name]
+    
+    def records_for(flow_paths: List[str]) -> List[FlowRecord]:
+        wanted_paths = set(flow_paths)
+        flow_records = []
+        for task_name in {upload_task_by_path[flow_path] for flow_path in flow_paths}:
+            flow_records.extend(
+                flow_record for flow_record in (scheduler.result(task_name) or {}).values()
+                if flow_record.path in wanted_paths
+            )
+        return flow_records
+    
+    # Envois: nouveaux flows regroupés par dossier (création par lots), flows modifiés un par un
+    added_by_folder = {}
+    for flow_path in changes["flows_added"]:
+        added_by_folder.setdefault(extract_folder_name_from_path(flow_path), []).append(flow_path)
+    for folder_name, flow_paths in added_by_folder.items():
+        task_name = scheduler.add_task(
+            f"add:{folder_name or '(racine)'}",
+            partial(upload, flow_manager.process_added_flows, flow_paths, config.repo_path),
+            after=previous_deletions(flow_paths)
+        )
+        for flow_path in flow_paths:
+            upload_task_by_path[flow_path] = task_name
+        sync_tasks["upload"].append(task_name)
+    for flow_path in changes["flows_modified"]:
+        task_name = scheduler.add_task(
+            f"modify:{flow_path}",
+            partial(upload, flow_manager.process_modified_flows, [flow_path], config.repo_path),
+            after=previous_deletions([flow_path])
+        )
+        upload_task_by_path[flow_path] = task_name
+        sync_tasks["upload"].append(task_name)
+    
+    # Dossiers: chaque dossier est mis à jour dès que tous ses flows ont été envoyés
+    paths_by_folder = {}
+    for flow_path in upload_task_by_path:
+        folder_name = extract_folder_name_from_path(flow_path)
+        if folder_name:
+            paths_by_folder.setdefault(folder_name, []).append(flow_path)
+    for folder_name, flow_paths in paths_by_folder.items():
+        task_name = f"folder:{folder_name}"
+        scheduler.add_task(
+            task_name,
+            # Le dossier n'est tenu pour à jour que si tous ses flows ont été envoyés
+            journaled(
+                task_name,
+                lambda flow_paths=flow_paths: folder_manager.organize_flows_by_folder(records_for(flow_paths)),
+                lambda result, flow_paths=flow_paths: len(records_for(flow_paths)) == len(flow_paths)
+            ),
+            after={upload_task_by_path[flow_path] for flow_path in flow_paths}
+        )
+        sync_tasks["folder"].append(task_name)
+    
+    # Pipelines OpenWebUI: chaque pipeline est publié dès que son flow est dans Langflow
+    if config.enable_openwebui and openwebui_manager:
+        def publish(flow_path: str) -> bool:
+            flow_records = records_for([flow_path])
+            if not flow_records:
+                logger.debug(f"Flow {flow_path} non synchronisé, pipeline non publié")
+                return False
+            return publish_pipeline(openwebui_manager, flow_records[0], pipeline_dir)
+        
+        for flow_path, upload_task_name in upload_task_by_path.items():
+            task_name = f"pipeline:{flow_path}"
+            sync_tasks["pipeline"].append(scheduler.add_task(
+                task_name, journaled(task_name, partial(publish, flow_path), bool), requires=[upload_task_name]
+            ))
+    
+    # Phases globales: élagage des pipelines et suppression des dossiers vides, une fois tous les flows traités
+    if not global_phases:
+        return sync_tasks
+    if config.enable_openwebui and openwebui_manager:
+        scheduler.add_task(
+            "prune-pipelines",
+            journaled("prune-pipelines", partial(
+                prune_pipelines, openwebui_manager, langflow_client, endpoint_index, config.verify_endpoints_remote
+            )),
+            after=sync_tasks["upload"]
+        )
+    
+    scheduler.add_task(
+        "delete-empty-folders", journaled("delete-empty-folders", partial(delete_empty_folders, folder_manager)),
+        after=sync_tasks["delete"] + sync_tasks["folder"]
+    )
+    return sync_tasks
+
+
+def write_report(report: Dict[str, Any], report_path: str) -> bool:
+    """
+    Écrit un rapport de synchronisation au format JSON.
+
+    Args:
+        report: Contenu du rapport.
+        report_path: Chemin du fichier du rapport.
+
+    Returns:
+        bool: True si le rapport a été écrit.
+    """
+    temp_path = f"{report_path}.tmp"
+    try:
+        report_dir = os.path.dirname(report_path)
+        if report_dir:
+            os.makedirs(report_dir, exist_ok=True)
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2, ensure_ascii=False)
+        os.replace(temp_path, report_path)
+        return True
+    except Exception as e:
+        logger.warning(f"Impossible d'écrire le rapport {report_path}: {e}")
+        return False
+
+def build_report(plan: "SyncPlan", results: Dict[str, Dict[str, Any]], duration: float,
+                 shard: Optional[str] = None, telemetry: Optional[Telemetry] = None) -> Dict[str, Any]:
+    """
+    Construit le rapport JSON d'une synchronisation.
+    
+    Args:
+        plan: Plan de synchronisation appliqué.
+        results: Résultat de chaque cible (voir apply_sync), par nom de cible.
+        duration: Durée totale de la synchronisation en secondes.
+        shard: Shard synchronisé ("i/N"), pour une synchronisation partitionnée.
+        telemetry: Mesures de la planification (durée de chaque phase), optionnel.
+        
+    Returns:
+        Dict[str, Any]: Rapport de synchronisation.
+    """
+    report = {
+        "before_commit": plan.before_commit,
+        "after_commit": plan.after_commit,
+        "flows_added": len(plan.changes["flows_added"]),
+        "flows_modified": len(plan.changes["flows_modified"]),
+        "flows_deleted": len(plan.changes["flows_deleted"]),
+        "duration": round(duration, 3),
+        "targets": results
+    }
+    if shard:
+        report["shard"] = shard
+    if telemetry is not None:
+        report["telemetry"] = telemetry.report()
+    return report
+
+def resolve_report_path(config: Config) -> Optional[str]:
+    """
+    Retourne le chemin du rapport de synchronisation.
+    
+    Args:
+        config: Configuration de la synchronisation.
+        
+    Returns:
+        Optional[str]: Chemin du rapport, ou None si aucun chemin n'est configuré. À défaut d'un
+        chemin explicite, le rapport est conservé dans le cache disque.
+    """
+    if config.report_path:
+        return config.report_path
+    if config.cache_dir:
+        return os.path.join(config.cache_dir, "sync-report.json")
+    return None
+
+def log_target_result(name: str, result: Dict[str, Any]) -> None:
+    """
+    Journalise le résultat de la synchronisation d'une cible.
+    
+    Args:
+        name: Nom de la cible.
+        result: Résultat de la cible (voir apply_sync).
+    """
+    if result["status"] == "error":
+        logger.error(f"Cible {name}: échec ({result['error']})")
+        return
+    logger.info(
+        f"Cible {name}: {result['status']}, {result['flows_processed']} flow(s) envoyé(s), "
+        f"{result['flows_deleted']} supprimé(s), {len(result['failed_tasks'])} tâche(s) en échec "
+        f"en {result['duration']:.2f}s"
+    )
+
+def open_flow_index(config: Config) -> Optional[FlowIndex]:
+    """
+    Ouvre l'index des flows (seuls les flows modifiés y sont relus à chaque synchronisation).
+    
+    Args:
+        config: Configuration de la synchronisation.
+        
+    Returns:
+        Optional[FlowIndex]: Index des flows, ou None si aucun chemin n'est configuré. À défaut
+        d'un chemin explicite, l'index est conservé dans le cache disque.
+    """
+    flow_index_path = config.index_path
+    if not flow_index_path and config.cache_dir:
+        flow_index_path = os.path.join(config.cache_dir, "flow-index.json")
+    return FlowIndex(flow_index_path) if flow_index_path else None
+
+class SyncContext:
+    """
+    Clients et gestionnaires utilisés par les synchronisations d'une cible (instance Langflow et,
+    le cas échéant, OpenWebUI). Conservés d'une synchronisation à l'autre (mode démon), ils
+    gardent leurs caches et leurs connexions HTTP ouvertes.
+    
+    Les clients et les gestionnaires qui en dépendent ne sont créés qu'au premier accès: une
+    synchronisation sans flow modifié n'importe ni n'initialise aucun client HTTP.
+    """
+
+    def __init__(self, config: Config, name: str = "default", with_flow_index: bool = True):
+        """
+        Initialise le contexte de la cible (gestionnaire Git et index des flows).
+        
+        Args:
+            config: Configuration validée de la cible.
+            name: Nom de la cible (utilisé dans les journaux et les rapports).
+            with_flow_index: Si False, l'index des flows n'est pas ouvert (il est alors partagé
+                entre plusieurs cibles et géré par l'appelant).
+        """
+        self.config = config
+        self.name = name
+        self.git_manager = GitManager(config.repo_path)
+        self.flow_index = open_flow_index(config) if with_flow_index else None
+        # Mesures des synchronisations: chaque appel HTTP des clients y est enregistré
+        self.telemetry = Telemetry()
+        self._clients = None
+        self._clients_lock = threading.Lock()
+
+    def open_clients(self) -> None:
+        """
+        Crée les clients et les gestionnaires de la cible s'ils ne l'ont pas encore été.
+        
+        Raises:
+            Exception: Si un client ne peut pas être initialisé.
+        """
+        with self._clients_lock:
+            if self._clients is not None:
+                return
+            # Imports différés: requests et les gestionnaires ne sont chargés que si la cible est contactée
+            from .clients.cache import ResponseCache
+            from .clients.langflow import LangflowClient
+            from .clients.openwebui import OpenWebUIManager
+            from .clients.transport import open_cassette
+            from .managers.flow import FlowManager
+            from .managers.folder import FolderManager
+            
+            config = self.config
+            cache = None
+            if config.cache_dir:
+                cache = ResponseCache(config.cache_dir, config.cache_max_mb * 1024 * 1024)
+            langflow_client = LangflowClient(config.langflow_url, config.api_token, cache, config.compress_uploads)
+            openwebui_manager = None
+            if config.enable_openwebui:
+                openwebui_manager = OpenWebUIManager(
+                    config.openwebui_url,
+                    config.openwebui_api_key,
+                    config.openwebui_template_path,
+                    config.valve_langflow_api_url
+                )
+            
+            # Cassette optionnelle: les échanges HTTP des clients sont enregistrés, ou rejoués hors ligne
+            cassette = open_cassette(config)
+            sessions = [(langflow_client.session, "langflow")]
+            if openwebui_manager is not None:
+                sessions.append((openwebui_manager.session, "openwebui"))
+            for session, service in sessions:
+                if cassette is not None:
+                    cassette.mount(session, service)
+                self.telemetry.instrument(session, service)
+            
+            flow_manager = FlowManager(
+                langflow_client,
+                int(config.batch_max_mb * 1024 * 1024),
+                config.optimize_flows,
+                config.optimize_keep_notes
+            )
+            self._clients = {
+                "langflow_client": langflow_client,
+                "openwebui_manager": openwebui_manager,
+                "flow_manager": flow_manager,
+                "folder_manager": FolderManager(langflow_client),
+                "cassette": cassette
+            }
+
+    def _client(self, name: str) -> Any:
+        self.open_clients()
+        return self._clients[name]
+
+    @property
+    def langflow_client(self) -> "LangflowClient":
+        """Client de l'API Langflow."""
+        return self._client("langflow_client")
+
+    @property
+    def openwebui_manager(self) -> Optional["OpenWebUIManager"]:
+        """Gestionnaire OpenWebUI (None si l'intégration est désactivée)."""
+        return self._client("openwebui_manager")
+
+    @property
+    def flow_manager(self) -> "FlowManager":
+        """Gestionnaire des flows."""
+        return self._client("flow_manager")
+
+    @property
+    def folder_manager(self) -> "FolderManager":
+        """Gestionnaire des dossiers."""
+        return self._client("folder_manager")
+
+    @property
+    def cassette(self) -> Optional["Cassette"]:
+        """Cassette d'enregistrement ou de rejeu des échanges HTTP (None si aucune)."""
+        return self._client("cassette")
+
+def open_journal(context: SyncContext, plan: "SyncPlan") -> Optional[SyncJournal]:
+    """
+    Ouvre le journal des opérations d'une cible pour un plan de synchronisation.
+    
+    Args:
+        context: Clients et gestionnaires de la cible.
+        plan: Plan de synchronisation.
+        
+    Returns:
+        Optional[SyncJournal]: Journal ouvert, ou None si aucun chemin n'est configuré (à défaut
+        d'un chemin explicite, le journal est conservé dans le cache disque).
+    """
+    config = context.config
+    journal_path = config.journal_path
+    if not journal_path and config.cache_dir:
+        journal_path = os.path.join(config.cache_dir, "sync-journal.jsonl")
+    if not journal_path:
+        return None
+    
+    # Identité de la synchronisation: seule une synchronisation identique peut être reprise
+    run_key = {
+        "before_commit": context.git_manager.resolve_commit(plan.before_commit) or plan.before_commit,
+        "after_commit": context.git_manager.resolve_commit(plan.after_commit) or plan.after_commit,
+        "shard": config.shard,
+        "langflow_url": config.langflow_url,
+        "openwebui_url": config.openwebui_url if config.enable_openwebui else None
+    }
+    journal = SyncJournal(journal_path)
+    try:
+        resumed_count = journal.open(run_key, config.resume)
+    except OSError as e:
+        logger.warning(f"Impossible d'ouvrir le journal {journal_path}, synchronisation sans journal: {e}")
+        return None
+    if resumed_count:
+        logger.info(f"Reprise de la synchronisation interrompue: {resumed_count} opération(s) déjà effectuée(s)")
+    return journal
+
+class SyncPlan:
+    """Changements à appliquer, calculés une seule fois quel que soit le nombre de cibles."""
+
+    __slots__ = ("before_commit", "after_commit", "changes", "endpoint_index", "blob_hashes", "flow_ids", "moved_flows")
+
+    def __init__(self, before_commit: str, after_commit: str, changes: Dict[str, List[str]],
+                 endpoint_index: EndpointIndex, blob_hashes: Dict[str, str], flow_ids: Dict[str, str],
+                 moved_flows: Dict[str, str]):
+        """
+        Initialise le plan de synchronisation.
+        
+        Args:
+            before_commit: Commit de départ des changements.
+            after_commit: Commit d'arrivée des changements.
+            changes: Changements détectés (overlays impactés par un template compris).
+            endpoint_index: Index des endpoints et pipelines de tous les flows du dépôt.
+            blob_hashes: Empreintes Git des flows ajoutés et modifiés.
+            flow_ids: ID stable de chaque flow du dépôt et de chaque flow supprimé, hors IDs partagés
+                par plusieurs fichiers (chemin -> ID).
+            moved_flows: Flows déplacés ou renommés (nouveau chemin -> ancien chemin).
+        """
+        self.before_commit = before_commit
+        self.after_commit = after_commit
+        self.changes = changes
+        self.endpoint_index = endpoint_index
+        self.blob_hashes = blob_hashes
+        self.flow_ids = flow_ids
+        self.moved_flows = moved_flows
+
+    @property
+    def unchanged(self) -> bool:
+        """True si aucun flow n'est à synchroniser: aucune phase réseau n'est alors nécessaire."""
+        return not any(self.changes[key] for key in ("flows_added", "flows_modified", "flows_deleted"))
+
+def plan_sync(config: Config, git_manager: GitManager, flow_index: Optional[FlowIndex], before_commit: str,
+              after_commit: str, include_pipelines: bool, telemetry: Optional[Telemetry] = None) -> Optional[SyncPlan]:
+    """
+    Détecte, valide et indexe les changements entre deux commits, sans aucun appel réseau.
+    
+    Args:
+        config: Configuration de la synchronisation.
+        git_manager: Gestionnaire Git du dépôt.
+        flow_index: Index des flows, mis à jour au commit d'arrivée (optionnel).
+        before_commit: Commit de départ des changements.
+        after_commit: Commit d'arrivée des changements.
+        include_pipelines: Si True, les collisions de noms de pipelines OpenWebUI sont bloquantes.
+        telemetry: Mesures de la synchronisation, où la durée de chaque phase est enregistrée (optionnel).
+        
+    Returns:
+        Optional[SyncPlan]: Plan de synchronisation, ou None si un flow est invalide ou si deux
+        flows partagent un même nom.
+    """
+    telemetry = telemetry if telemetry is not None else Telemetry()
+
+    # 1. Détecter les changements Git
+    with telemetry.span("detect"):
+        logger.info("Détection des changements Git...")
+        changes = git_manager.detect_changes(before_commit, after_commit)
+    
+        # Un template modifié impacte tous les overlays qui le référencent
+        changed_templates = [path for path in changes["added"] + changes["modified"] if is_template_path(path)]
+        if changed_templates:
+            all_flow_paths = git_manager.list_flow_files(after_commit)
+            for flow_path in find_dependent_overlays(changed_templates, all_flow_paths, config.repo_path):
+                if flow_path not in changes["flows_added"] and flow_path not in changes["flows_modified"]:
+                    logger.debug(f"Flow {flow_path} impacté par la modification de son template")
+                    changes["flows_modified"].append(flow_path)
+    
+        # Synchronisation partitionnée: ne conserver que les flows des dossiers de ce shard. L'index
+        # des flows, partagé par les shards, est mis à jour avec tous les changements du commit
+        all_changes = changes
+        if config.shard:
+            shard_index, shard_count = parse_shard(config.shard)
+            changes = filter_changes_for_shard(changes, shard_index, shard_count)
+            logger.info(f"Shard {config.shard}: seuls les flows des dossiers de ce shard sont synchronisés")
+    
+    logger.info("Changements détectés:")
+    # Correction: Utiliser des variables temporaires pour les longueurs
+    num_flows_added = len(changes["flows_added"])
+    num_flows_modified = len(changes["flows_modified"])
+    num_flows_deleted = len(changes["flows_deleted"])
+    logger.info(f"  - Flows ajoutés: {num_flows_added}")
+    logger.info(f"  - Flows modifiés: {num_flows_modified}")
+    logger.info(f"  - Flows supprimés: {num_flows_deleted}")
+
+    # Aucun flow modifié (cas le plus fréquent): ni validation ni indexation des endpoints, seul
+    # l'index des flows avance au commit d'arrivée
+    if not num_flows_added and not num_flows_modified and not num_flows_deleted:
+        with telemetry.span("index"):
+            if flow_index is not None:
+                flow_index.update(git_manager, all_changes, before_commit, after_commit, config.repo_path)
+                flow_index.save()
+        return SyncPlan(before_commit, after_commit, changes, EndpointIndex(), {}, {}, {})
+
+    # Valider les flows avant tout appel réseau: un commit invalide ne doit pas être appliqué à moitié
+    with telemetry.span("validate"):
+        flows_to_validate = changes["flows_added"] + changes["flows_modified"]
+        invalid_flows = validate_flow_files(flows_to_validate, config.repo_path)
+        for flow_path, errors in invalid_flows.items():
+            for error in errors:
+                logger.error(f"Flow invalide {flow_path}: {error}")
+        if invalid_flows:
+            logger.error(f"{len(invalid_flows)} flow(s) invalide(s), synchronisation annulée")
+            return None
+        logger.info(f"Flows validés: {len(flows_to_validate)}")
+
+    # Mettre à jour l'index des flows
+    with telemetry.span("index"):
+        if flow_index is not None:
+            indexed_count = flow_index.update(git_manager, all_changes, before_commit, after_commit, config.repo_path)
+            if flow_index.save():
+                logger.info(f"Index des flows mis à jour: {indexed_count} flow(s) indexé(s)")
+
+    # Indexer les IDs, endpoints et pipelines de tous les flows du dépôt: deux flows ne doivent jamais
+    # partager un endpoint ou un fichier de pipeline (le dernier envoyé écraserait l'autre)
+    with telemetry.span("endpoints"):
+        if flow_index is not None:
+            endpoint_index = EndpointIndex.from_flow_index(flow_index)
+        else:
+            endpoint_index = EndpointIndex.from_flow_files(
+                git_manager.list_flow_files(after_commit), FlowLoader(config.repo_path)
+            )
+        collisions = endpoint_index.collisions(include_pipelines=include_pipelines)
+        for collision in collisions:
+            logger.error(f"Collision: {collision}")
+        if collisions:
+            logger.error(f"{len(collisions)} collision(s) de noms, synchronisation annulée")
+            return None
+        # Les flows qui partagent un ID (fichier copié) sont retrouvés par leur nom
+        shared_ids = endpoint_index.shared_ids()
+        for flow_id, flow_paths in sorted(shared_ids.items()):
+            logger.warning(f"ID '{flow_id}' partagé par: {', '.join(flow_paths)}; ces flows seront retrouvés par leur nom")
+
+    # IDs stables des flows: ceux du dépôt au commit d'arrivée et ceux des flows supprimés au commit
+    # de départ. Un flow supprimé dont l'ID est toujours porté par un fichier du dépôt a été déplacé
+    # ou renommé: il est mis à jour par son ID au lieu d'être supprimé puis recréé
+    with telemetry.span("moves"):
+        flow_ids = {flow_path: flow_id for flow_path, flow_id in endpoint_index.flow_ids.items() if flow_id not in shared_ids}
+        path_by_id = {flow_id: flow_path for flow_path, flow_id in flow_ids.items()}
+        moved_flows = {}
+        flows_deleted = []
+        for flow_path in changes["flows_deleted"]:
+            flow_id = load_flow_id_at_commit(git_manager, before_commit, flow_path)
+            if flow_id in shared_ids:
+                # Supprimer par cet ID supprimerait un autre flow du dépôt
+                flow_id = None
+            if flow_id and flow_id in path_by_id:
+                logger.info(f"Flow {flow_path} déplacé ou renommé en {path_by_id[flow_id]} (ID: {flow_id}), mis à jour au lieu d'être supprimé")
+                moved_flows[path_by_id[flow_id]] = flow_path
+                continue
+            if flow_id:
+                flow_ids[flow_path] = flow_id
+            flows_deleted.append(flow_path)
+        changes = {**changes, "flows_deleted": flows_deleted}
+
+    with telemetry.span("blob_hashes"):
+        blob_hashes = git_manager.get_blob_hashes(after_commit, flows_to_validate)
+    return SyncPlan(before_commit, after_commit, changes, endpoint_index, blob_hashes, flow_ids, moved_flows)
+
+def apply_sync(context: SyncContext, plan: SyncPlan) -> Dict[str, Any]:
+    """
+    Applique un plan de synchronisation à une cible.
+    
+    Chaque flow suit sa propre chaîne de tâches (envoi -> dossier, envoi -> pipeline),
+    exécutée dès que ses dépendances sont terminées. Un plan sans flow modifié est appliqué sans
+    créer les clients de la cible ni faire aucun appel réseau.
+    
+    Args:
+        context: Clients et gestionnaires de la cible.
+        plan: Plan de synchronisation.
+        
+    Returns:
+        Dict[str, Any]: Résultat de la synchronisation (compteurs, tâches en échec, durée et mesures
+        des appels HTTP et des tâches).
+    """
+    config = context.config
+    telemetry = context.telemetry
+    telemetry.reset()
+    if plan.unchanged:
+        # Aucun flow à synchroniser: ni envoi, ni élagage des pipelines, ni suppression des dossiers
+        # vides (ces phases globales reprennent à la prochaine synchronisation modifiant des flows)
+        logger.info("Aucun flow modifié: synchronisation terminée sans appel à Langflow ni à OpenWebUI")
+        return {
+            "flows_deleted": 0,
+            "flows_processed": 0,
+            "pipelines_uploaded": 0,
+            "failed_tasks": [],
+            "skipped_tasks": [],
+            "patch_stats": {},
+            "optimize_stats": {},
+            "resumed_operations": 0,
+            "duration": 0.0,
+            "unchanged": True,
+            "telemetry": telemetry.report()
+        }
+    
+    flow_manager = context.flow_manager
+    flow_manager.reset()
+    flow_manager.flow_ids = plan.flow_ids
+    flow_manager.moved_flows = plan.moved_flows
+    flow_manager.shared_id_flows = {
+        flow_path for flow_paths in plan.endpoint_index.shared_ids().values() for flow_path in flow_paths
+    }
+    
+    start = time.perf_counter()
+    with telemetry.span("journal"):
+        journal = open_journal(context, plan)
+    task_states = {}
+    try:
+        with tempfile.TemporaryDirectory() as pipeline_dir:
+            scheduler = TaskScheduler(config.max_workers, context.name)
+            sync_tasks = build_sync_tasks(
+                scheduler, plan.changes, config, flow_manager, context.folder_manager,
+                context.openwebui_manager, context.langflow_client, plan.endpoint_index, plan.blob_hashes, pipeline_dir,
+                global_phases=not config.shard, journal=journal
+            )
+            if journal is not None:
+                journal.record_planned(scheduler.tasks)
+            with telemetry.span("tasks"):
+                task_states = scheduler.run()
+            telemetry.record_tasks(scheduler.tasks.values())
+    finally:
+        if journal is not None:
+            journal.close(complete=bool(task_states) and TASK_FAILED not in task_states.values())
+
+    deleted_count = sum(len(scheduler.result(task_name) or []) for task_name in sync_tasks["delete"])
+    processed_count = sum(len(scheduler.result(task_name) or {}) for task_name in set(sync_tasks["upload"]))
+    pipelines_uploaded = sum(1 for task_name in sync_tasks["pipeline"] if scheduler.result(task_name))
+    logger.info(f"Flows supprimés avec succès: {deleted_count}")
+    logger.info(f"Flows ajoutés/modifiés traités (ajoutés/mis à jour dans Langflow): {processed_count}")
+    if sync_tasks["pipeline"]:
+        logger.info(f"Pipelines OpenWebUI téléchargés/mis à jour: {pipelines_uploaded}")
+    
+    patch_stats = flow_manager.patch_stats
+    if patch_stats["full_bytes"]:
+        saved_bytes = patch_stats["full_bytes"] - patch_stats["sent_bytes"]
+        logger.info(f"Mises à jour minimales: {patch_stats['sent_bytes']} octets envoyés, {saved_bytes} octets économisés")
+    
+    optimize_stats = flow_manager.optimize_stats
+    if optimize_stats["flows"]:
+        logger.info(f"Flows optimisés: {optimize_stats['flows']} ({optimize_stats['nodes_removed']} nœuds et {optimize_stats['bytes_removed']} octets supprimés)")
+
+    return {
+        "flows_deleted": deleted_count,
+        "flows_processed": processed_count,
+        "pipelines_uploaded": pipelines_uploaded,
+        "failed_tasks": sorted(name for name, state in task_states.items() if state == TASK_FAILED),
+        "skipped_tasks": sorted(name for name, state in task_states.items() if state == TASK_SKIPPED),
+        "patch_stats": dict(patch_stats),
+        "optimize_stats": dict(optimize_stats),
+        "resumed_operations": journal.resumed if journal is not None else 0,
+        "duration": round(time.perf_counter() - start, 3),
+        "telemetry": telemetry.report()
+    }
+
+def run_sync(context: SyncContext, before_commit: str, after_commit: str, validate_only: bool = False) -> int:
+    """
+    Synchronise les changements entre deux commits vers une cible.
+    
+    La copie de travail du dépôt doit être au commit d'arrivée.
+    
+    Args:
+        context: Clients et gestionnaires de la cible.
+        before_commit: Commit de départ des changements.
+        after_commit: Commit d'arrivée des changements.
+        validate_only: Si True, les flows sont seulement validés.
+        
+    Returns:
+        int: Code de sortie (0 si la synchronisation a pu être effectuée, 1 sinon).
+    """
+    start = time.perf_counter()
+    logger.info("Démarrage de la synchronisation Langflow...")
+    plan_telemetry = Telemetry()
+    plan = plan_sync(
+        context.config, context.git_manager, context.flow_index, before_commit, after_commit,
+        context.config.enable_openwebui, plan_telemetry
+    )
+    if plan is None:
+        return 1
+    if validate_only:
+        logger.info("Mode validation seule: aucune synchronisation effectuée")
+        return 0
+    if not plan.unchanged:
+        try:
+            context.open_clients()
+        except Exception as e:
+            logger.error(f"Erreur lors de l'initialisation des clients: {e}")
+            return 1
+
+    result = apply_sync(context, plan)
+    result["status"] = "partial" if result["failed_tasks"] else "ok"
+    result["langflow_url"] = context.config.langflow_url
+    report_path = resolve_report_path(context.config)
+    if report_path:
+        report = build_report(
+            plan, {context.name: result}, time.perf_counter() - start, context.config.shard, plan_telemetry
+        )
+        if write_report(report, report_path):
+            logger.info(f"Rapport de synchronisation écrit dans {report_path}")
+    logger.info("Synchronisation terminée.")
+    return 0
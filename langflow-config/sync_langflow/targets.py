@@ -0,0 +1,242 @@
+import copy
+import json
+import logging
+import os
+import re
+import threading
+import time
+from typing import List, Optional, Tuple
+
+from .config import Config
+from .managers.git import GitManager
+from .managers.endpoints import EndpointIndex
+from .processing.loader import FlowLoader
+from .shards import merge_reports
+from .sync import (
+    SyncContext, apply_sync, build_report, delete_empty_folders, log_target_result, open_flow_index, plan_sync,
+    prune_pipelines, write_report
+)
+from .telemetry import Telemetry, profile_call
+
+logger = logging.getLogger("sync_app")
+
+# Champs de configuration propres à chaque cible (les autres sont hérités de la configuration commune)
+TARGET_FIELDS = (
+    "langflow_url",
+    "api_token",
+    "enable_openwebui",
+    "openwebui_url",
+    "openwebui_api_key",
+    "openwebui_template_path",
+    "valve_langflow_api_url"
+)
+# Champs secrets, qui peuvent aussi être lus depuis une variable d'environnement (clé suffixée par _env)
+SECRET_FIELDS = ("api_token", "openwebui_api_key")
+# Noms de cibles autorisés (utilisés dans les noms de threads et de répertoires de cache)
+TARGET_NAME_PATTERN = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+def load_targets(targets_path: str, base_config: Config) -> List[Tuple[str, Config]]:
+    """
+    Charge le fichier des cibles de synchronisation.
+
+    Le fichier contient une liste d'objets JSON; chaque cible a un nom unique et redéfinit tout ou
+    partie de TARGET_FIELDS. Un secret peut être fourni directement ou par le nom de la variable
+    d'environnement qui le contient (ex: "api_token_env": "LANGFLOW_PROD_TOKEN"). Chaque cible
+    dispose de son propre sous-répertoire de cache et de son propre journal.
+
+    Args:
+        targets_path: Chemin du fichier des cibles.
+        base_config: Configuration commune, héritée par chaque cible.
+
+    Returns:
+        List[Tuple[str, Config]]: Nom et configuration de chaque cible.
+
+    Raises:
+        ValueError: Si le fichier est illisible ou si une cible est invalide.
+    """
+    try:
+        with open(targets_path, "r", encoding="utf-8") as file:
+            entries = json.load(file)
+    except (OSError, ValueError) as e:
+        raise ValueError(f"Fichier des cibles {targets_path} illisible: {e}")
+    if not isinstance(entries, list) or not entries:
+        raise ValueError(f"Le fichier des cibles {targets_path} doit contenir une liste non vide")
+
+    allowed_keys = {"name"} | set(TARGET_FIELDS) | {f"{field}_env" for field in SECRET_FIELDS}
+    targets = []
+    for entry in entries:
+        if not isinstance(entry, dict):
+            raise ValueError("Chaque cible doit être un objet JSON")
+        name = entry.get("name")
+        if not isinstance(name, str) or not TARGET_NAME_PATTERN.match(name):
+            raise ValueError(f"Nom de cible invalide: {name!r}")
+        if any(name == target_name for target_name, _ in targets):
+            raise ValueError(f"Cible en double: {name}")
+        unknown_keys = sorted(set(entry) - allowed_keys)
+        if unknown_keys:
+            raise ValueError(f"Cible {name}: champs inconnus: {', '.join(unknown_keys)}")
+
+        target_config = copy.copy(base_config)
+        for field in TARGET_FIELDS:
+            if field in entry:
+                setattr(target_config, field, entry[field])
+        for field in SECRET_FIELDS:
+            env_name = entry.get(f"{field}_env")
+            if env_name:
+                if env_name not in os.environ:
+                    raise ValueError(f"Cible {name}: variable d'environnement {env_name} absente")
+                setattr(target_config, field, os.environ[env_name])
+        if base_config.cache_dir:
+            target_config.cache_dir = os.path.join(base_config.cache_dir, name)
+        if base_config.journal_path:
+            journal_root, journal_ext = os.path.splitext(base_config.journal_path)
+            target_config.journal_path = f"{journal_root}.{name}{journal_ext}"
+        for field in ("record_path", "replay_path"):
+            cassette_path = getattr(base_config, field)
+            if cassette_path:
+                cassette_root, cassette_ext = os.path.splitext(cassette_path)
+                setattr(target_config, field, f"{cassette_root}.{name}{cassette_ext}")
+        # L'index des flows décrit le dépôt, pas la cible: il est partagé et mis à jour une seule fois
+        target_config.index_path = None
+
+        error = target_config.validate()
+        if error:
+            raise ValueError(f"Cible {name}: {error}")
+        targets.append((name, target_config))
+    return targets
+
+def sync_targets(base_config: Config, targets: List[Tuple[str, Config]], before_commit: str, after_commit: str,
+                 validate_only: bool = False, report_path: Optional[str] = None) -> int:
+    """
+    Synchronise les changements entre deux commits vers plusieurs cibles.
+
+    Les changements sont détectés, validés et indexés une seule fois, puis appliqués à toutes les
+    cibles en parallèle, chacune avec ses propres clients, connexions et caches. L'échec d'une cible
+    n'interrompt pas les autres.
+
+    Args:
+        base_config: Configuration commune.
+        targets: Nom et configuration de chaque cible (voir load_targets).
+        before_commit: Commit de départ des changements.
+        after_commit: Commit d'arrivée des changements.
+        validate_only: Si True, les flows sont seulement validés.
+        report_path: Chemin du rapport JSON agrégé (optionnel).
+
+    Returns:
+        int: Code de sortie (0 si toutes les cibles ont pu être synchronisées, 1 sinon).
+    """
+    start = time.perf_counter()
+    target_names = [name for name, _ in targets]
+    logger.info(f"Démarrage de la synchronisation Langflow vers {len(targets)} cible(s): {', '.join(target_names)}")
+    plan_telemetry = Telemetry()
+    plan = plan_sync(
+        base_config, GitManager(base_config.repo_path), open_flow_index(base_config), before_commit, after_commit,
+        any(target_config.enable_openwebui for _, target_config in targets), plan_telemetry
+    )
+    if plan is None:
+        return 1
+    if validate_only:
+        logger.info("Mode validation seule: aucune synchronisation effectuée")
+        return 0
+
+    results = {}
+
+    def apply(name: str, target_config: Config) -> None:
+        try:
+            # Chaque cible s'exécute dans son propre thread, profilé séparément (--profile)
+            result = profile_call(lambda: apply_sync(SyncContext(target_config, name, with_flow_index=False), plan))
+            result["status"] = "partial" if result["failed_tasks"] else "ok"
+        except Exception as e:
+            logger.error(f"Erreur lors de la synchronisation de la cible {name}: {e}")
+            result = {"status": "error", "error": str(e)}
+        result["langflow_url"] = target_config.langflow_url
+        results[name] = result
+
+    # Un thread par cible, nommé d'après elle: les journaux de chaque cible restent identifiables
+    threads = [threading.Thread(target=apply, args=target, name=target[0]) for target in targets]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    report = build_report(
+        plan, {name: results[name] for name in target_names}, time.perf_counter() - start, base_config.shard,
+        plan_telemetry
+    )
+    for name in target_names:
+        log_target_result(name, results[name])
+    if report_path and write_report(report, report_path):
+        logger.info(f"Rapport de synchronisation écrit dans {report_path}")
+
+    logger.info("Synchronisation terminée.")
+    return 1 if any(result["status"] == "error" for result in results.values()) else 0
+
+def finalize_shards(base_config: Config, targets: List[Tuple[str, Config]], shard_report_paths: List[str],
+                    report_path: Optional[str] = None) -> int:
+    """
+    Fusionne les rapports des shards d'une synchronisation partitionnée et exécute, une seule fois
+    par cible, les phases globales omises par les shards: élagage des pipelines OpenWebUI et
+    suppression des dossiers vides.
+
+    La copie de travail du dépôt doit être au commit synchronisé par les shards.
+
+    Args:
+        base_config: Configuration commune.
+        targets: Nom et configuration de chaque cible.
+        shard_report_paths: Rapports écrits par chaque shard.
+        report_path: Chemin du rapport fusionné (optionnel).
+
+    Returns:
+        int: Code de sortie (0 si tous les shards et toutes les phases globales ont réussi, 1 sinon).
+    """
+    reports = []
+    for shard_report_path in shard_report_paths:
+        try:
+            with open(shard_report_path, "r", encoding="utf-8") as file:
+                reports.append(json.load(file))
+        except (OSError, ValueError) as e:
+            logger.error(f"Rapport de shard {shard_report_path} illisible: {e}")
+            return 1
+    merged, errors = merge_reports(reports)
+    for error in errors:
+        logger.error(f"Fusion des shards impossible: {error}")
+    if errors:
+        # Sans la garantie que tous les shards ont synchronisé le même commit, les phases globales
+        # pourraient supprimer des pipelines ou des dossiers encore utilisés
+        return 1
+    logger.info(f"Fusion de {len(reports)} shard(s) du commit {merged['after_commit']}")
+
+    # Les endpoints de tous les flows sont relus dans les fichiers du commit synchronisé: un index des
+    # flows partagé ne garantit pas de couvrir les flows de tous les shards, et l'élagage
+    # supprimerait alors des pipelines encore utilisés
+    git_manager = GitManager(base_config.repo_path)
+    endpoint_index = EndpointIndex.from_flow_files(
+        git_manager.list_flow_files(merged["after_commit"]), FlowLoader(base_config.repo_path)
+    )
+
+    def run_global_phases(name: str, target_config: Config) -> None:
+        target_result = merged["targets"].setdefault(name, {"status": "ok", "langflow_url": target_config.langflow_url})
+        try:
+            context = SyncContext(target_config, name, with_flow_index=False)
+            global_phases = {"pipelines_deleted": 0}
+            if context.openwebui_manager:
+                global_phases["pipelines_deleted"] = prune_pipelines(
+                    context.openwebui_manager, context.langflow_client, endpoint_index, target_config.verify_endpoints_remote
+                )
+            global_phases["folders_deleted"] = delete_empty_folders(context.folder_manager)
+            target_result["global_phases"] = global_phases
+        except Exception as e:
+            logger.error(f"Erreur lors des phases globales de la cible {name}: {e}")
+            target_result["status"] = "error"
+            target_result.setdefault("errors", []).append(str(e))
+
+    threads = [threading.Thread(target=run_global_phases, args=target, name=target[0]) for target in targets]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    if report_path and write_report(merged, report_path):
+        logger.info(f"Rapport fusionné écrit dans {report_path}")
+    logger.info("Fusion des shards terminée.")
+    return 1 if any(result["status"] == "error" for result in merged["targets"].values()) else 0
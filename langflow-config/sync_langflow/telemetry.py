@@ -0,0 +1,287 @@
+import cProfile
+import logging
+import pstats
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Any, Optional
+from urllib.parse import urlsplit
+
+logger = logging.getLogger("sync_app")
+
+# Bornes supérieures (en secondes) des classes des histogrammes de latence
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Nombre de flows les plus lents conservés dans le rapport
+SLOWEST_FLOWS_LIMIT = 10
+# Segments d'URL identifiant une ressource (UUID, empreinte, nombre), remplacés par {id} dans les routes
+ID_SEGMENT_PATTERN = re.compile(r"^(?:[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}|[0-9a-fA-F]{16,}|\d+)$")
+
+def route_template(url: str) -> str:
+    """
+    Retourne la route d'une URL, identifiants de ressources remplacés par {id}
+    (ex: /api/v1/flows/{id}), afin de regrouper les appels d'un même endpoint.
+
+    Args:
+        url: URL de la requête.
+
+    Returns:
+        str: Route de la requête.
+    """
+    segments = urlsplit(url).path.split("/")
+    return "/".join("{id}" if ID_SEGMENT_PATTERN.match(segment) else segment for segment in segments)
+
+class LatencyHistogram:
+    """Histogramme de latences à classes fixes (LATENCY_BUCKETS)."""
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        """Initialise un histogramme vide."""
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, latency: float) -> None:
+        """
+        Ajoute une mesure à l'histogramme.
+
+        Args:
+            latency: Latence en secondes.
+        """
+        bucket = 0
+        while bucket < len(LATENCY_BUCKETS) and latency > LATENCY_BUCKETS[bucket]:
+            bucket += 1
+        self.counts[bucket] += 1
+        self.count += 1
+        self.total += latency
+        self.max = max(self.max, latency)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Retourne l'histogramme sous forme sérialisable en JSON.
+
+        Returns:
+            Dict[str, Any]: Nombre de mesures, total, moyenne, maximum et effectif de chaque classe
+            (clé: borne supérieure en secondes, "+inf" pour la dernière).
+        """
+        labels = [str(bound) for bound in LATENCY_BUCKETS] + ["+inf"]
+        return {
+            "count": self.count,
+            "total": round(self.total, 4),
+            "mean": round(self.total / self.count, 4) if self.count else 0.0,
+            "max": round(self.max, 4),
+            "buckets": {label: count for label, count in zip(labels, self.counts) if count}
+        }
+
+class Telemetry:
+    """
+    Mesures d'une synchronisation: durée de chaque phase, appels HTTP (méthode, route, statut,
+    octets, latence) et durée des tâches de chaque flow.
+
+    Les mesures sont de simples compteurs mis à jour sous verrou: leur coût est négligeable
+    devant celui des appels réseau.
+    """
+
+    def __init__(self):
+        """Initialise des mesures vides."""
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Remet toutes les mesures à zéro (nouvelle synchronisation d'un démon)."""
+        with self._lock:
+            self._phases = {} # phase -> {"count", "total"}
+            self._calls = {} # (service, "MÉTHODE route") -> compteurs et histogramme
+            self._tasks = {} # catégorie de tâche -> histogramme des durées
+            self._flows = {} # flow ou dossier -> {"duration", "tasks"}
+
+    @contextmanager
+    def span(self, phase: str) -> Iterator[None]:
+        """
+        Mesure la durée d'une phase (les durées d'une même phase s'additionnent).
+
+        Args:
+            phase: Nom de la phase.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            with self._lock:
+                phase_stats = self._phases.setdefault(phase, {"count": 0, "total": 0.0})
+                phase_stats["count"] += 1
+                phase_stats["total"] += duration
+
+    def record_call(self, service: str, method: str, route: str, status: int, bytes_sent: int,
+                    bytes_received: int, latency: float) -> None:
+        """
+        Enregistre un appel HTTP.
+
+        Args:
+            service: Service appelé (langflow, openwebui).
+            method: Méthode HTTP.
+            route: Route de la requête (voir route_template).
+            status: Code de statut de la réponse.
+            bytes_sent: Taille du corps envoyé.
+            bytes_received: Taille du corps reçu.
+            latency: Durée de l'appel en secondes.
+        """
+        with self._lock:
+            call_stats = self._calls.get((service, f"{method} {route}"))
+            if call_stats is None:
+                call_stats = {"statuses": {}, "bytes_sent": 0, "bytes_received": 0, "latency": LatencyHistogram()}
+                self._calls[(service, f"{method} {route}")] = call_stats
+            call_stats["statuses"][str(status)] = call_stats["statuses"].get(str(status), 0) + 1
+            call_stats["bytes_sent"] += bytes_sent
+            call_stats["bytes_received"] += bytes_received
+            call_stats["latency"].add(latency)
+
+    def instrument(self, session: Any, service: str) -> None:
+        """
+        Enregistre tous les appels d'une session HTTP (requests.Session) via son crochet de réponse.
+
+        La latence mesurée va de l'envoi de la requête à la réception complète du corps de la
+        réponse. Les requêtes sans réponse (erreur de connexion) ne sont pas comptées.
+
+        Args:
+            session: Session HTTP des appels du service.
+            service: Nom du service (langflow, openwebui).
+        """
+        def on_response(response: Any, *args: Any, **kwargs: Any) -> None:
+            start = time.perf_counter()
+            # Le corps est lu ici plutôt qu'après le crochet: sa lecture est comptée dans la latence
+            bytes_received = len(response.content or b"")
+            latency = response.elapsed.total_seconds() + time.perf_counter() - start
+            request = response.request
+            body = request.body
+            bytes_sent = int(request.headers.get("Content-Length") or 0)
+            if not bytes_sent and isinstance(body, (bytes, str)):
+                bytes_sent = len(body)
+            self.record_call(
+                service, request.method, route_template(request.url), response.status_code,
+                bytes_sent, bytes_received, latency
+            )
+
+        session.hooks["response"].append(on_response)
+
+    def record_tasks(self, tasks: Iterable[Any]) -> None:
+        """
+        Enregistre la durée des tâches exécutées d'un graphe de synchronisation.
+
+        Les tâches sont regroupées par catégorie (préfixe de leur nom, ex: "modify") et par
+        flow ou dossier traité (suffixe de leur nom), pour désigner les flows les plus lents.
+
+        Args:
+            tasks: Tâches de l'ordonnanceur (nom et durée).
+        """
+        with self._lock:
+            for task in tasks:
+                if not task.duration:
+                    continue
+                category, _, subject = task.name.partition(":")
+                self._tasks.setdefault(category, LatencyHistogram()).add(task.duration)
+                if subject:
+                    flow_stats = self._flows.setdefault(subject, {"duration": 0.0, "tasks": []})
+                    flow_stats["duration"] += task.duration
+                    flow_stats["tasks"].append(task.name)
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Retourne le rapport des mesures.
+
+        Returns:
+            Dict[str, Any]: Durée de chaque phase, appels HTTP par service et par route (statuts,
+            octets, histogramme des latences), durées des tâches par catégorie et flows les plus lents.
+        """
+        with self._lock:
+            phases = {
+                phase: {"count": phase_stats["count"], "total": round(phase_stats["total"], 4)}
+                for phase, phase_stats in self._phases.items()
+            }
+            http = {}
+            for (service, route), call_stats in sorted(self._calls.items()):
+                service_stats = http.setdefault(service, {"calls": 0, "bytes_sent": 0, "bytes_received": 0, "routes": {}})
+                latency = call_stats["latency"].to_dict()
+                service_stats["calls"] += latency["count"]
+                service_stats["bytes_sent"] += call_stats["bytes_sent"]
+                service_stats["bytes_received"] += call_stats["bytes_received"]
+                service_stats["routes"][route] = {
+                    "statuses": dict(call_stats["statuses"]),
+                    "bytes_sent": call_stats["bytes_sent"],
+                    "bytes_received": call_stats["bytes_received"],
+                    "latency": latency
+                }
+            tasks = {category: histogram.to_dict() for category, histogram in sorted(self._tasks.items())}
+            slowest_flows = [
+                {"flow": subject, "duration": round(flow_stats["duration"], 4), "tasks": flow_stats["tasks"]}
+                for subject, flow_stats in sorted(self._flows.items(), key=lambda item: item[1]["duration"], reverse=True)
+            ][:SLOWEST_FLOWS_LIMIT]
+        return {"phases": phases, "http": http, "tasks": tasks, "slowest_flows": slowest_flows}
+
+# Profilage en cours (voir profiling), partagé par tous les threads
+_active_profiles = None
+_profiles_lock = threading.Lock()
+
+def profile_call(func: Callable[[], Any]) -> Any:
+    """
+    Exécute une fonction, profilée dans son thread si un profilage est en cours (voir profiling).
+
+    Args:
+        func: Fonction exécutée, sans argument.
+
+    Returns:
+        Any: Résultat de la fonction.
+    """
+    profiles = _active_profiles
+    if profiles is None:
+        return func()
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Un seul profileur actif à la fois dans certaines versions de Python: la fonction est
+        # alors mesurée par le profileur principal
+        return func()
+    try:
+        return func()
+    finally:
+        profiler.disable()
+        with _profiles_lock:
+            profiles.append(profiler)
+
+@contextmanager
+def profiling(profile_path: Optional[str]) -> Iterator[None]:
+    """
+    Profile l'exécution (cProfile) et écrit le profil fusionné de tous les threads dans un fichier
+    lisible par pstats (ex: python -m pstats sync.prof, ou snakeviz).
+
+    cProfile ne mesure que le thread qui l'active: le thread principal est profilé directement,
+    et chaque tâche de synchronisation est profilée dans son thread via profile_call.
+
+    Args:
+        profile_path: Chemin du fichier de profil (None: aucun profilage).
+    """
+    global _active_profiles
+    if not profile_path:
+        yield
+        return
+    profiles: List[cProfile.Profile] = []
+    main_profiler = cProfile.Profile()
+    _active_profiles = profiles
+    main_profiler.enable()
+    try:
+        yield
+    finally:
+        main_profiler.disable()
+        _active_profiles = None
+        try:
+            stats = pstats.Stats(main_profiler)
+            for profiler in profiles:
+                stats.add(profiler)
+            stats.dump_stats(profile_path)
+            logger.info(f"Profil d'exécution écrit dans {profile_path}")
+        except Exception as e:
+            logger.warning(f"Impossible d'écrire le profil d'exécution {profile_path}: {e}")
@@ -0,0 +1,45 @@
+import os
+
+from ..benchmarks.fake_servers import FakeLangflowServer
+from ..clients.cache import ENTRIES_DIR, ResponseCache
+from ..clients.langflow import LangflowClient
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache_dir = str(tmp_path)
+    other_path = tmp_path / "flow-index.json"
+    other_path.write_text("{}", encoding="utf-8")
+    cache = ResponseCache(cache_dir, max_bytes=10_000)
+    for key in ("a", "b", "c"):
+        cache.put(key, "x" * 3000)
+    assert cache.get("a") is not None
+
+    cache.put("d", "x" * 3000)
+
+    assert cache.get("b") is None
+    assert all(cache.get(key) is not None for key in ("a", "c", "d"))
+    assert sorted(os.listdir(tmp_path / ENTRIES_DIR)) == ["a.json", "c.json", "d.json"]
+    # Les autres fichiers du répertoire du cache ne sont ni comptés ni évincés
+    assert other_path.exists()
+
+    # Un nouveau cache reprend la taille et l'ordre d'utilisation des entrées
+    reloaded = ResponseCache(cache_dir, max_bytes=7_000)
+    reloaded.put("e", "x" * 10)
+    assert reloaded.get("a") is None and reloaded.get("c") is not None
+
+def test_flow_with_known_updated_at_is_served_from_cache(tmp_path):
+    server = FakeLangflowServer()
+    server.seed([(None, {"name": "Agent", "data": {"nodes": []}})])
+    server.start()
+    try:
+        flow_id, flow = next(iter(server.flows.items()))
+        client = LangflowClient(server.url, cache=ResponseCache(str(tmp_path)))
+        assert client.get_flow_if_exists(flow_id, flow["updated_at"]) == (True, flow)
+        assert client.get_flow_if_exists(flow_id, flow["updated_at"]) == (True, flow)
+        assert server.calls == {"GET /api/v1/flows/{id}": 1}
+
+        # Les réponses ne sont jamais partagées entre deux jetons
+        other_client = LangflowClient(server.url, api_token="autre", cache=ResponseCache(str(tmp_path)))
+        assert other_client.get_flow_if_exists(flow_id, flow["updated_at"]) == (True, flow)
+        assert server.calls == {"GET /api/v1/flows/{id}": 2}
+    finally:
+        server.stop()
@@ -0,0 +1,73 @@
+import copy
+
+from ..processing.diff import compute_flow_patch, diff_flows
+
+FLOW = {
+    "id": "0b6d3c1e-5f0a-4f8e-9d0e-6f1b5b0e4c21",
+    "name": "Agent",
+    "description": "Assistant",
+    "endpoint_name": "agent",
+    "data": {
+        "nodes": [
+            {"id": "Input-1", "position": {"x": 0, "y": 0}, "data": {"node": {"template": {"value": {"value": "a"}}}}},
+            {"id": "Agent-1", "position": {"x": 200, "y": 0}, "data": {"node": {"template": {"model": {"value": "gpt"}}}}}
+        ],
+        "edges": [{"source": "Input-1", "target": "Agent-1", "data": {}}],
+        "viewport": {"x": 0, "y": 0, "zoom": 1}
+    }
+}
+
+def test_patch_without_previous_version_is_the_full_flow():
+    patch, full_size, patch_size = compute_flow_patch(None, FLOW)
+
+    assert "id" not in patch
+    assert patch["data"] is FLOW["data"]
+    assert full_size == patch_size > 0
+
+def test_patch_ignores_volatile_graph_fields():
+    new_flow = copy.deepcopy(FLOW)
+    new_flow["data"]["viewport"] = {"x": 120, "y": 40, "zoom": 0.5}
+    new_flow["data"]["nodes"][0]["selected"] = True
+
+    patch, _, patch_size = compute_flow_patch(FLOW, new_flow)
+
+    assert patch == {}
+    assert patch_size == 0
+
+def test_patch_keeps_changed_fields_only():
+    new_flow = copy.deepcopy(FLOW)
+    new_flow["name"] = "Agent v2"
+    new_flow["data"]["nodes"][1]["data"]["node"]["template"]["model"]["value"] = "mistral"
+
+    patch, full_size, patch_size = compute_flow_patch(FLOW, new_flow)
+
+    assert sorted(patch) == ["data", "name"]
+    assert 0 < patch_size <= full_size
+
+def test_patch_clears_removed_fields():
+    """Un champ retiré du fichier est effacé dans Langflow; les champs gérés par le serveur sont conservés."""
+    previous_flow = {**FLOW, "folder_id": "dossier", "updated_at": "2026-01-01T00:00:00"}
+    new_flow = {key: value for key, value in FLOW.items() if key != "description"}
+
+    patch, _, _ = compute_flow_patch(previous_flow, new_flow)
+
+    assert patch == {"description": None}
+
+def test_diff_flows():
+    new_flow = copy.deepcopy(FLOW)
+    new_flow["description"] = "Agent conversationnel"
+    new_flow["data"]["nodes"][0]["position"] = {"x": 40, "y": 0}
+    new_flow["data"]["nodes"][1]["data"]["node"]["template"]["model"]["value"] = "mistral"
+    new_flow["data"]["nodes"].append({"id": "Output-1", "position": {"x": 400, "y": 0}, "data": {}})
+    new_flow["data"]["edges"] = [{"source": "Agent-1", "target": "Output-1", "data": {}}]
+
+    flow_diff = diff_flows(FLOW, new_flow)
+
+    assert flow_diff.metadata_changed == ["description"]
+    assert flow_diff.nodes_added == ["Output-1"]
+    assert flow_diff.nodes_removed == []
+    assert flow_diff.fields_changed == {"Agent-1": ["model"]}
+    assert flow_diff.nodes_moved == ["Input-1"]
+    assert len(flow_diff.edges_added) == 1 and len(flow_diff.edges_removed) == 1
+    assert not flow_diff.is_noop
+    assert diff_flows(FLOW, copy.deepcopy(FLOW)).is_noop
@@ -0,0 +1,69 @@
+import json
+
+from ..journal import SyncJournal
+
+RUN_KEY = {"before_commit": "a", "after_commit": "b", "shard": None, "target": "default"}
+
+def interrupted_run(journal_path: str, operations, resume: bool = False) -> SyncJournal:
+    """Journalise des opérations terminées puis s'arrête sans marquer la synchronisation terminée."""
+    journal = SyncJournal(journal_path)
+    journal.open(RUN_KEY, resume)
+    journal.record_planned(["upload:a", "upload:b", "upload:c"])
+    for operation in operations:
+        journal.record_done(operation, {"id": operation.upper()})
+    journal.close()
+    return journal
+
+def test_resume_restores_completed_operations(tmp_path):
+    journal_path = str(tmp_path / "journal.jsonl")
+    interrupted_run(journal_path, ["upload:a", "upload:b"])
+
+    journal = SyncJournal(journal_path)
+    assert journal.open(RUN_KEY, resume=True) == 2
+    assert journal.is_done("upload:a") and journal.is_done("upload:b")
+    assert not journal.is_done("upload:c")
+    assert journal.result("upload:b") == {"id": "UPLOAD:B"}
+    journal.close()
+
+def test_successive_resumes_accumulate(tmp_path):
+    """Une reprise elle-même interrompue prolonge la synchronisation d'origine."""
+    journal_path = str(tmp_path / "journal.jsonl")
+    interrupted_run(journal_path, ["upload:a"])
+    interrupted_run(journal_path, ["upload:b"], resume=True)
+
+    journal = SyncJournal(journal_path)
+    assert journal.open(RUN_KEY, resume=True) == 2
+    journal.close()
+
+def test_other_run_or_no_resume_starts_over(tmp_path):
+    journal_path = str(tmp_path / "journal.jsonl")
+    interrupted_run(journal_path, ["upload:a"])
+
+    journal = SyncJournal(journal_path)
+    assert journal.open({**RUN_KEY, "after_commit": "c"}, resume=True) == 0
+    journal.close()
+
+    interrupted_run(journal_path, ["upload:a"])
+    journal = SyncJournal(journal_path)
+    assert journal.open(RUN_KEY) == 0
+    journal.close()
+    with open(journal_path, "r", encoding="utf-8") as file:
+        assert [json.loads(line)["type"] for line in file] == ["run"]
+
+def test_truncated_last_line_is_ignored(tmp_path):
+    """Une ligne tronquée par un arrêt brutal est ignorée et n'altère pas les entrées suivantes."""
+    journal_path = str(tmp_path / "journal.jsonl")
+    interrupted_run(journal_path, ["upload:a"])
+    with open(journal_path, "a", encoding="utf-8") as file:
+        file.write('{"type":"done","op":"upload:b","res')
+
+    journal = SyncJournal(journal_path)
+    assert journal.open(RUN_KEY, resume=True) == 1
+    assert not journal.is_done("upload:b")
+    journal.record_done("upload:c")
+    journal.close()
+
+    journal = SyncJournal(journal_path)
+    assert journal.open(RUN_KEY, resume=True) == 2
+    assert journal.is_done("upload:c")
+    journal.close()
@@ -0,0 +1,86 @@
+import json
+
+import pytest
+
+from ..benchmarks.fake_servers import FakeLangflowServer
+from ..clients.langflow import FLOW_HEADER_FIELDS, LangflowClient
+from ..managers.flow import FlowManager
+
+FLOW_ROUTE = "POST /api/v1/flows/"
+
+@pytest.fixture
+def server():
+    fake_server = FakeLangflowServer()
+    fake_server.start()
+    yield fake_server
+    fake_server.stop()
+
+def write_flow(tmp_path, name: str) -> str:
+    flow_path = tmp_path / f"{name}.json"
+    flow_path.write_text(json.dumps({"name": name, "data": {"nodes": [], "edges": []}}), encoding="utf-8")
+    return str(flow_path)
+
+def test_gzip_refused_by_server_without_decompression(server, tmp_path):
+    """Un serveur qui ne décompresse pas répond 422: l'envoi est refait sans compression, une seule fois."""
+    server.decompress_requests = False
+    client = LangflowClient(server.url, compress_requests=True)
+
+    created = client.create_flow_from_file(write_flow(tmp_path, "premier"))
+
+    assert created["name"] == "premier"
+    assert client.compress_requests is False
+    assert server.calls[FLOW_ROUTE] == 2
+
+    # Le refus est mémorisé: les envois suivants ne sont plus compressés
+    assert client.create_flow_from_file(write_flow(tmp_path, "second"))["name"] == "second"
+    assert server.calls[FLOW_ROUTE] == 3
+
+def test_batch_gzip_refused_by_server_without_decompression(server, tmp_path):
+    """Un lot compressé refusé n'a créé aucun flow et désactive la compression."""
+    server.decompress_requests = False
+    client = LangflowClient(server.url, compress_requests=True)
+
+    result, maybe_created = client.create_flows_batch([b'{"name": "premier"}', b'{"name": "second"}'])
+
+    assert result is None
+    assert maybe_created is False
+    assert client.compress_requests is False
+    assert not server.flows
+
+def test_gzip_accepted_then_invalid_flow_is_an_error(server, tmp_path):
+    """Une fois la compression acceptée, un 422 est une vraie erreur et la compression est conservée."""
+    client = LangflowClient(server.url, compress_requests=True)
+
+    assert client.create_flow_from_file(write_flow(tmp_path, "premier"))["name"] == "premier"
+    assert client.gzip_accepted is True
+
+    invalid_path = tmp_path / "invalide.json"
+    invalid_path.write_text("{invalide", encoding="utf-8")
+    assert client.create_flow_from_file(str(invalid_path)) is None
+    assert client.compress_requests is True
+    assert server.calls[FLOW_ROUTE] == 2
+
+def test_flow_headers_are_listed_in_one_request_without_graphs(server):
+    server.seed((folder_name, {"name": f"Agent {index}", "endpoint_name": f"agent_{index}", "data": {"nodes": [{"id": "n"}]}})
+                for index, folder_name in enumerate(["Dossier", "Dossier", None]))
+    client = LangflowClient(server.url)
+
+    headers = list(client.iter_flow_headers())
+
+    assert sorted(header["endpoint_name"] for header in headers) == ["agent_0", "agent_1", "agent_2"]
+    assert all(set(header) == set(FLOW_HEADER_FIELDS) for header in headers)
+    assert server.calls == {"GET /api/v1/flows/": 1}
+
+def test_flow_lookup_lists_once_and_never_treats_errors_as_absence(server):
+    server.seed([(None, {"name": "Agent", "data": {"nodes": []}})])
+    flow_manager = FlowManager(LangflowClient(server.url))
+
+    assert flow_manager.find_flow_by_name("Agent")["name"] == "Agent"
+    assert flow_manager.find_flow_by_name("Inconnu") is None
+    assert flow_manager.find_flow_by_name("Autre inconnu") is None
+    assert server.calls == {"GET /api/v1/flows/": 1}
+
+    # Une liste indisponible ne doit pas faire passer un flow pour absent (il serait créé en double)
+    server.stop()
+    with pytest.raises(Exception):
+        list(LangflowClient("http://127.0.0.1:9").iter_flow_headers())
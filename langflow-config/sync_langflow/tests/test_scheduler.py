@@ -0,0 +1,48 @@
+import pytest
+
+from ..scheduler import TASK_DONE, TASK_FAILED, TASK_SKIPPED, TaskScheduler
+
+def fail():
+    raise RuntimeError("échec")
+
+def test_failure_skips_only_tasks_requiring_success():
+    scheduler = TaskScheduler(max_workers=2)
+    scheduler.add_task("upload", fail)
+    scheduler.add_task("folder", lambda: "dossier", requires=["upload"])
+    scheduler.add_task("pipeline", lambda: "pipeline", requires=["folder"])
+    scheduler.add_task("cleanup", lambda: "nettoyage", after=["pipeline"])
+    scheduler.add_task("report", lambda: "rapport", requires=["cleanup"])
+    scheduler.add_task("other", lambda: "autre")
+
+    states = scheduler.run()
+
+    assert states == {
+        "upload": TASK_FAILED,
+        "folder": TASK_SKIPPED,
+        "pipeline": TASK_SKIPPED,
+        "cleanup": TASK_DONE,
+        "report": TASK_DONE,
+        "other": TASK_DONE
+    }
+    assert scheduler.result("report") == "rapport"
+    assert scheduler.result("folder") is None
+    assert isinstance(scheduler.tasks["upload"].error, RuntimeError)
+
+def test_dependencies_run_first():
+    order = []
+    scheduler = TaskScheduler(max_workers=4)
+    scheduler.add_task("upload", lambda: order.append("upload"))
+    scheduler.add_task("folder", lambda: order.append("folder"), requires=["upload"])
+    scheduler.add_task("prune", lambda: order.append("prune"), after=["folder"])
+
+    scheduler.run()
+
+    assert order == ["upload", "folder", "prune"]
+
+def test_add_task_rejects_unknown_or_duplicate_tasks():
+    scheduler = TaskScheduler()
+    scheduler.add_task("upload", lambda: None)
+    with pytest.raises(ValueError):
+        scheduler.add_task("upload", lambda: None)
+    with pytest.raises(ValueError):
+        scheduler.add_task("folder", lambda: None, requires=["inconnue"])
@@ -0,0 +1,81 @@
+import pytest
+
+from ..benchmarks.scenarios import prepare_scenario
+from ..config import Config
+from ..managers.git import GitManager
+from ..managers.index import FlowIndex
+from ..shards import filter_changes_for_shard, merge_reports, parse_shard, shard_of
+from ..sync import plan_sync
+
+def test_parse_shard():
+    assert parse_shard("2/4") == (2, 4)
+    for shard_spec in ("0/4", "5/4", "1/0", "2", "a/b"):
+        with pytest.raises(ValueError):
+            parse_shard(shard_spec)
+
+def test_filter_changes_keeps_moved_flow_in_one_shard():
+    """Un flow déplacé d'un dossier à l'autre est supprimé par le shard qui l'ajoute."""
+    folders = [f"Dossier{index}" for index in range(20)]
+    source = next(folder for folder in folders if shard_of(f"flows/{folder}/x.json", 2) == 1)
+    target = next(folder for folder in folders if shard_of(f"flows/{folder}/x.json", 2) == 2)
+    changes = {
+        "added": [],
+        "flows_added": [f"flows/{target}/Agent.json"],
+        "flows_modified": [f"flows/{source}/Autre.json"],
+        "flows_deleted": [f"flows/{source}/Agent.json"]
+    }
+
+    first = filter_changes_for_shard(changes, 1, 2)
+    second = filter_changes_for_shard(changes, 2, 2)
+
+    assert first["flows_added"] == [] and first["flows_deleted"] == []
+    assert first["flows_modified"] == [f"flows/{source}/Autre.json"]
+    assert second["flows_added"] == [f"flows/{target}/Agent.json"]
+    assert second["flows_deleted"] == [f"flows/{source}/Agent.json"]
+    # Les changements d'origine ne sont pas modifiés
+    assert len(changes["flows_deleted"]) == 1
+
+def test_merge_reports():
+    reports = [
+        {"before_commit": "a", "after_commit": "b", "shard": f"{index}/2", "flows_added": index, "duration": index,
+         "targets": {"default": {"status": status, "flows_processed": 3, "failed_tasks": [f"upload:{index}"]}}}
+        for index, status in ((1, "ok"), (2, "partial"))
+    ]
+
+    merged, errors = merge_reports(reports)
+
+    assert errors == []
+    assert merged["flows_added"] == 3
+    assert merged["duration"] == 2
+    assert merged["targets"]["default"]["status"] == "partial"
+    assert merged["targets"]["default"]["flows_processed"] == 6
+    assert merged["targets"]["default"]["failed_tasks"] == ["upload:1", "upload:2"]
+
+    _, errors = merge_reports(reports[:1])
+    assert errors == ["shards manquants: 2/2"]
+
+def test_shard_plan_indexes_every_flow(tmp_path):
+    """L'index des flows partagé par les shards couvre les flows de tous les shards."""
+    repo_dir = str(tmp_path / "repo")
+    before_commit, after_commit = prepare_scenario("full_add", repo_dir, 40)
+    git_manager = GitManager(repo_dir)
+    index_path = str(tmp_path / "flow-index.json")
+    flow_index = FlowIndex(index_path)
+    flow_index.rebuild(git_manager, before_commit, repo_dir)
+    flow_index.save()
+
+    config = Config()
+    config.repo_path = repo_dir
+    config.index_path = index_path
+    config.shard = "1/2"
+    plan = plan_sync(config, git_manager, FlowIndex(index_path), before_commit, after_commit, include_pipelines=False)
+
+    all_flows = git_manager.list_flow_files(after_commit)
+    shard_flows = [flow_path for flow_path in all_flows if shard_of(flow_path, 2) == 1]
+    assert 0 < len(shard_flows) < len(all_flows)
+    assert sorted(plan.changes["flows_added"]) == sorted(shard_flows)
+    assert sorted(plan.endpoint_index.flow_ids) == sorted(all_flows)
+
+    saved_index = FlowIndex(index_path)
+    assert saved_index.commit == after_commit
+    assert sorted(saved_index.flows) == sorted(all_flows)
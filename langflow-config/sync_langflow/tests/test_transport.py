@@ -0,0 +1,65 @@
+import gzip
+
+import pytest
+
+from ..benchmarks.fake_servers import FakeLangflowServer
+from ..clients.langflow import LangflowClient
+from ..clients.transport import Cassette
+
+@pytest.fixture
+def recorded(tmp_path):
+    """Cassette enregistrée face au serveur simulé, arrêté ensuite; retourne son chemin et les flows créés."""
+    cassette_path = str(tmp_path / "sync.cassette.jsonl.gz")
+    server = FakeLangflowServer()
+    server.start()
+    try:
+        cassette = Cassette(cassette_path, "record")
+        client = LangflowClient(server.url, api_token="secret")
+        cassette.mount(client.session, "langflow")
+        created = [client.create_flow({"name": name, "data": {"nodes": [], "edges": []}}) for name in ("Agent", "Agent")]
+        client.create_folder({"name": "Dossier", "flows_list": [created[0]["id"]]})
+        headers = list(client.iter_flow_headers())
+        cassette.close()
+    finally:
+        server.stop()
+    return cassette_path, created, headers
+
+def replay_client(cassette: Cassette) -> LangflowClient:
+    # Le serveur est arrêté: toute requête non servie par la cassette échouerait
+    client = LangflowClient("http://127.0.0.1:9", api_token="secret")
+    cassette.mount(client.session, "langflow")
+    return client
+
+def test_replay_serves_recorded_responses_in_order(recorded):
+    cassette_path, created, headers = recorded
+    cassette = Cassette(cassette_path, "replay")
+    client = replay_client(cassette)
+
+    replayed = [client.create_flow({"name": "Agent", "data": {"nodes": [], "edges": []}}) for _ in range(2)]
+    assert [flow["name"] for flow in replayed] == [flow["name"] for flow in created] == ["Agent", "Agent (1)"]
+    assert list(client.iter_flow_headers()) == headers
+    # Une lecture répétée plus souvent qu'à l'enregistrement resert la dernière réponse
+    assert list(client.iter_flow_headers()) == headers
+    assert cassette.misses == 0
+
+    assert client.get_folders() == []
+    assert cassette.misses == 1
+    cassette.close()
+
+def test_cassette_never_stores_request_headers(recorded):
+    cassette_path, _, _ = recorded
+    with gzip.open(cassette_path, "rt", encoding="utf-8") as file:
+        assert "secret" not in file.read()
+
+def test_truncated_cassette_replays_complete_calls(recorded, tmp_path):
+    cassette_path, created, _ = recorded
+    with open(cassette_path, "rb") as file:
+        content = file.read()
+    truncated_path = str(tmp_path / "truncated.cassette.jsonl.gz")
+    with open(truncated_path, "wb") as file:
+        file.write(content[:len(content) - 20])
+
+    cassette = Cassette(truncated_path, "replay")
+    client = replay_client(cassette)
+    assert client.create_flow({"name": "Agent", "data": {"nodes": [], "edges": []}})["id"] == created[0]["id"]
+    cassette.close()
@@ -1,14 +1,17 @@
 import logging
 import os
 import sys
+import uuid
+from typing import Any, Dict, Optional
 
 # Configuration du logging
-def setup_logging(verbose: bool = False) -> logging.Logger:
+def setup_logging(verbose: bool = False, show_threads: bool = False) -> logging.Logger:
     """
     Configure et retourne un logger.
     
     Args:
         verbose: Si True, active le mode verbeux (DEBUG).
+        show_threads: Si True, le nom du thread (préfixé par la cible) est ajouté à chaque ligne.
         
     Returns:
         logging.Logger: Logger configuré.
@@ -26,7 +29,10 @@ def setup_logging(verbose: bool = False) -> logging.Logger:
     console_handler.setLevel(logging.DEBUG if verbose else logging.INFO)
     
     # Définir le format
-    formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    log_format = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    if show_threads:
+        log_format = "%(asctime)s - %(name)s - [%(threadName)s] - %(levelname)s - %(message)s"
+    formatter = logging.Formatter(log_format)
     console_handler.setFormatter(formatter)
     
     # Ajouter le handler au logger
@@ -34,6 +40,19 @@ def setup_logging(verbose: bool = False) -> logging.Logger:
     
     return logger
 
+def is_flow_path(file_path: str) -> bool:
+    """
+    Indique si un chemin du dépôt correspond à un fichier de flow Langflow
+    (fichier JSON situé dans un dossier "flows").
+    
+    Args:
+        file_path: Chemin du fichier relatif à la racine du dépôt.
+        
+    Returns:
+        bool: True si le fichier est un flow.
+    """
+    return file_path.endswith(".json") and ("langflow-config/flows/" in file_path or "/flows/" in file_path)
+
 def extract_flow_name_from_path(flow_path: str) -> str:
     """
     Extrait le nom du flow à partir du chemin du fichier.
@@ -81,3 +100,50 @@ def extract_folder_name_from_path(flow_path: str) -> str | None:
         logging.error(f"Erreur lors de l'extraction du nom de dossier pour {flow_path}: {e}")
         return None
 
+
+def extract_flow_id(flow_data: Dict[str, Any]) -> Optional[str]:
+    """
+    Extrait l'ID stable d'un flow (champ "id" du fichier de flow).
+    
+    Args:
+        flow_data: Contenu décodé du fichier de flow.
+        
+    Returns:
+        Optional[str]: ID du flow normalisé (UUID en minuscules) ou None s'il est absent ou invalide.
+    """
+    flow_id = flow_data.get("id") if isinstance(flow_data, dict) else None
+    if not isinstance(flow_id, str):
+        return None
+    try:
+        return str(uuid.UUID(flow_id))
+    except ValueError:
+        return None
+
+def derive_endpoint_name(flow_name: str) -> str:
+    """
+    Dérive l'endpoint_name par défaut d'un flow à partir de son nom.
+    
+    Args:
+        flow_name: Nom du flow.
+        
+    Returns:
+        str: Endpoint name dérivé (minuscules, espaces remplacés par "_").
+    """
+    return flow_name.lower().replace(" ", "_")
+
+def derive_pipeline_name(flow_name: str) -> str:
+    """
+    Dérive le nom du fichier de pipeline OpenWebUI (sans extension) d'un flow à partir de son nom.
+    C'est aussi l'ID du pipeline une fois téléchargé dans OpenWebUI.
+    
+    Args:
+        flow_name: Nom du flow.
+        
+    Returns:
+        str: Nom du pipeline.
+    """
+    # Convertir le nom du flow en un nom de fichier valide
+    pipeline_name = flow_name.lower().replace(" ", "_").replace("-", "_")
+    # S'assurer que le nom de fichier est valide (supprimer les caractères non alphanumériques)
+    pipeline_name = "".join(c for c in pipeline_name if c.isalnum() or c == '_')
+    return pipeline_name or "default_pipeline" # Fallback si le nom devient vide